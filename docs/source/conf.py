@@ -96,7 +96,7 @@ def get_contrib_functions(*file_parts):
     for idx, line in enumerate(lines):
         line = line.strip()
 
-        if "@contrib_first" == line:
+        if line == "@contrib_first" or line.startswith("@contrib_first("):
             in_contrib = True
             continue
         if line.startswith("@"):
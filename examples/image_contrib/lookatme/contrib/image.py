@@ -0,0 +1,273 @@
+"""
+Defines an image extension that overrides inline images to render local image
+files as half-block terminal "pixels".
+
+Images are decoded in a background thread pool. Decoded images are kept as
+integral images (summed-area tables), so scaling an image to any size is a
+vectorized area average that does not decode the image again. Scaled results
+are cached by (path, mtime, target size, color depth).
+"""
+
+
+import collections
+import concurrent.futures
+import math
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy
+import urwid
+from PIL import Image
+
+import lookatme.config
+import lookatme.scheduler
+from lookatme.exceptions import IgnoredByContrib
+
+#: The maximum number of rows an image may take up
+MAX_ROWS = 40
+
+#: The number of decoded images to keep in memory
+DECODED_CACHE_SIZE = 8
+
+#: The number of scaled results to keep in memory
+RESULT_CACHE_SIZE = 64
+
+HALF_BLOCK = "▀"
+
+_POOL = concurrent.futures.ThreadPoolExecutor(
+    max_workers=min(4, os.cpu_count() or 1),
+    thread_name_prefix="lookatme-image",
+)
+_LOCK = threading.Lock()
+# (path, mtime) -> (width, height)
+_SIZES: Dict[Tuple[str, float], Tuple[int, int]] = {}
+# (path, mtime) -> integral image
+_DECODED: "collections.OrderedDict[Tuple[str, float], numpy.ndarray]" = collections.OrderedDict()
+# (path, mtime, (cols, rows), depth) -> urwid text markup
+_RESULTS: "collections.OrderedDict[Tuple, List]" = collections.OrderedDict()
+_PENDING: Dict[Tuple, concurrent.futures.Future] = {}
+
+
+def user_warnings():
+    """No warnings exist for this extension. Only local image files that are
+    referenced by the markdown are read.
+    """
+    return []
+
+
+def color_depth() -> int:
+    """Return the color depth to render images with
+    """
+    if os.environ.get("COLORTERM", "") in ("truecolor", "24bit"):
+        return 2 ** 24
+    return 256
+
+
+def image_size(path: str, mtime: float) -> Tuple[int, int]:
+    """Return the pixel size of the image. Only the image header is read.
+    """
+    key = (path, mtime)
+    with _LOCK:
+        size = _SIZES.get(key, None)
+    if size is None:
+        with Image.open(path) as img:
+            size = img.size
+        with _LOCK:
+            _SIZES[key] = size
+    return size
+
+
+def fit_cells(img_size: Tuple[int, int], max_cols: int) -> Tuple[int, int]:
+    """Return the (cols, rows) an image should take up. Each cell displays
+    two vertically stacked pixels, which keeps pixels roughly square.
+    """
+    width, height = img_size
+    cols = max(1, min(max_cols, width))
+    rows = max(1, math.ceil(cols * height / width / 2))
+    if rows > MAX_ROWS:
+        rows = MAX_ROWS
+        cols = max(1, min(cols, round(rows * 2 * width / height)))
+    return cols, rows
+
+
+def integral_image(pixels: numpy.ndarray) -> numpy.ndarray:
+    """Return the summed-area table of an HxWx3 image, padded with a leading
+    row and column of zeros
+    """
+    res = numpy.zeros((pixels.shape[0] + 1, pixels.shape[1] + 1, 3), dtype=numpy.float64)
+    res[1:, 1:] = pixels.astype(numpy.float64).cumsum(axis=0).cumsum(axis=1)
+    return res
+
+
+def _edges(length: int, count: int) -> numpy.ndarray:
+    edges = numpy.floor(numpy.linspace(0, length, count + 1)).astype(numpy.int64)
+    # every output pixel covers at least one source pixel
+    edges[1:] = numpy.maximum(edges[1:], edges[:-1] + 1)
+    return numpy.minimum(edges, length)
+
+
+def area_average(integral: numpy.ndarray, width: int, height: int) -> numpy.ndarray:
+    """Downscale an image to ``width`` x ``height`` by averaging the source
+    pixels covered by each output pixel, using its integral image
+    """
+    src_h, src_w = integral.shape[0] - 1, integral.shape[1] - 1
+    ys = _edges(src_h, height)
+    xs = _edges(src_w, width)
+    y0, y1 = ys[:-1], ys[1:]
+    x0, x1 = xs[:-1], xs[1:]
+
+    sums = (
+        integral[numpy.ix_(y1, x1)]
+        - integral[numpy.ix_(y0, x1)]
+        - integral[numpy.ix_(y1, x0)]
+        + integral[numpy.ix_(y0, x0)]
+    )
+    areas = numpy.outer(numpy.maximum(y1 - y0, 1), numpy.maximum(x1 - x0, 1))
+    return (sums / areas[:, :, None]).round().clip(0, 255).astype(numpy.uint8)
+
+
+def _hex_color(rgb, depth: int) -> str:
+    r, g, b = (int(x) for x in rgb)
+    if depth == 256:
+        # urwid maps 12-bit colors onto the 256 color palette
+        return "#{:x}{:x}{:x}".format(r // 17, g // 17, b // 17)
+    return "#{:02x}{:02x}{:02x}".format(r, g, b)
+
+
+def to_markup(pixels: numpy.ndarray, depth: int) -> List:
+    """Convert an image with an even number of rows into urwid markup of half
+    blocks, with the top pixel as the foreground and the bottom pixel as the
+    background color
+    """
+    spec_cache: Dict[Tuple[str, str], urwid.AttrSpec] = {}
+    markup: List = []
+    for row_idx in range(0, pixels.shape[0], 2):
+        if row_idx > 0:
+            markup.append("\n")
+        prev_spec = None
+        run = 0
+        for top, bottom in zip(pixels[row_idx], pixels[row_idx + 1]):
+            colors = (_hex_color(top, depth), _hex_color(bottom, depth))
+            spec = spec_cache.get(colors, None)
+            if spec is None:
+                spec = urwid.AttrSpec(colors[0], colors[1], colors=depth)
+                spec_cache[colors] = spec
+            if spec is prev_spec:
+                run += 1
+                continue
+            if prev_spec is not None:
+                markup.append((prev_spec, HALF_BLOCK * run))
+            prev_spec, run = spec, 1
+        markup.append((prev_spec, HALF_BLOCK * run))
+    return markup
+
+
+def _decoded(path: str, mtime: float) -> numpy.ndarray:
+    key = (path, mtime)
+    with _LOCK:
+        integral = _DECODED.get(key, None)
+        if integral is not None:
+            _DECODED.move_to_end(key)
+            return integral
+
+    with Image.open(path) as img:
+        pixels = numpy.asarray(img.convert("RGB"))
+    integral = integral_image(pixels)
+
+    with _LOCK:
+        _DECODED[key] = integral
+        while len(_DECODED) > DECODED_CACHE_SIZE:
+            _DECODED.popitem(last=False)
+    return integral
+
+
+def _render_job(key: Tuple) -> List:
+    path, mtime, (cols, rows), depth = key
+    pixels = area_average(_decoded(path, mtime), cols, rows * 2)
+    markup = to_markup(pixels, depth)
+    with _LOCK:
+        _RESULTS[key] = markup
+        while len(_RESULTS) > RESULT_CACHE_SIZE:
+            _RESULTS.popitem(last=False)
+        _PENDING.pop(key, None)
+    return markup
+
+
+def get_markup(key: Tuple, on_done) -> Optional[List]:
+    """Return the cached markup for ``key``. On a cache miss the image is
+    scaled in the background, ``on_done`` is called on the UI thread once it
+    is ready, and None is returned.
+    """
+    with _LOCK:
+        markup = _RESULTS.get(key, None)
+        if markup is not None:
+            _RESULTS.move_to_end(key)
+            return markup
+
+        future = _PENDING.get(key, None)
+        if future is None:
+            future = _POOL.submit(_render_job, key)
+            _PENDING[key] = future
+
+    def done(fut):
+        if fut.exception() is not None:
+            lookatme.config.get_log().error(
+                f"Could not render image {key[0]}: {fut.exception()}")
+        lookatme.scheduler.run_on_ui_thread(on_done)
+    future.add_done_callback(done)
+    return None
+
+
+class ImageBlock(urwid.Widget):
+    """A flow widget that displays an image, scaled to fit the available
+    width. Until the scaled image is ready, a placeholder of the same size is
+    displayed.
+    """
+    _sizing = frozenset(["flow"])
+
+    def __init__(self, path: str, alt_text: str):
+        urwid.Widget.__init__(self)
+        self.path = path
+        self.alt_text = alt_text
+        self.mtime = os.path.getmtime(path)
+        self.img_size = image_size(path, self.mtime)
+        self._texts: Dict[Tuple, urwid.Text] = {}
+
+    def rows(self, size, focus=False):
+        return fit_cells(self.img_size, size[0])[1]
+
+    def render(self, size, focus=False):
+        maxcol, = size
+        cells = fit_cells(self.img_size, maxcol)
+        key = (self.path, self.mtime, cells, color_depth())
+
+        text = self._texts.get(key, None)
+        if text is None:
+            markup = get_markup(key, self._invalidate)
+            if markup is None:
+                placeholder = "\n" * (cells[1] // 2) + f"[loading {self.alt_text or 'image'}]"
+                placeholder += "\n" * (cells[1] - placeholder.count("\n") - 1)
+                return urwid.Text(placeholder, align="center").render((maxcol,))
+            text = urwid.Text(markup, align="center", wrap="clip")
+            self._texts = {key: text}
+
+        return text.render((maxcol,))
+
+
+def image(link_uri, title, text):
+    """Render local images as half-block pixels. Remote images are rendered
+    as links by lookatme.
+    """
+    if "://" in link_uri:
+        raise IgnoredByContrib()
+
+    path = os.path.join(lookatme.config.get_slide_source_dir(), link_uri)
+    if not os.path.isfile(path):
+        raise IgnoredByContrib()
+
+    try:
+        return [ImageBlock(path, text or title or "")]
+    except Exception as e:
+        lookatme.config.get_log().error(f"Could not open image {path}: {e}")
+        raise IgnoredByContrib()
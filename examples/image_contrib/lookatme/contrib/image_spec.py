@@ -0,0 +1,12 @@
+"""
+Describes the image extension to lookatme. lookatme reads this spec through
+the ``lookatme.extensions`` entry point, and only imports the (much heavier)
+``lookatme.contrib.image`` module once a slide with an image is rendered.
+"""
+
+
+EXTENSION = {
+    "module": "lookatme.contrib.image",
+    "hooks": ["image"],
+    "user_warnings": [],
+}
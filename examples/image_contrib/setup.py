@@ -0,0 +1,26 @@
+"""
+Setup for lookatme.contrib.image example
+"""
+
+
+from setuptools import setup, find_namespace_packages
+
+
+setup(
+    name="lookatme.contrib.image",
+    version="0.0.0",
+    description="Renders local images as terminal pixel blocks",
+    author="James Johnson",
+    author_email="d0c.s4vage@gmail.com",
+    python_requires=">=3.6",
+    packages=find_namespace_packages(include=["lookatme.*"]),
+    install_requires=[
+        "Pillow",
+        "numpy",
+    ],
+    entry_points={
+        "lookatme.extensions": [
+            "image = lookatme.contrib.image_spec:EXTENSION",
+        ],
+    },
+)
@@ -14,7 +14,10 @@ import pygments.styles
 
 import lookatme
 import lookatme.config
+import lookatme.export
 import lookatme.log
+import lookatme.mirror
+import lookatme.server
 import lookatme.tui
 import lookatme.tutorial
 from lookatme.pres import Presentation
@@ -65,7 +68,7 @@ from lookatme.schemas import StyleSchema
     "--live",
     "--live-reload",
     "live_reload",
-    help="Watch the input filename for modifications and automatically reload",
+    help="Watch the input files for modifications and automatically reload",
     is_flag=True,
     default=False,
 )
@@ -107,6 +110,116 @@ from lookatme.schemas import StyleSchema
     is_flag=True,
     default=False
 )
+@click.option(
+    "--max-fps",
+    "max_fps",
+    help="The maximum number of times per second to redraw the screen",
+    type=click.IntRange(min=1),
+    default=30,
+    show_default=True,
+)
+@click.option(
+    "--asyncio",
+    "use_asyncio",
+    help="Run the TUI on an asyncio event loop",
+    is_flag=True,
+    default=False,
+)
+@click.option(
+    "--export",
+    "export_format",
+    help="Render every slide of every input file to files in the output "
+         "directory instead of starting the TUI",
+    type=click.Choice(list(lookatme.export.EXPORT_FORMATS.keys())),
+    default=None,
+)
+@click.option(
+    "-o",
+    "--output-dir",
+    "output_dir",
+    help="The directory exported slides are written to",
+    type=click.Path(file_okay=False, writable=True),
+    default="lookatme_export",
+    show_default=True,
+)
+@click.option(
+    "--width",
+    "width",
+    help="The width in columns of exported slides",
+    type=click.IntRange(min=10),
+    default=100,
+    show_default=True,
+)
+@click.option(
+    "--height",
+    "height",
+    help="The height in rows of exported slides",
+    type=click.IntRange(min=5),
+    default=30,
+    show_default=True,
+)
+@click.option(
+    "-j",
+    "--jobs",
+    "jobs",
+    help="The number of processes used to export slides. Defaults to the "
+         "number of CPUs",
+    type=click.IntRange(min=1),
+    default=None,
+)
+@click.option(
+    "--server",
+    "server",
+    help="Run a render daemon that keeps parsed decks and highlighted code "
+         "warm for clients started with --use-server",
+    is_flag=True,
+    default=False,
+)
+@click.option(
+    "--use-server",
+    "use_server",
+    help="Present through a running render daemon, falling back to "
+         "presenting directly if none is running",
+    is_flag=True,
+    default=False,
+)
+@click.option(
+    "--socket",
+    "socket_path",
+    help="The Unix socket path of the render daemon",
+    type=click.Path(dir_okay=False),
+    default=lookatme.server.DEFAULT_SOCKET_PATH,
+)
+@click.option(
+    "--idle-timeout",
+    "idle_timeout",
+    help="The number of seconds without clients after which the render "
+         "daemon shuts down",
+    type=click.FloatRange(min=1),
+    default=1800,
+    show_default=True,
+)
+@click.option(
+    "--broadcast",
+    "broadcast",
+    help="Mirror the presentation to viewers connecting to this Unix socket "
+         "path or host:port",
+    default=None,
+)
+@click.option(
+    "--view",
+    "view",
+    help="View a presentation mirrored with --broadcast from this Unix "
+         "socket path or host:port",
+    default=None,
+)
+@click.option(
+    "--record",
+    "record",
+    help="Record the session as an asciinema v2 cast to this path",
+    type=click.Path(dir_okay=False, writable=True),
+    default=None,
+)
 @click.version_option(lookatme.__version__)
 @click.argument(
     "input_files",
@@ -115,7 +228,9 @@ from lookatme.schemas import StyleSchema
 )
 def main(tutorial, debug, log_path, theme, code_style, dump_styles,
          input_files, live_reload, extensions, single_slide, safe, no_ext_warn,
-         ignore_ext_failure):
+         ignore_ext_failure, max_fps, export_format, output_dir, width, height,
+         jobs, server, use_server, socket_path, idle_timeout, broadcast, view,
+         record, use_asyncio):
     """lookatme - An interactive, terminal-based markdown presentation tool.
 
     See https://lookatme.readthedocs.io/en/v{{VERSION}} for documentation
@@ -125,6 +240,48 @@ def main(tutorial, debug, log_path, theme, code_style, dump_styles,
     else:
         lookatme.config.LOG = lookatme.log.create_null_log()
 
+    preload_exts = [x.strip() for x in extensions.split(",")]
+    preload_exts = list(filter(lambda x: x != "", preload_exts))
+
+    if export_format is not None:
+        deck_paths = [x.name for x in input_files]
+        if len(deck_paths) == 0 or any(not os.path.isfile(x) for x in deck_paths):
+            raise click.UsageError("--export requires one or more input file paths")
+        for input_file in input_files:
+            input_file.close()
+
+        written = lookatme.export.export_decks(
+            deck_paths,
+            output_dir,
+            fmt=export_format,
+            width=width,
+            height=height,
+            theme=theme,
+            code_style=code_style,
+            extensions=preload_exts,
+            ignore_ext_failure=ignore_ext_failure,
+            jobs=jobs,
+        )
+        click.echo(f"Exported {len(written)} slides to {output_dir}")
+        return 0
+
+    if view is not None:
+        try:
+            lookatme.mirror.MirrorViewer(view).run()
+        except (OSError, ValueError) as e:
+            raise click.ClickException(f"Could not view {view}: {e}")
+        return 0
+
+    if server:
+        try:
+            lookatme.server.RenderServer(
+                socket_path,
+                idle_timeout=idle_timeout,
+            ).serve_forever()
+        except RuntimeError as e:
+            raise click.ClickException(str(e))
+        return 0
+
     if len(input_files) == 0:
         input_files = [io.StringIO("")]
 
@@ -147,10 +304,41 @@ def main(tutorial, debug, log_path, theme, code_style, dump_styles,
 
         input_files = [io.StringIO(tutorial_md)]
 
-    preload_exts = [x.strip() for x in extensions.split(",")]
-    preload_exts = list(filter(lambda x: x != "", preload_exts))
+    input_path = getattr(input_files[0], "name", "")
+    if (
+        use_server
+        and not tutorial
+        and not dump_styles
+        and len(input_files) == 1
+        and os.path.isfile(input_path)
+    ):
+        input_files[0].close()
+        exit_code = lookatme.server.run_client({
+            "path": os.path.abspath(input_path),
+            "cwd": os.getcwd(),
+            "env": lookatme.server.client_env(),
+            "debug": debug,
+            "log_path": os.path.abspath(log_path),
+            "theme": theme,
+            "code_style": code_style,
+            "live_reload": live_reload,
+            "single_slide": single_slide,
+            "extensions": preload_exts,
+            "safe": safe,
+            "no_ext_warn": no_ext_warn,
+            "ignore_ext_failure": ignore_ext_failure,
+            "max_fps": max_fps,
+            "broadcast": broadcast,
+            "record": os.path.abspath(record) if record else None,
+            "use_asyncio": use_asyncio,
+        }, socket_path)
+        if exit_code is not None:
+            raise SystemExit(exit_code)
+        lookatme.config.get_log().info("No render daemon is running, presenting directly")
+        input_files = [open(input_path, "r")]
+
     pres = Presentation(
-        input_files[0],
+        list(input_files),
         theme,
         code_style,
         live_reload=live_reload,
@@ -159,6 +347,10 @@ def main(tutorial, debug, log_path, theme, code_style, dump_styles,
         safe=safe,
         no_ext_warn=no_ext_warn,
         ignore_ext_failure=ignore_ext_failure,
+        max_fps=max_fps,
+        broadcast=broadcast,
+        record=record,
+        use_asyncio=use_asyncio,
     )
 
     if dump_styles:
@@ -3,16 +3,18 @@ Config module for lookatme
 """
 
 
+import contextlib
 import logging
 import os
+import threading
 from types import ModuleType
-from typing import Any, Dict
+from typing import Any, Dict, Mapping, Optional
 
 import lookatme.themes
-from lookatme.utils import dict_deep_update
+from lookatme.utils import LayeredDict
 
 LOG = None
-STYLE: Dict[str, Any] = {}
+STYLE: Mapping[str, Any] = {}
 
 
 def get_log() -> logging.Logger:
@@ -21,7 +23,7 @@ def get_log() -> logging.Logger:
     return LOG
 
 
-def get_style() -> Dict:
+def get_style() -> Mapping:
     if not STYLE:
         raise Exception("STYLE was empty!")
     return STYLE
@@ -31,26 +33,27 @@ def get_style_with_precedence(
     theme_mod: ModuleType,
     direct_overrides: Dict,
     style_override: str
-) -> Dict[str, Any]:
-    """Return the resulting style dict from the provided override values.
+) -> LayeredDict:
+    """Return the resulting styles from the provided override values. The
+    styles are a copy-on-write view of the override layers, which is cheap to
+    create since no layer is copied or merged.
     """
     # style override order:
-    # 1. theme settings
-    styles = lookatme.themes.ensure_defaults(theme_mod)
-    # 2. inline styles from the presentation
-    dict_deep_update(styles, direct_overrides)
-    # 3. CLI style overrides
-    if style_override is not None:
-        styles["style"] = style_override  # type: ignore
-
-    return styles
+    return LayeredDict(
+        # 1. theme settings
+        lookatme.themes.theme_defaults(theme_mod),
+        # 2. inline styles from the presentation
+        direct_overrides,
+        # 3. CLI style overrides
+        {"style": style_override} if style_override is not None else {},
+    )
 
 
 def set_global_style_with_precedence(
     theme_mod,
     direct_overrides,
     style_override
-) -> Dict[str, Any]:
+) -> LayeredDict:
     """Set the lookatme.config.STYLE value based on the provided override
     values
     """
@@ -64,3 +67,25 @@ def set_global_style_with_precedence(
 # default to the current working directory - this will be set later by
 # pres:Presentation when reading the input stream
 SLIDE_SOURCE_DIR = os.getcwd()
+_SLIDE = threading.local()
+
+
+def get_slide_source_dir() -> str:
+    """Return the directory that relative paths within the slide being
+    rendered on this thread are relative to
+    """
+    return getattr(_SLIDE, "source_dir", None) or SLIDE_SOURCE_DIR
+
+
+@contextlib.contextmanager
+def slide_source_dir(source_dir: Optional[str]):
+    """Resolve relative paths within slides rendered on this thread in this
+    context against ``source_dir``. :any:`SLIDE_SOURCE_DIR` is used if
+    ``source_dir`` is None.
+    """
+    old_source_dir = getattr(_SLIDE, "source_dir", None)
+    _SLIDE.source_dir = source_dir
+    try:
+        yield
+    finally:
+        _SLIDE.source_dir = old_source_dir
@@ -17,8 +17,10 @@ Contrib modules are directly used
 """
 
 
+import fnmatch
 import functools
-from typing import List
+import importlib.util
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import lookatme.ascii_art
 import lookatme.prompt
@@ -41,12 +43,165 @@ def validate_extension_mod(_ext_name, ext_mod):
     return res
 
 
+#: The entry point group that installed extensions register themselves in
+ENTRY_POINT_GROUP = "lookatme.extensions"
+
+#: Extension specs of the builtin extensions. See :any:`LazyContrib` for the
+#: spec format. The user warnings are part of the specs so that the builtin
+#: extensions are not imported to display them.
+BUILTIN_EXTENSIONS: Dict[str, Dict[str, Any]] = {
+    "file_loader": {
+        "module": "lookatme.contrib.file_loader",
+        "hooks": ["render_code", "code_lang"],
+        "code_langs": ["file"],
+        "user_warnings": [
+            "Code-blocks with a language starting with 'file' may cause shell",
+            "  commands from the source markdown to be run if the 'transform'",
+            "  field is set",
+            "See https://lookatme.readthedocs.io/en/latest/builtin_extensions/file_loader.html",
+            "  for more details",
+        ],
+    },
+    "table_file": {
+        "module": "lookatme.contrib.table_file",
+        "hooks": ["render_code"],
+        "code_langs": ["table-file"],
+        "user_warnings": [],
+    },
+    "terminal": {
+        "module": "lookatme.contrib.terminal",
+        "hooks": ["render_code"],
+        "code_langs": ["terminal-ex", "terminal[0-9]*"],
+        "user_warnings": [
+            "Code-blocks with a language starting with 'terminal' will cause shell",
+            "  commands from the source markdown to be run",
+            "See https://lookatme.readthedocs.io/en/latest/builtin_extensions/terminal.html",
+            "  for more details",
+        ],
+    },
+}
+
+_LAZY_CONTRIBS: Dict[str, "LazyContrib"] = {}
+_ENTRY_POINT_SPECS: Optional[Dict[str, Any]] = None
+
+
+class LazyContrib(object):
+    """Stands in for a contrib module in ``CONTRIB_MODULES`` until one of its
+    hooks is called, at which point the module is imported. Extensions
+    describe themselves with a spec dict:
+
+    .. code-block:: python
+
+        {
+            # the module that implements the extension
+            "module": "lookatme.contrib.calendar",
+            # the overridden lookatme functions
+            "hooks": ["render_code"],
+            # (optional) fnmatch patterns of code block languages the
+            # extension renders
+            "code_langs": ["calendar"],
+            # (optional) user warnings, so that the module does not need to
+            # be imported to display them
+            "user_warnings": [],
+        }
+    """
+
+    def __init__(self, name: str, spec: Dict[str, Any]):
+        if not isinstance(spec, dict) or not isinstance(spec.get("module", None), str):
+            raise ValueError(f"Invalid spec for extension {name!r}: 'module' is required")
+
+        self.name = name
+        self.spec = spec
+        self.module = None
+        if spec.get("code_langs", None) is not None:
+            self.CODE_LANGS = list(spec["code_langs"])
+        for hook in spec.get("hooks", []):
+            setattr(self, hook, self._create_stub(hook))
+
+    def __repr__(self):
+        return f"<LazyContrib {self.name!r} ({self.spec['module']})>"
+
+    def load(self):
+        """Import the extension module, if it has not been imported yet
+        """
+        if self.module is None:
+            module_name = self.spec["module"]
+            self.module = __import__(module_name, fromlist=[module_name.split(".")[-1]])
+        return self.module
+
+    def _create_stub(self, hook: str) -> Callable:
+        def stub(*args, **kwargs):
+            return getattr(self.load(), hook)(*args, **kwargs)
+        stub.__name__ = hook
+        return stub
+
+    def user_warnings(self) -> List[str]:
+        if "user_warnings" in self.spec:
+            return list(self.spec["user_warnings"])
+        return validate_extension_mod(self.name, self.load())
+
+    def shutdown(self):
+        if self.module is not None:
+            getattr(self.module, "shutdown", lambda: 1)()
+
+
+def _entry_points(group: str) -> List:
+    try:
+        from importlib import metadata  # type: ignore
+    except ImportError:
+        try:
+            import importlib_metadata as metadata  # type: ignore
+        except ImportError:
+            return []
+
+    eps = metadata.entry_points()
+    if hasattr(eps, "select"):
+        return list(eps.select(group=group))
+    return list(eps.get(group, []))
+
+
+def entry_point_specs() -> Dict[str, Any]:
+    """Return the extension specs registered by installed packages under the
+    ``lookatme.extensions`` entry point group. The entry points are only
+    scanned once.
+    """
+    global _ENTRY_POINT_SPECS
+    if _ENTRY_POINT_SPECS is None:
+        _ENTRY_POINT_SPECS = {ep.name: ep for ep in _entry_points(ENTRY_POINT_GROUP)}
+    return _ENTRY_POINT_SPECS
+
+
+def find_extension(contrib_name: str):
+    """Return the lazily-loaded stand-in for the named extension, or None if
+    no spec exists for it. Specs of the builtin extensions take precedence
+    over specs registered by entry points.
+    """
+    lazy = _LAZY_CONTRIBS.get(contrib_name, None)
+    if lazy is not None:
+        return lazy
+
+    spec = BUILTIN_EXTENSIONS.get(contrib_name, None)
+    if spec is None:
+        entry_point = entry_point_specs().get(contrib_name, None)
+        if entry_point is None:
+            return None
+        spec = entry_point.load()
+
+    lazy = LazyContrib(contrib_name, spec)
+    _LAZY_CONTRIBS[contrib_name] = lazy
+    return lazy
+
+
 def load_contribs(contrib_names, safe_contribs, ignore_load_failure=False):
-    """Load all contrib modules specified by ``contrib_names``. These should
-    all be namespaced packages under the ``lookatmecontrib`` namespace. E.g.
-    ``lookatmecontrib.calendar`` would be an extension provided by a
+    """Load all contrib modules specified by ``contrib_names``.
+
+    Extensions with a spec (builtin extensions, and extensions registered
+    under the ``lookatme.extensions`` entry point group) are not imported
+    until one of their hooks is first used. Other extensions must be
+    namespaced packages under the ``lookatme.contrib`` namespace. E.g.
+    ``lookatme.contrib.calendar`` would be an extension provided by a
     contrib module, and would be added to an ``extensions`` list in a slide's
-    YAML header as ``calendar``.
+    YAML header as ``calendar``. These are imported immediately.
 
     ``safe_contribs`` is a set of contrib names that are manually provided
     by the user by the ``-e`` flag or env variable of extensions to auto-load.
@@ -57,9 +212,13 @@ def load_contribs(contrib_names, safe_contribs, ignore_load_failure=False):
     errors = []
     all_warnings = []
     for contrib_name in contrib_names:
-        module_name = f"lookatme.contrib.{contrib_name}"
         try:
-            mod = __import__(module_name, fromlist=[contrib_name])
+            mod = find_extension(contrib_name)
+            if mod is None:
+                module_name = f"lookatme.contrib.{contrib_name}"
+                mod = __import__(module_name, fromlist=[contrib_name])
+            elif importlib.util.find_spec(mod.spec["module"]) is None:
+                raise ImportError(f"No module named {mod.spec['module']!r}")
         except Exception as e:
             if ignore_load_failure:
                 continue
@@ -69,7 +228,9 @@ def load_contribs(contrib_names, safe_contribs, ignore_load_failure=False):
                 ext_warnings = validate_extension_mod(contrib_name, mod)
                 if len(ext_warnings) > 0:
                     all_warnings.append((contrib_name, ext_warnings))
-            CONTRIB_MODULES.append(mod)
+            # several presentations may be loaded by the same process
+            if mod not in CONTRIB_MODULES:
+                CONTRIB_MODULES.append(mod)
 
     _handle_load_errors_warnings(errors, all_warnings)
 
@@ -96,34 +257,136 @@ def _handle_load_errors_warnings(errors: List[str], all_warnings: List[str]):
         exit(1)
 
 
-def contrib_first(fn):
+class _Declined(object):
+    def __repr__(self):
+        return "lookatme.contrib.DECLINED"
+
+
+#: Returned by a contrib module's function to decline overriding the default
+#: behavior. This is equivalent to raising :any:`IgnoredByContrib`, without
+#: the cost of raising an exception.
+DECLINED = _Declined()
+
+# fn_name -> [(contrib module index, fn)]
+_DISPATCH: Dict[str, List[Tuple[int, Callable]]] = {}
+# (fn_name, lang) -> [(contrib module index, fn)]
+_LANG_ROUTES: Dict[Tuple[str, str], List[Tuple[int, Callable]]] = {}
+_DISPATCH_KEY: Optional[Tuple[int, int]] = None
+
+
+def _dispatch_key() -> Tuple[int, int]:
+    # CONTRIB_MODULES is only ever appended to or replaced with a new list
+    return (id(CONTRIB_MODULES), len(CONTRIB_MODULES))
+
+
+def _check_dispatch():
+    """Clear the dispatch tables if the loaded contrib modules changed
+    """
+    global _DISPATCH_KEY
+    key = _dispatch_key()
+    if key != _DISPATCH_KEY:
+        _DISPATCH.clear()
+        _LANG_ROUTES.clear()
+        _DISPATCH_KEY = key
+
+
+def _handlers(fn_name: str) -> List[Tuple[int, Callable]]:
+    res = _DISPATCH.get(fn_name, None)
+    if res is None:
+        res = [
+            (idx, getattr(mod, fn_name))
+            for idx, mod in enumerate(CONTRIB_MODULES)
+            if hasattr(mod, fn_name)
+        ]
+        _DISPATCH[fn_name] = res
+    return res
+
+
+def _lang_handlers(fn_name: str, lang: str) -> List[Tuple[int, Callable]]:
+    """Return the handlers of ``fn_name`` for code blocks of the language
+    ``lang``. Contrib modules that define ``CODE_LANGS``, a list of fnmatch
+    patterns, are only routed the languages that match one of the patterns.
+    """
+    key = (fn_name, lang)
+    res = _LANG_ROUTES.get(key, None)
+    if res is None:
+        res = []
+        for idx, handler in _handlers(fn_name):
+            patterns = getattr(CONTRIB_MODULES[idx], "CODE_LANGS", None)
+            if patterns is None or any(fnmatch.fnmatchcase(lang, x) for x in patterns):
+                res.append((idx, handler))
+        _LANG_ROUTES[key] = res
+    return res
+
+
+def contrib_first(fn=None, lang_routed=False):
     """A decorator that allows contrib modules to override default behavior
     of lookatme. E.g., a contrib module may override how a table is displayed
     to enable sorting, or enable displaying images rendered with ANSII color
     codes and box drawing characters, etc.
 
-    Contrib modules may ignore chances to override default behavior by raising
-    the ``lookatme.contrib.IgnoredByContrib`` exception.
+    Contrib modules may ignore chances to override default behavior by
+    returning :any:`DECLINED` or by raising the
+    ``lookatme.contrib.IgnoredByContrib`` exception.
+
+    The contrib modules that override each function are looked up once, when
+    the set of loaded contrib modules changes. If ``lang_routed`` is True, the
+    first argument of the function must be a code token, and calls are only
+    routed to contrib modules whose ``CODE_LANGS`` match the token's language.
     """
+    if fn is None:
+        return functools.partial(contrib_first, lang_routed=lang_routed)
+
     fn_name = fn.__name__
 
     @functools.wraps(fn)
     def inner(*args, **kwargs):
-        for mod in CONTRIB_MODULES:
-            if not hasattr(mod, fn_name):
-                continue
+        _check_dispatch()
+        if lang_routed:
+            return _call_lang_routed(fn, fn_name, args, kwargs)
+
+        for _, handler in _handlers(fn_name):
             try:
-                return getattr(mod, fn_name)(*args, **kwargs)
+                res = handler(*args, **kwargs)
             except IgnoredByContrib:
-                pass
+                continue
+            if res is not DECLINED:
+                return res
 
         return fn(*args, **kwargs)
 
     return inner
 
 
+def _call_lang_routed(fn, fn_name, args, kwargs):
+    token = args[0] if len(args) > 0 else kwargs["token"]
+    lang = token.get("lang", None) or ""
+    handlers = _lang_handlers(fn_name, lang)
+    handler_idx = 0
+    while handler_idx < len(handlers):
+        mod_idx, handler = handlers[handler_idx]
+        handler_idx += 1
+        try:
+            res = handler(*args, **kwargs)
+        except IgnoredByContrib:
+            res = DECLINED
+        if res is not DECLINED:
+            return res
+
+        # declining handlers may change the language (e.g. the file loader),
+        # which changes the remaining handlers
+        new_lang = token.get("lang", None) or ""
+        if new_lang != lang:
+            lang = new_lang
+            handlers = [x for x in _lang_handlers(fn_name, lang) if x[0] > mod_idx]
+            handler_idx = 0
+
+    return fn(*args, **kwargs)
+
+
 def shutdown_contribs():
-    """Call the shutdown function on all contrib modules
+    """Call the shutdown function on all contrib modules. Extensions that were
+    never imported are not imported to shut them down.
     """
     for mod in CONTRIB_MODULES:
         getattr(mod, "shutdown", lambda: 1)()
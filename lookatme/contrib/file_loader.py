@@ -8,26 +8,26 @@ source data in a terminal on the same slide.
 
 import os
 import subprocess
-from typing import Dict
+from typing import Dict, Optional
 
+import pygments.lexers
 import yaml
 from marshmallow import Schema, fields
 
 import lookatme.config
-from lookatme.exceptions import IgnoredByContrib
+import lookatme.contrib
+from lookatme.contrib import DECLINED
 
 
 def user_warnings():
     """Provide warnings to the user that loading this extension may cause
     shell commands specified in the markdown to be run.
     """
-    return [
-        "Code-blocks with a language starting with 'file' may cause shell",
-        "  commands from the source markdown to be run if the 'transform'",
-        "  field is set",
-        "See https://lookatme.readthedocs.io/en/latest/builtin_extensions/file_loader.html",
-        "  for more details",
-    ]
+    return list(lookatme.contrib.BUILTIN_EXTENSIONS["file_loader"]["user_warnings"])
+
+
+#: code block languages that are routed to :any:`render_code`
+CODE_LANGS = ["file"]
 
 
 class YamlRender:
@@ -84,20 +84,45 @@ def transform_data(transform_shell_cmd, input_data):
     return stdout
 
 
+def detect_lang(path: str) -> str:
+    """Return the pygments language of the file at ``path``, based on its
+    filename
+    """
+    lexer_cls = pygments.lexers.find_lexer_class_for_filename(path)
+    if lexer_cls is None or len(lexer_cls.aliases) == 0:
+        return "text"
+    return lexer_cls.aliases[0]
+
+
+def code_lang(token) -> Optional[str]:
+    """Return the language that the file of the ``file`` code block token
+    will be displayed as, without reading the file. None is returned if the
+    code block is not valid. Overrides
+    :any:`lookatme.render.pygments.code_lang`.
+    """
+    try:
+        file_info = FileSchema().loads(token["text"])
+    except Exception:
+        return None
+    if file_info["lang"] == "auto":
+        return detect_lang(file_info["path"])
+    return file_info["lang"]
+
+
 def render_code(token, body, stack, loop):
     """Render the code, ignoring all code blocks except ones with the language
     set to ``file``.
     """
     lang = token["lang"] or ""
     if lang != "file":
-        raise IgnoredByContrib
+        return DECLINED
 
     file_info_data = token["text"]
     file_info = FileSchema().loads(file_info_data)
 
     # relative to the slide source
     if file_info["relative"]:
-        base_dir = lookatme.config.SLIDE_SOURCE_DIR
+        base_dir = lookatme.config.get_slide_source_dir()
     else:
         base_dir = os.getcwd()
 
@@ -105,7 +130,7 @@ def render_code(token, body, stack, loop):
     if not os.path.exists(full_path):
         token["text"] = "File not found"
         token["lang"] = "text"
-        raise IgnoredByContrib
+        return DECLINED
 
     with open(full_path, "rb") as f:
         file_data = f.read()
@@ -118,4 +143,6 @@ def render_code(token, body, stack, loop):
     file_data = b"\n".join(lines)
     token["text"] = file_data
     token["lang"] = file_info["lang"]
-    raise IgnoredByContrib
+    if token["lang"] == "auto":
+        token["lang"] = detect_lang(full_path)
+    return DECLINED
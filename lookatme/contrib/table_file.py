@@ -0,0 +1,315 @@
+"""
+This module defines a built-in contrib module that renders delimited data
+files (CSV, TSV, etc.) as tables. Data files are read with a streaming csv
+reader, and only the rows of the page being displayed are read and rendered.
+"""
+
+
+import csv
+import os
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import urwid
+import yaml
+from marshmallow import Schema, fields
+
+import lookatme.config
+from lookatme.contrib import DECLINED
+from lookatme.widgets.clickable_text import ClickableText
+from lookatme.widgets.table import Table
+
+
+def user_warnings():
+    """This extension only reads the referenced data files, so there is
+    nothing to warn the user about.
+    """
+    return []
+
+
+#: code block languages that are routed to :any:`render_code`
+CODE_LANGS = ["table-file"]
+
+
+class YamlRender:
+    @staticmethod
+    def loads(data): return yaml.safe_load(data)
+    @staticmethod
+    def dumps(data): return yaml.safe_dump(data)
+
+
+class TableFileSchema(Schema):
+    """The schema used for ``table-file`` code blocks.
+    """
+    path = fields.Str()
+    relative = fields.Boolean(dump_default=True, load_default=True)
+    delimiter = fields.Str(dump_default=None, load_default=None)
+    header = fields.Boolean(dump_default=True, load_default=True)
+    columns = fields.List(fields.Raw(), dump_default=None, load_default=None)
+    page_size = fields.Integer(dump_default=20, load_default=20)
+    page = fields.Integer(dump_default=1, load_default=1)
+    encoding = fields.Str(dump_default="utf-8", load_default="utf-8")
+
+    class Meta:
+        render_module = YamlRender
+
+    def loads(self, *args, **kwargs) -> Dict:
+        res = super(self.__class__, self).loads(*args, **kwargs)
+        if res is None:
+            raise ValueError("Could not loads")
+        return res
+
+    def load(self, *args, **kwargs) -> Dict:
+        res = super(self.__class__, self).load(*args, **kwargs)
+        if res is None:
+            raise ValueError("Could not load")
+        return res
+
+
+class _TrackedLines:
+    """Iterates over the decoded lines of a binary file, tracking the byte
+    offset of the next line to be read. The csv reader only pulls the lines
+    that make up the row it is reading, so after reading a row ``offset`` is
+    the byte offset of the start of the next row.
+    """
+
+    def __init__(self, f, encoding: str):
+        self.f = f
+        self.encoding = encoding
+        self.offset = f.tell()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        line = self.f.readline()
+        if not line:
+            raise StopIteration
+        self.offset += len(line)
+        return line.decode(self.encoding, errors="replace")
+
+
+class RowIndex:
+    """A sparse byte-offset index of the rows in a delimited data file.
+    The byte offset of every ``stride``-th data row is recorded, so reading a
+    page only needs to seek to the nearest checkpoint and skip fewer than
+    ``stride`` rows.
+
+    The index is filled in incrementally as rows are read, so opening a large
+    file never requires scanning all of it.
+    """
+
+    def __init__(self, path: str, delimiter: str, header: bool,
+                 encoding: str, stride: int = 256):
+        self.path = path
+        self.delimiter = delimiter
+        self.encoding = encoding
+        self.stride = stride
+        self.lock = threading.Lock()
+
+        #: the header row, if the file has one
+        self.header_row: Optional[List[str]] = None
+        #: byte offset of data row ``idx * stride``
+        self.checkpoints: List[int] = []
+        #: the number of data rows in the file, once it is known
+        self.total_rows: Optional[int] = None
+
+        with open(self.path, "rb") as f:
+            lines = _TrackedLines(f, self.encoding)
+            reader = self._reader(lines)
+            if header:
+                self.header_row = next(reader, None)
+            self.checkpoints.append(lines.offset)
+
+    def _reader(self, lines: _TrackedLines) -> Iterator[List[str]]:
+        return csv.reader(lines, delimiter=self.delimiter)
+
+    def read_rows(self, start: int, count: int) -> List[List[str]]:
+        """Read ``count`` data rows starting at data row ``start``
+        """
+        with self.lock, open(self.path, "rb") as f:
+            checkpoint_idx = min(start // self.stride, len(self.checkpoints) - 1)
+            row_num = checkpoint_idx * self.stride
+            f.seek(self.checkpoints[checkpoint_idx])
+
+            lines = _TrackedLines(f, self.encoding)
+            reader = self._reader(lines)
+            res = []
+            while len(res) < count:
+                if row_num % self.stride == 0:
+                    self._add_checkpoint(row_num, lines.offset)
+
+                row = next(reader, None)
+                if row is None:
+                    self.total_rows = row_num
+                    break
+                if row_num >= start:
+                    res.append(row)
+                row_num += 1
+
+            return res
+
+    def _add_checkpoint(self, row_num: int, offset: int):
+        checkpoint_idx = row_num // self.stride
+        if checkpoint_idx == len(self.checkpoints):
+            self.checkpoints.append(offset)
+
+
+ROW_INDEXES: Dict[Tuple[str, float, str, bool, str], RowIndex] = {}
+
+
+def get_row_index(path: str, delimiter: str, header: bool, encoding: str) -> RowIndex:
+    """Return the cached :any:`RowIndex` for the file, creating a new one if
+    the file has been modified since it was last indexed.
+    """
+    key = (path, os.path.getmtime(path), delimiter, header, encoding)
+    row_index = ROW_INDEXES.get(key, None)
+    if row_index is None:
+        # drop stale indexes of previous versions of the file
+        for stale_key in [x for x in ROW_INDEXES if x[0] == path]:
+            del ROW_INDEXES[stale_key]
+        row_index = RowIndex(path, delimiter, header, encoding)
+        ROW_INDEXES[key] = row_index
+    return row_index
+
+
+def _default_delimiter(path: str) -> str:
+    if os.path.splitext(path)[1].lower() in (".tsv", ".tab"):
+        return "\t"
+    return ","
+
+
+def _column_indices(columns, header_row: Optional[List[str]]) -> Optional[List[int]]:
+    """Resolve the ``columns`` field (names or 0-based indices) to indices
+    """
+    if columns is None:
+        return None
+
+    res = []
+    for column in columns:
+        if isinstance(column, int):
+            res.append(column)
+        elif header_row is not None and column in header_row:
+            res.append(header_row.index(column))
+        else:
+            raise ValueError(f"Unknown column {column!r}")
+    return res
+
+
+class TableFile(urwid.WidgetWrap):
+    """Displays a single page of a delimited data file as a :any:`Table`,
+    with clickable controls to move between pages.
+    """
+
+    def __init__(self, row_index: RowIndex, column_indices: Optional[List[int]],
+                 page_size: int, page: int):
+        self.row_index = row_index
+        self.column_indices = column_indices
+        self.page_size = max(page_size, 1)
+        self.page = max(page, 1)
+        self._placeholder = urwid.WidgetPlaceholder(urwid.Text(""))
+        urwid.WidgetWrap.__init__(self, self._placeholder)
+        self.set_page(self.page)
+
+    def _select(self, row: List[str]) -> List[str]:
+        if self.column_indices is None:
+            return row
+        return [row[idx] if idx < len(row) else "" for idx in self.column_indices]
+
+    def _num_pages(self) -> Optional[int]:
+        if self.row_index.total_rows is None:
+            return None
+        return max((self.row_index.total_rows + self.page_size - 1) // self.page_size, 1)
+
+    def set_page(self, page: int):
+        """Display the provided 1-based page number
+        """
+        num_pages = self._num_pages()
+        if num_pages is not None:
+            page = min(page, num_pages)
+        self.page = max(page, 1)
+
+        start = (self.page - 1) * self.page_size
+        rows = [self._select(x) for x in self.row_index.read_rows(start, self.page_size)]
+
+        headers = None
+        if self.row_index.header_row is not None:
+            headers = self._select(self.row_index.header_row)
+
+        if len(rows) == 0:
+            body = urwid.Text("No rows")
+        else:
+            table = Table(rows, headers=headers, virtualize=False)
+            body = urwid.Padding(table, width=table.total_width + 2, align="center")
+
+            def table_changed(*args, **kwargs):
+                body.width = table.total_width + 2
+            urwid.connect_signal(table, "change", table_changed)
+
+        self._placeholder.original_widget = urwid.Pile([
+            body,
+            urwid.Divider(),
+            self._create_footer(),
+        ])
+
+    def _create_footer(self) -> urwid.Widget:
+        num_pages = self._num_pages()
+        page_text = f"page {self.page}"
+        if num_pages is not None:
+            page_text += f" of {num_pages}"
+
+        prev_text = ClickableText("◀ prev", align="right")
+        next_text = ClickableText("next ▶", align="left")
+        urwid.connect_signal(
+            prev_text, "click", lambda *_: self.set_page(self.page - 1))
+        urwid.connect_signal(
+            next_text, "click", lambda *_: self.set_page(self.page + 1))
+
+        return urwid.Columns([
+            prev_text,
+            (len(page_text) + 4, urwid.Text(page_text, align="center")),
+            next_text,
+        ])
+
+
+def render_code(token, body, stack, loop):
+    """Render a delimited data file as a paginated table, ignoring all code
+    blocks except ones with the language set to ``table-file``.
+    """
+    lang = token["lang"] or ""
+    if lang != "table-file":
+        return DECLINED
+
+    table_info = TableFileSchema().loads(token["text"])
+
+    # relative to the slide source
+    if table_info["relative"]:
+        base_dir = lookatme.config.get_slide_source_dir()
+    else:
+        base_dir = os.getcwd()
+
+    full_path = os.path.join(base_dir, table_info["path"])
+    if not os.path.exists(full_path):
+        token["text"] = "File not found"
+        token["lang"] = "text"
+        return DECLINED
+
+    delimiter = table_info["delimiter"] or _default_delimiter(full_path)
+    row_index = get_row_index(
+        full_path,
+        delimiter,
+        table_info["header"],
+        table_info["encoding"],
+    )
+    column_indices = _column_indices(table_info["columns"], row_index.header_row)
+
+    return [
+        urwid.Divider(),
+        TableFile(
+            row_index,
+            column_indices,
+            table_info["page_size"],
+            table_info["page"],
+        ),
+        urwid.Divider(),
+    ]
@@ -13,20 +13,20 @@ import yaml
 from marshmallow import Schema, fields
 
 import lookatme.config
+import lookatme.contrib
 import lookatme.render.markdown_block
-from lookatme.exceptions import IgnoredByContrib
+from lookatme.contrib import DECLINED
 
 
 def user_warnings():
     """Provide warnings to the user that loading this extension may cause
     shell commands specified in the markdown to be run.
     """
-    return [
-        "Code-blocks with a language starting with 'terminal' will cause shell",
-        "  commands from the source markdown to be run",
-        "See https://lookatme.readthedocs.io/en/latest/builtin_extensions/terminal.html",
-        "  for more details",
-    ]
+    return list(lookatme.contrib.BUILTIN_EXTENSIONS["terminal"]["user_warnings"])
+
+
+#: code block languages that are routed to :any:`render_code`
+CODE_LANGS = ["terminal-ex", "terminal[0-9]*"]
 
 
 class YamlRender:
@@ -70,7 +70,7 @@ def render_code(token, body, stack, loop):
 
     numbered_term_match = re.match(r'terminal(\d+)', lang)
     if lang != "terminal-ex" and numbered_term_match is None:
-        raise IgnoredByContrib
+        return DECLINED
 
     if numbered_term_match is not None:
         term_data = TerminalExSchema().load({
@@ -8,3 +8,10 @@ class IgnoredByContrib(Exception):
     call.
     """
     pass
+
+
+class IncludeError(Exception):
+    """Raised when an included markdown file cannot be included, e.g. because
+    it does not exist or it (indirectly) includes itself
+    """
+    pass
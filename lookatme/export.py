@@ -0,0 +1,390 @@
+"""
+This module defines headless exporting of presentations. Every slide of a
+deck is rendered to an urwid canvas at a fixed size and written out as ANSI
+text, HTML, or SVG. Slides are rendered across a pool of worker processes.
+"""
+
+
+import concurrent.futures
+import html
+import os
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import urwid
+from urwid.util import calc_width
+
+import lookatme.config
+import lookatme.log
+import lookatme.pres
+import lookatme.tui
+
+#: Maps export format names to output file extensions
+EXPORT_FORMATS = {
+    "ansi": ".ans",
+    "html": ".html",
+    "svg": ".svg",
+}
+
+# a row of (spec, text) runs
+Row = List[Tuple[Optional[urwid.AttrSpec], str]]
+
+
+def render_slide_canvas(slide, width: int, height: int) -> urwid.Canvas:
+    """Render the provided slide to a canvas of size ``(width, height)``. The
+    slide is rendered synchronously, using the current global style. Code
+    blocks are not scrolled, so that no lines are cut off.
+    """
+    loop = urwid.MainLoop(urwid.ListBox([]))
+    renderer = lookatme.tui.SlideRenderer(loop, code_max_rows=None)
+    contents = renderer.do_render(slide, slide.number)
+
+    padding = lookatme.config.get_style()["padding"]
+    container = urwid.ListBox([urwid.Text("")])
+    container.body = contents
+    padded = urwid.Padding(
+        container,
+        left=padding["left"],
+        right=padding["right"],
+    )
+    return padded.render((width, height))
+
+
+def _to_spec(attr) -> Optional[urwid.AttrSpec]:
+    """Convert a canvas attribute into an ``urwid.AttrSpec``. Attributes may
+    also be plain strings, such as ``"bold"``.
+    """
+    if attr is None or isinstance(attr, urwid.AttrSpec):
+        return attr
+    try:
+        return urwid.AttrSpec(str(attr), "")
+    except urwid.AttrSpecError:
+        return None
+
+
+def canvas_rows(canvas: urwid.Canvas) -> List[Row]:
+    """Return the rows of the canvas as lists of ``(spec, text)`` runs
+    """
+    res = []
+    for row in canvas.content():
+        res.append([
+            (_to_spec(attr), text.decode("utf-8", errors="replace"))
+            for attr, _cs, text in row
+        ])
+    return res
+
+
+def _hex(r: int, g: int, b: int) -> str:
+    return "#{:02x}{:02x}{:02x}".format(r, g, b)
+
+
+def ansi_sgr(spec: Optional[urwid.AttrSpec]) -> str:
+    """Return the SGR escape sequence for the provided spec, using 24-bit
+    colors
+    """
+    codes = ["0"]
+    if spec is not None:
+        for flag, code in (
+            ("bold", "1"),
+            ("italics", "3"),
+            ("underline", "4"),
+            ("blink", "5"),
+            ("standout", "7"),
+            ("strikethrough", "9"),
+        ):
+            if getattr(spec, flag, False):
+                codes.append(code)
+        fr, fg, fb, br, bg, bb = spec.get_rgb_values()
+        if fr is not None:
+            codes.append(f"38;2;{fr};{fg};{fb}")
+        if br is not None:
+            codes.append(f"48;2;{br};{bg};{bb}")
+    return "\x1b[" + ";".join(codes) + "m"
+
+
+def ansi_row(row: Row) -> str:
+    """Encode a single row of runs as ANSI text
+    """
+    return "".join(ansi_sgr(spec) + text for spec, text in row) + "\x1b[0m"
+
+
+def rows_to_ansi(rows: Sequence[Row]) -> str:
+    return "\n".join(ansi_row(row) for row in rows) + "\n"
+
+
+def _css(spec: Optional[urwid.AttrSpec]) -> str:
+    if spec is None:
+        return ""
+    styles = []
+    fr, fg, fb, br, bg, bb = spec.get_rgb_values()
+    if fr is not None:
+        styles.append("color:" + _hex(fr, fg, fb))
+    if br is not None:
+        styles.append("background:" + _hex(br, bg, bb))
+    if spec.bold:
+        styles.append("font-weight:bold")
+    if spec.italics:
+        styles.append("font-style:italic")
+    decorations = []
+    if spec.underline:
+        decorations.append("underline")
+    if spec.strikethrough:
+        decorations.append("line-through")
+    if decorations:
+        styles.append("text-decoration:" + " ".join(decorations))
+    return ";".join(styles)
+
+
+def rows_to_html(rows: Sequence[Row], title: str = "") -> str:
+    lines = []
+    for row in rows:
+        line = []
+        for spec, text in row:
+            css = _css(spec)
+            text = html.escape(text)
+            if css:
+                line.append(f'<span style="{css}">{text}</span>')
+            else:
+                line.append(text)
+        lines.append("".join(line))
+
+    return "\n".join([
+        "<!DOCTYPE html>",
+        "<html>",
+        "<head>",
+        '<meta charset="utf-8">',
+        f"<title>{html.escape(title)}</title>",
+        "</head>",
+        '<body style="background:#000;color:#ddd">',
+        '<pre style="font-family:monospace">',
+        "\n".join(lines),
+        "</pre>",
+        "</body>",
+        "</html>",
+        "",
+    ])
+
+
+def rows_to_svg(rows: Sequence[Row], width: int, height: int,
+                char_width: float = 8.4, line_height: float = 17.0) -> str:
+    elements = []
+    for y, row in enumerate(rows):
+        col = 0
+        for spec, text in row:
+            text_width = calc_width(text, 0, len(text))
+            x = col * char_width
+            top = y * line_height
+            fill = "#dddddd"
+            attrs = []
+            if spec is not None:
+                fr, fg, fb, br, bg, bb = spec.get_rgb_values()
+                if br is not None:
+                    elements.append(
+                        f'<rect x="{x:.1f}" y="{top:.1f}" '
+                        f'width="{text_width * char_width:.1f}" '
+                        f'height="{line_height:.1f}" fill="{_hex(br, bg, bb)}"/>'
+                    )
+                if fr is not None:
+                    fill = _hex(fr, fg, fb)
+                if spec.bold:
+                    attrs.append('font-weight="bold"')
+                if spec.italics:
+                    attrs.append('font-style="italic"')
+                if spec.underline:
+                    attrs.append('text-decoration="underline"')
+            if text.strip() != "":
+                elements.append(
+                    f'<text x="{x:.1f}" y="{top + line_height * 0.8:.1f}" '
+                    f'fill="{fill}" {" ".join(attrs)} xml:space="preserve">'
+                    f'{html.escape(text)}</text>'
+                )
+            col += text_width
+
+    total_width = width * char_width
+    total_height = height * line_height
+    return "\n".join([
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{total_width:.0f}" '
+        f'height="{total_height:.0f}" font-family="monospace" font-size="14">',
+        '<rect width="100%" height="100%" fill="#000000"/>',
+        "\n".join(elements),
+        "</svg>",
+        "",
+    ])
+
+
+def encode_rows(rows: Sequence[Row], fmt: str, width: int, height: int,
+                title: str = "") -> str:
+    """Encode the rendered rows in the provided export format
+    """
+    if fmt == "ansi":
+        return rows_to_ansi(rows)
+    elif fmt == "html":
+        return rows_to_html(rows, title=title)
+    elif fmt == "svg":
+        return rows_to_svg(rows, width, height)
+    raise ValueError(f"Unsupported export format {fmt!r}")
+
+
+# Presentations that have already been loaded within a worker process
+_WORKER_PRESENTATIONS: Dict[str, "lookatme.pres.Presentation"] = {}
+
+
+def _load_presentation(deck_path: str, options: Dict) -> "lookatme.pres.Presentation":
+    pres = _WORKER_PRESENTATIONS.get(deck_path, None)
+    if pres is None:
+        if lookatme.config.LOG is None:
+            lookatme.config.LOG = lookatme.log.create_null_log()
+        with open(deck_path, "r") as f:
+            pres = lookatme.pres.Presentation(
+                f,
+                options["theme"],
+                options["code_style"],
+                preload_extensions=options["extensions"],
+                # source-declared extensions would require interactive
+                # confirmation, so only explicitly provided ones are loaded
+                safe=True,
+                no_ext_warn=True,
+                ignore_ext_failure=options["ignore_ext_failure"],
+            )
+        _WORKER_PRESENTATIONS[deck_path] = pres
+
+    # several decks may be exported by the same worker
+    lookatme.config.STYLE = pres.styles
+    lookatme.config.SLIDE_SOURCE_DIR = os.path.dirname(deck_path)
+    return pres
+
+
+def export_slides(deck_path: str, slide_numbers: Iterable[int], out_dir: str,
+                  options: Dict) -> List[str]:
+    """Export the provided slides of a single deck. This is run within the
+    worker processes.
+
+    :returns: The list of written file paths
+    """
+    pres = _load_presentation(deck_path, options)
+    fmt = options["format"]
+    width, height = options["width"], options["height"]
+
+    res = []
+    for slide_number in slide_numbers:
+        slide = pres.slides[slide_number]
+        rows = canvas_rows(render_slide_canvas(slide, width, height))
+        out_path = os.path.join(
+            out_dir,
+            "slide_{:04d}{}".format(slide_number + 1, EXPORT_FORMATS[fmt]),
+        )
+        title = "{} - slide {}".format(pres.meta.get("title", ""), slide_number + 1)
+        with open(out_path, "w", encoding="utf-8") as f:
+            f.write(encode_rows(rows, fmt, width, height, title=title))
+        res.append(out_path)
+
+    return res
+
+
+def _slide_chunks(num_slides: int, jobs: int) -> List[List[int]]:
+    # several chunks per worker keeps the pool busy when decks have
+    # different numbers of slides
+    chunk_size = max(1, num_slides // (jobs * 4))
+    return [
+        list(range(start, min(start + chunk_size, num_slides)))
+        for start in range(0, num_slides, chunk_size)
+    ]
+
+
+def export_deck_start(deck_path: str, out_dir: str, options: Dict,
+                      jobs: int) -> Tuple[List[List[int]], List[str]]:
+    """Parse a deck and export its first chunk of slides. This is run within
+    the worker processes, so that decks are never parsed by the parent
+    process.
+
+    :returns: tuple of (the remaining chunks of slide numbers, the list of
+        written file paths)
+    """
+    pres = _load_presentation(deck_path, options)
+    chunks = _slide_chunks(len(pres.slides), jobs)
+    if len(chunks) == 0:
+        return [], []
+    return chunks[1:], export_slides(deck_path, chunks[0], out_dir, options)
+
+
+def _deck_out_dirs(deck_paths: Sequence[str], output_dir: str) -> List[str]:
+    res = []
+    used = set()
+    for deck_path in deck_paths:
+        name = os.path.splitext(os.path.basename(deck_path))[0]
+        unique_name = name
+        count = 1
+        while unique_name in used:
+            count += 1
+            unique_name = f"{name}_{count}"
+        used.add(unique_name)
+        res.append(os.path.join(output_dir, unique_name))
+    return res
+
+
+def export_decks(deck_paths: Sequence[str], output_dir: str, fmt: str = "ansi",
+                 width: int = 100, height: int = 30, theme: str = "dark",
+                 code_style: Optional[str] = None,
+                 extensions: Optional[List[str]] = None,
+                 ignore_ext_failure: bool = False,
+                 jobs: Optional[int] = None) -> List[str]:
+    """Export every slide of every deck to ``output_dir``, writing the slides
+    of each deck into a subdirectory named after the deck.
+
+    Each deck is parsed by one of a pool of ``jobs`` worker processes
+    (defaults to the number of CPUs), which also renders the first chunk of
+    its slides. The remaining chunks are then spread across the pool. With
+    ``jobs=1`` everything is rendered in the current process.
+
+    :returns: The list of written file paths
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format {fmt!r}")
+
+    jobs = jobs or os.cpu_count() or 1
+    options = {
+        "format": fmt,
+        "width": width,
+        "height": height,
+        "theme": theme,
+        "code_style": code_style,
+        "extensions": extensions or [],
+        "ignore_ext_failure": ignore_ext_failure,
+    }
+
+    deck_paths = [os.path.abspath(x) for x in deck_paths]
+    decks = list(zip(deck_paths, _deck_out_dirs(deck_paths, output_dir)))
+    for _, out_dir in decks:
+        os.makedirs(out_dir, exist_ok=True)
+
+    res: List[str] = []
+    if jobs == 1:
+        for deck_path, out_dir in decks:
+            chunks, written = export_deck_start(deck_path, out_dir, options, jobs)
+            res += written
+            for slide_numbers in chunks:
+                res += export_slides(deck_path, slide_numbers, out_dir, options)
+        return res
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+        start_futures = {
+            executor.submit(export_deck_start, deck_path, out_dir, options, jobs): idx
+            for idx, (deck_path, out_dir) in enumerate(decks)
+        }
+        # deck index -> (written paths of the first chunk, futures of the
+        # remaining chunks)
+        deck_results: Dict[int, Tuple[List[str], List[concurrent.futures.Future]]] = {}
+        for future in concurrent.futures.as_completed(start_futures):
+            idx = start_futures[future]
+            deck_path, out_dir = decks[idx]
+            chunks, written = future.result()
+            deck_results[idx] = (written, [
+                executor.submit(export_slides, deck_path, x, out_dir, options)
+                for x in chunks
+            ])
+
+        for idx in range(len(decks)):
+            written, chunk_futures = deck_results[idx]
+            res += written
+            for future in chunk_futures:
+                res += future.result()
+    return res
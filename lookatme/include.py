@@ -0,0 +1,216 @@
+"""
+This module defines the include directive. A block-level
+``<!-- include: path.md -->`` comment is replaced with the tokens of the
+included markdown file.
+
+Included files are lexed once and cached by path, modification time, and
+content hash, so fragments shared by several decks (or included several
+times) are only lexed again when they change. The includes between files are
+tracked in a dependency graph, which is used to detect cycles and to find the
+files affected by a changed fragment.
+
+The lexed tokens of documents that include other files are cached as well,
+so when only an included fragment changed, the fragment is lexed again and
+the including document is only expanded and split into slides again.
+"""
+
+
+import copy
+import hashlib
+import os
+import re
+from typing import Dict, List, Optional, Set, Tuple
+
+import mistune
+
+from lookatme.exceptions import IncludeError
+
+INCLUDE_RE = re.compile(r"^\s*<!--\s*include:\s*(?P<path>.+?)\s*-->\s*$")
+
+# (st_mtime_ns, st_size)
+StatKey = Tuple[int, int]
+
+
+def include_path(token: Dict) -> Optional[str]:
+    """Return the path of an include directive token, or None if the token is
+    not an include directive
+    """
+    if token["type"] != "close_html":
+        return None
+    match = INCLUDE_RE.match(token["text"])
+    if match is None:
+        return None
+    return match.group("path")
+
+
+def _stat_key(path: str) -> Optional[StatKey]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class IncludedFile(object):
+    """A lexed, included markdown file
+    """
+
+    def __init__(self, path: str, stat_key: StatKey, digest: str, tokens: List[Dict]):
+        self.path = path
+        self.stat_key = stat_key
+        self.digest = digest
+        self.tokens = tokens
+
+
+class IncludeCache(object):
+    """Caches lexed included files and the dependency graph of includes
+    """
+
+    def __init__(self):
+        self.files: Dict[str, IncludedFile] = {}
+        #: file -> the files it directly includes. Top-level documents
+        #: without a path use the key ``""``.
+        self.edges: Dict[str, List[str]] = {}
+        #: The number of times an included file was lexed
+        self.lex_count = 0
+        #: document path -> (content digest, lexed tokens) of documents that
+        #: include other files
+        self.documents: Dict[str, Tuple[str, List[Dict]]] = {}
+
+    def get(self, path: str) -> IncludedFile:
+        """Return the lexed included file. The file is only read again if its
+        modification time or size changed, and only lexed again if its
+        content changed.
+        """
+        stat_key = _stat_key(path)
+        if stat_key is None:
+            raise IncludeError(f"Included file not found: {path}")
+
+        cached = self.files.get(path, None)
+        if cached is not None and cached.stat_key == stat_key:
+            return cached
+
+        with open(path, "r") as f:
+            data = f.read()
+        digest = hashlib.sha1(data.encode("utf-8")).hexdigest()
+        if cached is not None and cached.digest == digest:
+            cached.stat_key = stat_key
+            return cached
+
+        self.lex_count += 1
+        tokens = mistune.Markdown().block.parse(data, {})
+        included = IncludedFile(path, stat_key, digest, tokens)
+        self.files[path] = included
+        return included
+
+    def lex_document(self, data: str, source_path: Optional[str] = None) -> List[Dict]:
+        """Lex the markdown document. The tokens of documents with a path that
+        include other files are cached by content, since these documents are
+        parsed again whenever one of their included files changes.
+        """
+        if not source_path:
+            return mistune.Markdown().block.parse(data, {})
+
+        key = os.path.abspath(source_path)
+        digest = hashlib.sha1(data.encode("utf-8")).hexdigest()
+        cached = self.documents.get(key, None)
+        if cached is None or cached[0] != digest:
+            tokens = mistune.Markdown().block.parse(data, {})
+            if not any(include_path(x) is not None for x in tokens):
+                self.documents.pop(key, None)
+                return tokens
+            cached = (digest, tokens)
+            self.documents[key] = cached
+        # tokens are modified while splitting and rendering slides
+        return [dict(x) for x in cached[1]]
+
+    def expand(self, tokens: List[Dict], source_path: Optional[str] = None,
+               base_dir: Optional[str] = None) -> List[Dict]:
+        """Replace the include directives in ``tokens`` with the tokens of the
+        included files. Relative paths are relative to ``base_dir``, which
+        defaults to the directory of ``source_path``.
+        """
+        key = os.path.abspath(source_path) if source_path else ""
+        if base_dir is None:
+            base_dir = os.path.dirname(key) if key else os.getcwd()
+
+        if not any(include_path(x) is not None for x in tokens):
+            self.edges.pop(key, None)
+            return tokens
+        return self._expand(tokens, key, base_dir, [key])
+
+    def _expand(self, tokens: List[Dict], key: str, base_dir: str,
+                stack: List[str]) -> List[Dict]:
+        res: List[Dict] = []
+        includes: List[str] = []
+        for token in tokens:
+            rel_path = include_path(token)
+            if rel_path is None:
+                res.append(token)
+                continue
+
+            path = os.path.abspath(os.path.join(base_dir, os.path.expanduser(rel_path)))
+            if path not in includes:
+                includes.append(path)
+            if path in stack:
+                cycle = stack[stack.index(path):] + [path]
+                raise IncludeError("Include cycle: " + " -> ".join(cycle))
+
+            included = self.get(path)
+            res += self._expand(
+                copy.deepcopy(included.tokens),
+                path,
+                os.path.dirname(path),
+                stack + [path],
+            )
+
+        self.edges[key] = includes
+        return res
+
+    def dependencies(self, source_path: Optional[str]) -> Set[str]:
+        """Return all files (directly or indirectly) included by the file
+        """
+        key = os.path.abspath(source_path) if source_path else ""
+        res: Set[str] = set()
+        to_visit = list(self.edges.get(key, []))
+        while len(to_visit) > 0:
+            path = to_visit.pop()
+            if path in res:
+                continue
+            res.add(path)
+            to_visit += self.edges.get(path, [])
+        return res
+
+    def dependents(self, path: str) -> Set[str]:
+        """Return all files that (directly or indirectly) include the file
+        """
+        path = os.path.abspath(path)
+        return {x for x in self.edges if path in self.dependencies(x or None)}
+
+    def fingerprint(self, source_path: Optional[str]) -> Tuple:
+        """Return the modification state of all files included by the file.
+        The fingerprint changes if any of the included files changed.
+        """
+        return tuple(sorted(
+            (x, _stat_key(x)) for x in self.dependencies(source_path)
+        ))
+
+    def subgraph(self, source_path: Optional[str]) -> Dict[str, List[str]]:
+        """Return the edges of the dependency graph reachable from the file
+        """
+        key = os.path.abspath(source_path) if source_path else ""
+        return {
+            x: list(self.edges[x])
+            for x in [key] + sorted(self.dependencies(source_path))
+            if x in self.edges
+        }
+
+    def add_edges(self, edges: Dict[str, List[str]]):
+        """Add edges to the dependency graph, e.g. edges recorded in a worker
+        process
+        """
+        self.edges.update(edges)
+
+
+#: The include cache shared by everything parsed in this process
+INCLUDES = IncludeCache()
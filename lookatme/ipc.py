@@ -0,0 +1,98 @@
+"""
+This module defines the message framing used between lookatme processes. Each
+message is a JSON object prefixed with its length. Messages sent over Unix
+sockets may also carry file descriptors.
+"""
+
+
+import array
+import json
+import socket
+import struct
+from typing import Dict, List, Optional, Tuple
+
+_HEADER = struct.Struct("!I")
+_MAX_FDS = 3
+
+
+def send_message(sock: socket.socket, msg: Dict, fds: Optional[List[int]] = None) -> int:
+    """Send a length-prefixed JSON message, optionally passing file
+    descriptors along with it
+
+    :returns: The number of bytes sent
+    """
+    data = json.dumps(msg).encode("utf-8")
+    data = _HEADER.pack(len(data)) + data
+    total = len(data)
+    if fds:
+        ancillary = [(
+            socket.SOL_SOCKET,
+            socket.SCM_RIGHTS,
+            array.array("i", fds).tobytes(),
+        )]
+        sent = sock.sendmsg([data], ancillary)
+        data = data[sent:]
+    if data:
+        sock.sendall(data)
+    return total
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    res = b""
+    while len(res) < size:
+        chunk = sock.recv(size - len(res))
+        if not chunk:
+            raise EOFError("Connection closed")
+        res += chunk
+    return res
+
+
+def recv_message(sock: socket.socket) -> Tuple[Dict, List[int]]:
+    """Receive a message sent with :any:`send_message`
+
+    :returns: tuple of (message, received file descriptors)
+    """
+    fds = array.array("i")
+    header, ancillary, _flags, _addr = sock.recvmsg(
+        _HEADER.size,
+        socket.CMSG_LEN(_MAX_FDS * fds.itemsize),
+    )
+    if not header:
+        raise EOFError("Connection closed")
+
+    for level, kind, data in ancillary:
+        if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+            data = data[:len(data) - (len(data) % fds.itemsize)]
+            fds.frombytes(data)
+
+    header += _recv_exactly(sock, _HEADER.size - len(header))
+    size, = _HEADER.unpack(header)
+    msg = json.loads(_recv_exactly(sock, size).decode("utf-8"))
+    return msg, list(fds)
+
+
+def peer_uid(sock: socket.socket) -> Optional[int]:
+    """Return the user id of the process on the other end of a connected Unix
+    socket, using ``SO_PEERCRED`` (Linux) or ``LOCAL_PEERCRED`` (macOS and
+    BSDs). None is returned if the platform supports neither, in which case
+    the peer is unknown and callers must not trust it.
+    """
+    if hasattr(socket, "SO_PEERCRED"):
+        creds = sock.getsockopt(
+            socket.SOL_SOCKET,
+            socket.SO_PEERCRED,
+            struct.calcsize("3i"),
+        )
+        _pid, uid, _gid = struct.unpack("3i", creds)
+        return uid
+    if hasattr(socket, "LOCAL_PEERCRED"):
+        # struct xucred: u_int cr_version, uid_t cr_uid, short cr_ngroups,
+        # gid_t cr_groups[16]
+        creds = sock.getsockopt(
+            getattr(socket, "SOL_LOCAL", 0),
+            socket.LOCAL_PEERCRED,
+            struct.calcsize("IIh2x16I"),
+        )
+        _version, uid = struct.unpack("2I", creds[:struct.calcsize("2I")])
+        return uid
+    return None
@@ -0,0 +1,362 @@
+"""
+This module defines presenter/audience mirroring. A presenter broadcasts the
+frames drawn by its TUI to any number of viewers over a Unix or TCP socket.
+Only rows that changed since the last frame a viewer received are sent, and
+viewers paint the rows directly without parsing the deck.
+"""
+
+
+import os
+import socket
+import stat
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import urwid
+
+import lookatme.config
+import lookatme.export
+import lookatme.scheduler
+from lookatme.ipc import recv_message, send_message
+
+# (sequence number, (cols, rows), encoded rows, row hashes)
+Frame = Tuple[int, Tuple[int, int], List[str], List[int]]
+
+
+def parse_address(address: str) -> Tuple[int, object]:
+    """Parse a mirroring address. Addresses containing a ``/`` (or starting
+    with ``unix:``) are Unix socket paths, otherwise they are ``host:port``
+    TCP addresses. The host defaults to ``127.0.0.1``.
+
+    :returns: tuple of (socket family, socket address)
+    """
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address[len("unix:"):]
+    if "/" in address:
+        return socket.AF_UNIX, address
+
+    host, _, port = address.rpartition(":")
+    try:
+        port_num = int(port)
+    except ValueError:
+        raise ValueError(f"Invalid mirror address {address!r}, expected host:port or a socket path")
+    return socket.AF_INET, (host or "127.0.0.1", port_num)
+
+
+def encode_canvas(canvas: urwid.Canvas) -> List[str]:
+    """Encode each row of the canvas as ANSI text
+    """
+    return [lookatme.export.ansi_row(row) for row in lookatme.export.canvas_rows(canvas)]
+
+
+def frame_delta(frame: Frame, sent_size: Optional[Tuple[int, int]],
+                sent_hashes: Optional[List[int]]) -> Dict:
+    """Create the message for ``frame``, including only the rows whose hashes
+    differ from ``sent_hashes``. A full frame is created if the size changed
+    or nothing has been sent yet.
+    """
+    seq, size, rows, hashes = frame
+    full = sent_hashes is None or sent_size != size or len(sent_hashes) != len(hashes)
+    if full:
+        changed = {idx: row for idx, row in enumerate(rows)}
+    else:
+        changed = {
+            idx: rows[idx]
+            for idx, (old, new) in enumerate(zip(sent_hashes, hashes))  # type: ignore
+            if old != new
+        }
+    return {
+        "seq": seq,
+        "size": list(size),
+        "full": full,
+        "rows": {str(idx): row for idx, row in changed.items()},
+    }
+
+
+def _is_socket(path: str) -> bool:
+    try:
+        return stat.S_ISSOCK(os.stat(path).st_mode)
+    except OSError:
+        return False
+
+
+class MirrorStats(object):
+    """Tracks the number of bytes sent per frame and the latency of viewers
+    acknowledging painted frames
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.frames = 0
+        self.bytes = 0
+        self.rows = 0
+        self.latency_total = 0.0
+        self.latency_count = 0
+        self.max_latency = 0.0
+
+    def add_frame(self, num_bytes: int, num_rows: int):
+        with self.lock:
+            self.frames += 1
+            self.bytes += num_bytes
+            self.rows += num_rows
+
+    def add_latency(self, latency: float):
+        with self.lock:
+            self.latency_total += latency
+            self.latency_count += 1
+            self.max_latency = max(self.max_latency, latency)
+
+    @property
+    def bytes_per_frame(self) -> float:
+        return self.bytes / self.frames if self.frames else 0.0
+
+    @property
+    def avg_latency(self) -> float:
+        return self.latency_total / self.latency_count if self.latency_count else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.frames} frames, {self.bytes_per_frame:.0f} bytes/frame, "
+            f"{self.rows / max(self.frames, 1):.1f} rows/frame, "
+            f"latency avg {self.avg_latency * 1000:.1f}ms "
+            f"max {self.max_latency * 1000:.1f}ms"
+        )
+
+
+class _Viewer(object):
+    """A connected viewer. Frames are sent from a dedicated thread so that a
+    slow viewer never blocks the UI thread. A viewer that falls behind skips
+    straight to the latest frame.
+    """
+
+    def __init__(self, broadcaster: "MirrorBroadcaster", sock: socket.socket):
+        self.broadcaster = broadcaster
+        self.sock = sock
+        self.closed = False
+        self.sent_size: Optional[Tuple[int, int]] = None
+        self.sent_hashes: Optional[List[int]] = None
+        self.sent_seq = -1
+        #: Frame sequence number to the time it was sent, shared by the
+        #: writer and reader threads and guarded by ``in_flight_lock``
+        self.in_flight: Dict[int, float] = {}
+        self.in_flight_lock = threading.Lock()
+        self._log = broadcaster._log
+
+        threading.Thread(target=self._write_loop, daemon=True).start()
+        threading.Thread(target=self._read_loop, daemon=True).start()
+
+    def _write_loop(self):
+        try:
+            while True:
+                frame = self.broadcaster.wait_for_frame(self.sent_seq)
+                if frame is None or self.closed:
+                    break
+                msg = frame_delta(frame, self.sent_size, self.sent_hashes)
+                if not msg["full"] and len(msg["rows"]) == 0:
+                    self.sent_seq = frame[0]
+                    continue
+                with self.in_flight_lock:
+                    self.in_flight[frame[0]] = time.monotonic()
+                num_bytes = send_message(self.sock, msg)
+                self.broadcaster.stats.add_frame(num_bytes, len(msg["rows"]))
+                self.sent_seq, self.sent_size, _, self.sent_hashes = frame
+        except OSError as e:
+            self._log.debug(f"Viewer disconnected: {e}")
+        finally:
+            self.close()
+
+    def _read_loop(self):
+        try:
+            while True:
+                msg, _ = recv_message(self.sock)
+                ack = msg.get("ack", -1)
+                with self.in_flight_lock:
+                    sent_at = self.in_flight.pop(ack, None)
+                    # frames skipped by the viewer will never be acknowledged
+                    for seq in [x for x in self.in_flight if x < ack]:
+                        del self.in_flight[seq]
+                if sent_at is not None:
+                    self.broadcaster.stats.add_latency(time.monotonic() - sent_at)
+        except (OSError, EOFError, ValueError):
+            pass
+        finally:
+            self.close()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            # wakes up the reader thread, which close() alone does not
+            self.sock.shutdown(socket.SHUT_RDWR)
+            self.sock.close()
+        except OSError:
+            pass
+        self.broadcaster.remove_viewer(self)
+
+
+class MirrorBroadcaster(object):
+    """Broadcasts the frames drawn by a presenter's TUI to connected viewers
+    """
+
+    #: Log the mirroring stats every this many broadcast frames
+    STATS_INTERVAL = 100
+
+    def __init__(self, address: str):
+        """Create a new MirrorBroadcaster
+
+        :param str address: The Unix socket path or ``host:port`` to listen on
+        """
+        self.address = address
+        self.stats = MirrorStats()
+        self.viewers: List[_Viewer] = []
+        self._cond = threading.Condition()
+        self._frame: Optional[Frame] = None
+        self._seq = 0
+        self._closed = False
+        self._sock: Optional[socket.socket] = None
+        self._log = lookatme.config.get_log().getChild("MIRROR")
+
+    def start(self):
+        """Start listening for viewers
+        """
+        family, sock_addr = parse_address(self.address)
+        if family == socket.AF_UNIX and os.path.lexists(sock_addr):  # type: ignore
+            # only sockets left over from a previous broadcast are replaced
+            if not _is_socket(sock_addr):  # type: ignore
+                raise ValueError(f"{sock_addr} exists and is not a socket")
+            os.unlink(sock_addr)  # type: ignore
+        self._sock = socket.socket(family, socket.SOCK_STREAM)
+        if family != socket.AF_UNIX:
+            self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind(sock_addr)
+        self._sock.listen(16)
+        self._log.info(f"Broadcasting on {self.address}")
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+
+    def attach(self, loop):
+        """Broadcast every frame drawn by the provided
+        :any:`lookatme.scheduler.ScheduledMainLoop`
+        """
+        loop.redraw_scheduler.add_frame_listener(self.on_frame)
+
+    def stop(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._sock is not None:
+            self._sock.close()
+            family, sock_addr = parse_address(self.address)
+            if family == socket.AF_UNIX and _is_socket(sock_addr):  # type: ignore
+                os.unlink(sock_addr)  # type: ignore
+        for viewer in list(self.viewers):
+            viewer.close()
+        self._log.info(f"Mirroring stats: {self.stats.summary()}")
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn, _ = self._sock.accept()  # type: ignore
+            except OSError:
+                break
+            if conn.family != socket.AF_UNIX:
+                conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            with self._cond:
+                self.viewers.append(_Viewer(self, conn))
+            self._log.debug(f"Viewer connected, {len(self.viewers)} total")
+            # frames are only encoded while viewers are connected, so draw
+            # one for the new viewer
+            lookatme.scheduler.request_redraw()
+
+    def remove_viewer(self, viewer: _Viewer):
+        with self._cond:
+            if viewer in self.viewers:
+                self.viewers.remove(viewer)
+
+    def on_frame(self, loop):
+        """Called on the UI thread after each drawn frame. The topmost widget
+        was just rendered, so rendering it again returns urwid's cached canvas.
+        """
+        if len(self.viewers) == 0:
+            return
+        canvas = loop.widget.render(loop.screen_size, focus=True)
+        self.publish(canvas)
+
+    def publish(self, canvas: urwid.Canvas):
+        """Publish a new frame to all viewers
+        """
+        rows = encode_canvas(canvas)
+        hashes = [hash(x) for x in rows]
+        with self._cond:
+            self._seq += 1
+            self._frame = (self._seq, (canvas.cols(), canvas.rows()), rows, hashes)
+            self._cond.notify_all()
+
+        if self._seq % self.STATS_INTERVAL == 0:
+            self._log.info(f"Mirroring stats: {self.stats.summary()}")
+
+    def wait_for_frame(self, last_seq: int) -> Optional[Frame]:
+        """Block until a frame newer than ``last_seq`` is available
+
+        :returns: The newest frame, or None if the broadcaster was stopped
+        """
+        with self._cond:
+            while not self._closed and (self._frame is None or self._frame[0] <= last_seq):
+                self._cond.wait()
+            if self._closed:
+                return None
+            return self._frame
+
+
+class MirrorViewer(object):
+    """Paints the frames broadcast by a presenter onto this terminal
+    """
+
+    def __init__(self, address: str, output=None):
+        self.address = address
+        self.output = output or sys.stdout
+        self.rows: Dict[int, str] = {}
+
+    def connect(self) -> socket.socket:
+        family, sock_addr = parse_address(self.address)
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.connect(sock_addr)
+        if family != socket.AF_UNIX:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return sock
+
+    def paint(self, msg: Dict):
+        """Paint the changed rows of a single frame
+        """
+        out = []
+        if msg["full"]:
+            self.rows.clear()
+            out.append("\x1b[0m\x1b[2J")
+        for idx, row in msg["rows"].items():
+            idx = int(idx)
+            self.rows[idx] = row
+            out.append(f"\x1b[{idx + 1};1H{row}")
+        self.output.write("".join(out))
+        self.output.flush()
+
+    def run(self):
+        """Paint frames until the presenter goes away
+        """
+        sock = self.connect()
+        self.output.write("\x1b[?1049h\x1b[?25l")
+        try:
+            while True:
+                try:
+                    msg, _ = recv_message(sock)
+                except EOFError:
+                    break
+                self.paint(msg)
+                send_message(sock, {"ack": msg["seq"]})
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.output.write("\x1b[0m\x1b[?25h\x1b[?1049l")
+            self.output.flush()
+            sock.close()
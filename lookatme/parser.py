@@ -3,12 +3,12 @@ This module defines the parser for the markdown presentation file
 """
 
 
+import copy
 import re
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 from typing import AnyStr, Callable, Dict, List, Tuple
 
-import mistune
-
+import lookatme.include
 from lookatme.schemas import MetaSchema
 from lookatme.slide import Slide
 from lookatme.tutorial import tutor
@@ -23,14 +23,49 @@ def is_progressive_slide_delimiter_token(token):
     return token["type"] == "close_html" and re.match(r'<!--\s*stop\s*-->', token["text"])
 
 
+#: The number of validated metadata values to keep cached
+META_CACHE_SIZE = 64
+
+# YAML metadata text -> validated metadata
+_META_CACHE: "OrderedDict[str, Dict]" = OrderedDict()
+
+
+def load_meta(yaml_data: str) -> Dict:
+    """Validate the YAML metadata of a presentation. Validated metadata is
+    cached by its text, so unchanged metadata is not validated again when a
+    presentation is reloaded.
+
+    :param str yaml_data: The YAML metadata, or an empty string
+    :returns: The metadata, which the caller may modify
+    """
+    meta = _META_CACHE.get(yaml_data, None)
+    if meta is None:
+        if yaml_data == "":
+            meta = MetaSchema().load_partial_styles({}, partial=True)
+        else:
+            meta = MetaSchema().loads_partial_styles(yaml_data, partial=True)
+        _META_CACHE[yaml_data] = meta
+        while len(_META_CACHE) > META_CACHE_SIZE:
+            _META_CACHE.popitem(last=False)
+    else:
+        _META_CACHE.move_to_end(yaml_data)
+    return copy.deepcopy(meta)
+
+
 class Parser(object):
     """A parser for markdown presentation files
     """
 
-    def __init__(self, single_slide=False):
+    def __init__(self, single_slide=False, source_path=None, includes=None):
         """Create a new Parser instance
+
+        :param str source_path: The path of the parsed file. Included files
+            are relative to its directory (optional)
+        :param IncludeCache includes: The cache of included files (optional)
         """
         self._single_slide = single_slide
+        self._source_path = source_path
+        self._includes = includes or lookatme.include.INCLUDES
 
     def parse(self, input_data):
         """Parse the provided input data into a Presentation object
@@ -50,10 +85,8 @@ class Parser(object):
         :returns: tuple of (remaining_data, slide)
         """
         # slides are delimited by ---
-        md = mistune.Markdown()
-
-        state = {}
-        tokens = md.block.parse(input_data, state)
+        tokens = self._includes.lex_document(input_data, self._source_path)
+        tokens = self._includes.expand(tokens, self._source_path)
 
         num_hrules, hinfo = self._scan_for_smart_split(tokens)
         keep_split_token = True
@@ -253,15 +286,13 @@ class Parser(object):
                 break
 
         if not found_first:
-            return input_data, MetaSchema().load_partial_styles({}, partial=True)
+            return input_data, load_meta("")
 
         new_input = input_data[skipped_chars:]
         if len(yaml_data) == 0:
-            return new_input, MetaSchema().load_partial_styles({}, partial=True)
+            return new_input, load_meta("")
 
-        yaml_data = "\n".join(yaml_data)
-        data = MetaSchema().loads_partial_styles(yaml_data, partial=True)
-        return new_input, data
+        return new_input, load_meta("\n".join(yaml_data))
 
     @tutor(
         "general",
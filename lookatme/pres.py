@@ -3,19 +3,49 @@ Defines Presentation specific objects
 """
 
 
+import asyncio
+import concurrent.futures
+import hashlib
 import os
 import threading
 import time
+from typing import Dict, List, Optional, Tuple
 
 import lookatme.ascii_art
 import lookatme.config
 import lookatme.contrib
+import lookatme.include
+import lookatme.mirror
 import lookatme.prompt
+import lookatme.render.asciinema
+import lookatme.scheduler
+import lookatme.search
 import lookatme.themes
 import lookatme.tui
 from lookatme.parser import Parser
+from lookatme.slide import Slide
 from lookatme.tutorial import tutor
 
+#: Input files are only parsed in parallel if their combined size is at least
+#: this many characters, since starting worker processes is not free
+PARALLEL_PARSE_MIN_SIZE = 256 * 1024
+
+
+def _parse_source(data, single_slide, source_path=None):
+    """Parse a single input file in a worker process. The include graph
+    recorded in the worker is returned along with the parse results.
+    """
+    parser = Parser(single_slide=single_slide, source_path=source_path)
+    meta, slides = parser.parse(data)
+    return meta, slides, lookatme.include.INCLUDES.subgraph(source_path)
+
+
+def _mod_time(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
 
 @tutor(
     "general",
@@ -41,18 +71,33 @@ class Presentation(object):
 
     def __init__(self, input_stream, theme, style_override=None, live_reload=False,
                  single_slide=False, preload_extensions=None, safe=False,
-                 no_ext_warn=False, ignore_ext_failure=False):
+                 no_ext_warn=False, ignore_ext_failure=False, max_fps=30,
+                 broadcast=None, record=None, use_asyncio=False):
         """Creates a new Presentation
 
         :param stream input_stream: An input stream from which to read the
-            slide data
+            slide data, or a list of input streams that are presented as one
+            continuous deck
+        :param int max_fps: The maximum number of frames per second to redraw
+            the screen at
+        :param str broadcast: The Unix socket path or ``host:port`` to mirror
+            the presentation to viewers on (optional)
+        :param str record: The path of an asciinema cast file to record the
+            session to (optional)
+        :param bool use_asyncio: Run the TUI on an asyncio event loop. Input
+            files are then watched by an asyncio task instead of a thread.
         """
+        if isinstance(input_stream, (list, tuple)):
+            input_streams = list(input_stream)
+        else:
+            input_streams = [input_stream]
+
         self.preload_extensions = preload_extensions or []
-        self.input_filename = None
-        if hasattr(input_stream, "name"):
+        self.input_filenames = [getattr(x, "name", None) for x in input_streams]
+        self.input_filename = self.input_filenames[0]
+        if self.input_filename is not None:
             lookatme.config.SLIDE_SOURCE_DIR = os.path.dirname(
-                input_stream.name)
-            self.input_filename = input_stream.name
+                self.input_filename)
 
         self.style_override = style_override
         self.live_reload = live_reload
@@ -61,50 +106,124 @@ class Presentation(object):
         self.safe = safe
         self.no_ext_warn = no_ext_warn
         self.ignore_ext_failure = ignore_ext_failure
+        self.max_fps = max_fps
+        self.broadcast = broadcast
+        self.record = record
+        self.use_asyncio = use_asyncio
         self.initial_load_complete = False
+        self.search_index = lookatme.search.SlideIndex()
+
+        # input index -> source data
+        self.sources: List[str] = [x.read() for x in input_streams]
+        # input index -> ((digest, include fingerprint), meta, pristine slides)
+        self.parsed_sources: Dict[int, Tuple[Tuple, Dict, List[Slide]]] = {}
 
         self.theme_mod = __import__(
             "lookatme.themes." + theme, fromlist=[theme])
 
-        if self.live_reload:
+        if self.live_reload and not self.use_asyncio:
             self.reload_thread = threading.Thread(target=self.reload_watcher)
             self.reload_thread.daemon = True
             self.reload_thread.start()
 
-        self.reload(data=input_stream.read())
+        self.reload(data=self.sources[0])
         self.initial_load_complete = True
 
+    def _watched_inputs(self) -> Dict[int, str]:
+        return {
+            idx: path
+            for idx, path in enumerate(self.input_filenames)
+            if path is not None and os.path.isfile(path)
+        }
+
+    def _changed_inputs(self, watched: Dict[int, str],
+                        last_mod_times: Dict[str, Optional[float]]) -> List[int]:
+        """Return the indices of the watched input files that changed since
+        the last call, updating ``last_mod_times``
+        """
+        deps = {
+            idx: {path} | lookatme.include.INCLUDES.dependencies(path)
+            for idx, path in watched.items()
+        }
+        changed_paths = set()
+        for dep_path in set().union(*deps.values()):
+            curr_mod_time = _mod_time(dep_path)
+            if dep_path not in last_mod_times:
+                last_mod_times[dep_path] = curr_mod_time
+            elif curr_mod_time != last_mod_times[dep_path]:
+                last_mod_times[dep_path] = curr_mod_time
+                changed_paths.add(dep_path)
+        return [idx for idx, paths in deps.items() if paths & changed_paths]
+
     def reload_watcher(self):
-        """Watch for changes to the input filename, automatically reloading
-        when the modified time has changed.
+        """Watch for changes to the input filenames and the files they
+        include, automatically reloading the input files whose modified time
+        (or the modified time of one of their included files) has changed.
         """
-        if self.input_filename is None:
+        watched = self._watched_inputs()
+        if len(watched) == 0:
             return
 
-        last_mod_time = os.path.getmtime(self.input_filename)
+        last_mod_times: Dict[str, Optional[float]] = {}
         while True:
             try:
-                curr_mod_time = os.path.getmtime(self.input_filename)
-                if curr_mod_time != last_mod_time:
-                    self.get_tui().reload()
-                    self.get_tui().loop.draw_screen()
-                    last_mod_time = curr_mod_time
+                changed = self._changed_inputs(watched, last_mod_times)
+                if len(changed) > 0:
+                    # the TUI may only be modified from the UI thread
+                    lookatme.scheduler.run_on_ui_thread(self.get_tui().reload, changed)
             except Exception:
                 pass
             finally:
                 time.sleep(0.25)
 
-    def reload(self, data=None):
+    async def watch_inputs(self):
+        """The asyncio version of :any:`reload_watcher`. The modified times
+        are checked in an executor, and the presentation is reloaded on the
+        event loop, which is the UI thread.
+        """
+        watched = self._watched_inputs()
+        if len(watched) == 0:
+            return
+
+        loop = asyncio.get_event_loop()
+        last_mod_times: Dict[str, Optional[float]] = {}
+        while True:
+            try:
+                changed = await loop.run_in_executor(
+                    None, self._changed_inputs, watched, last_mod_times)
+                if len(changed) > 0:
+                    self.get_tui().reload(changed)
+                    lookatme.scheduler.request_redraw()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                pass
+            await asyncio.sleep(0.25)
+
+    def reload(self, data=None, changed=None):
         """Reload this presentation
 
-        :param str data: The data to render for this slide deck (optional)
+        :param str data: The data to render for this slide deck (optional).
+            If the presentation has several input files, this is the data of
+            the first file.
+        :param list changed: The indices of the input files to re-read
+            (optional). All input files that have a filename are re-read if
+            this is not provided.
         """
-        if data is None:
-            with open(str(self.input_filename), "r") as f:
-                data = f.read()
+        if data is not None:
+            self.sources[0] = data
+        else:
+            for idx, path in enumerate(self.input_filenames):
+                if path is None or (changed is not None and idx not in changed):
+                    continue
+                with open(str(path), "r") as f:
+                    self.sources[idx] = f.read()
 
-        parser = Parser(single_slide=self.single_slide)
-        self.meta, self.slides = parser.parse(data)
+        self.parse_sources()
+        self.meta, self.slides = self.combine_sources()
+        # index the slides before they are rendered, since rendering may
+        # modify their tokens
+        self.search_index.update(self.slides)
 
         # only load extensions once! Live editing does not support
         # auto-extension reloading
@@ -133,6 +252,89 @@ class Presentation(object):
 
         self.initial_load_complete = True
 
+    def parse_sources(self):
+        """Parse the input files whose content changed since they were last
+        parsed. Several large files are parsed in parallel in worker
+        processes.
+
+        Files are also parsed again when one of the files they include
+        changed. Their lexed tokens are reused in that case (see
+        :any:`lookatme.include`), except for files that were parsed in a
+        worker process.
+        """
+        to_parse = {}
+        for idx, data in enumerate(self.sources):
+            # files are parsed again if any of the files they include changed
+            digest = (
+                hashlib.sha1(data.encode("utf-8")).hexdigest(),
+                lookatme.include.INCLUDES.fingerprint(self.input_filenames[idx]),
+            )
+            cached = self.parsed_sources.get(idx, None)
+            if cached is None or cached[0] != digest:
+                to_parse[idx] = (digest, data)
+
+        total_size = sum(len(x[1]) for x in to_parse.values())
+        if len(to_parse) > 1 and total_size >= PARALLEL_PARSE_MIN_SIZE:
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=min(len(to_parse), os.cpu_count() or 1),
+            ) as pool:
+                results = []
+                for meta, slides, edges in pool.map(
+                    _parse_source,
+                    [x[1] for x in to_parse.values()],
+                    [self.single_slide] * len(to_parse),
+                    [self.input_filenames[x] for x in to_parse],
+                ):
+                    lookatme.include.INCLUDES.add_edges(edges)
+                    results.append((meta, slides))
+        else:
+            results = [
+                self.parse(data, self.input_filenames[idx])
+                for idx, (_, data) in to_parse.items()
+            ]
+
+        for (idx, _), (meta, slides) in zip(to_parse.items(), results):
+            path = self.input_filenames[idx]
+            # the include graph is only known after parsing
+            digest = (
+                hashlib.sha1(self.sources[idx].encode("utf-8")).hexdigest(),
+                lookatme.include.INCLUDES.fingerprint(path),
+            )
+            if path is not None:
+                for slide in slides:
+                    slide.source_dir = os.path.dirname(path)
+            self.parsed_sources[idx] = (digest, meta, slides)
+
+    def combine_sources(self):
+        """Combine the parsed input files into a single deck. Slides are
+        numbered continuously across files. The metadata of the first file is
+        used, with the extensions of all files.
+
+        :returns: tuple of (meta, slides)
+        """
+        meta = dict(self.parsed_sources[0][1])
+        extensions = list(meta.get("extensions", []))
+        slides = []
+        for idx in range(len(self.sources)):
+            _, file_meta, file_slides = self.parsed_sources[idx]
+            for ext in file_meta.get("extensions", []):
+                if ext not in extensions:
+                    extensions.append(ext)
+            slides += [x.copy(len(slides) + num) for num, x in enumerate(file_slides)]
+        if len(extensions) > 0:
+            meta["extensions"] = extensions
+        return meta, slides
+
+    def parse(self, data, source_path=None):
+        """Parse the presentation source into its meta and slides
+
+        :param str data: The markdown source of the presentation
+        :param str source_path: The path of the source (optional)
+        :returns: tuple of (meta, slides)
+        """
+        parser = Parser(single_slide=self.single_slide, source_path=source_path)
+        return parser.parse(data)
+
     def warn_exts(self, exts):
         """Warn about source-provided extensions that are to-be-loaded
         """
@@ -156,8 +358,31 @@ class Presentation(object):
     def run(self, start_slide=0):
         """Run the presentation!
         """
-        self.tui = lookatme.tui.create_tui(self, start_slide=start_slide)
-        self.tui.run()
+        recorder = None
+        if self.record is not None:
+            recorder = lookatme.render.asciinema.AsciinemaRecorder(
+                self.record,
+                title=self.meta.get("title", None) or None,
+            )
+
+        self.tui = lookatme.tui.create_tui(
+            self, start_slide=start_slide, recorder=recorder)
+        if self.live_reload and self.use_asyncio:
+            self.tui.loop.asyncio_loop.create_task(self.watch_inputs())
+
+        broadcaster = None
+        if self.broadcast is not None:
+            broadcaster = lookatme.mirror.MirrorBroadcaster(self.broadcast)
+            broadcaster.start()
+            broadcaster.attach(self.tui.loop)
+
+        try:
+            self.tui.run()
+        finally:
+            if broadcaster is not None:
+                broadcaster.stop()
+            if recorder is not None:
+                recorder.close()
 
     def get_tui(self) -> lookatme.tui.MarkdownTui:
         if self.tui is None:
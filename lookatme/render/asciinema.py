@@ -0,0 +1,176 @@
+"""
+Records lookatme sessions as asciinema v2 casts. The escape sequences urwid
+writes to the terminal are captured as they are flushed. urwid only redraws
+rows that changed, and the redraw scheduler caps the frame rate, so each
+event holds only the changed regions of the screen.
+"""
+
+
+import json
+import os
+import queue
+import threading
+import time
+from typing import List, Optional, Tuple
+
+import urwid
+import urwid.raw_display
+
+_CLOSE = object()
+
+
+class AsciinemaRecorder(object):
+    """Writes an asciinema v2 cast file from a background thread. Output that
+    arrives within ``min_interval`` seconds of the previous event is merged
+    into that event, which keeps casts of very chatty sessions (e.g.
+    embedded terminals) small.
+    """
+
+    def __init__(self, path: str, title: Optional[str] = None,
+                 min_interval: float = 1.0 / 30, buffer_size: int = 1 << 16):
+        """Create a new AsciinemaRecorder
+
+        :param str path: The path of the cast file to write
+        :param str title: The title stored in the cast header (optional)
+        :param float min_interval: Output closer together than this is
+            merged into a single event
+        :param int buffer_size: The size of the file write buffer
+        """
+        self.path = path
+        self.title = title
+        self.min_interval = min_interval
+        self.buffer_size = buffer_size
+        self.events_written = 0
+
+        self._queue: queue.Queue = queue.Queue()
+        self._start: Optional[float] = None
+        self._thread = threading.Thread(target=self._write_loop, daemon=True)
+        self._thread.start()
+
+    def _elapsed(self) -> float:
+        now = time.monotonic()
+        if self._start is None:
+            self._start = now
+        return now - self._start
+
+    def output(self, data: str):
+        """Record data written to the terminal. Safe to call from any thread.
+        """
+        if data:
+            self._queue.put(("o", self._elapsed(), data))
+
+    def resize(self, cols: int, rows: int):
+        """Record the terminal size. The first size recorded is used in the
+        cast header.
+        """
+        self._queue.put(("r", self._elapsed(), f"{cols}x{rows}"))
+
+    def close(self):
+        """Write all pending events and close the cast file
+        """
+        self._queue.put(_CLOSE)
+        self._thread.join()
+
+    def _header(self, size: Tuple[int, int]) -> str:
+        header = {
+            "version": 2,
+            "width": size[0],
+            "height": size[1],
+            "timestamp": int(time.time()),
+            "env": {
+                "TERM": os.environ.get("TERM", ""),
+                "SHELL": os.environ.get("SHELL", ""),
+            },
+        }
+        if self.title:
+            header["title"] = self.title
+        return json.dumps(header) + "\n"
+
+    def _write_loop(self):
+        with open(self.path, "w", encoding="utf-8", buffering=self.buffer_size) as f:
+            size: Optional[Tuple[int, int]] = None
+            # events recorded before the size is known
+            early: List[list] = []
+            pending: Optional[list] = None
+
+            def write_event(event: list):
+                self.events_written += 1
+                f.write(json.dumps(event, ensure_ascii=False) + "\n")
+
+            while True:
+                try:
+                    # hold on to the pending event only while more output
+                    # could still be merged into it
+                    item = self._queue.get(
+                        timeout=self.min_interval if pending is not None else None)
+                except queue.Empty:
+                    write_event(pending)
+                    pending = None
+                    f.flush()
+                    continue
+
+                if item is _CLOSE:
+                    break
+                kind, timestamp, data = item
+
+                if size is None:
+                    if kind == "r":
+                        cols, rows = data.split("x")
+                        size = (int(cols), int(rows))
+                        f.write(self._header(size))
+                        for event in early:
+                            write_event(event)
+                        early = []
+                    else:
+                        early.append([round(timestamp, 6), kind, data])
+                    continue
+
+                if (
+                    pending is not None
+                    and kind == "o"
+                    and pending[1] == "o"
+                    and timestamp - pending[0] < self.min_interval
+                ):
+                    pending[2] += data
+                    continue
+
+                if pending is not None:
+                    write_event(pending)
+                pending = [round(timestamp, 6), kind, data]
+
+            if size is None and early:
+                f.write(self._header((80, 24)))
+                for event in early:
+                    write_event(event)
+            if pending is not None:
+                write_event(pending)
+
+
+class RecordingScreen(urwid.raw_display.Screen):
+    """A raw_display Screen that records everything written to the terminal
+    """
+
+    def __init__(self, recorder: AsciinemaRecorder, *args, **kwargs):
+        urwid.raw_display.Screen.__init__(self, *args, **kwargs)
+        self.recorder = recorder
+        self._recorded_size: Optional[Tuple[int, int]] = None
+        self._pending: List[str] = []
+
+    def get_cols_rows(self):
+        size = urwid.raw_display.Screen.get_cols_rows(self)
+        if size != self._recorded_size:
+            self._recorded_size = size
+            self.recorder.resize(*size)
+        return size
+
+    def write(self, data):
+        if isinstance(data, bytes):
+            data = data.decode("utf-8", errors="replace")
+        self._pending.append(data)
+        urwid.raw_display.Screen.write(self, data)
+
+    def flush(self):
+        urwid.raw_display.Screen.flush(self)
+        if self._pending:
+            self.recorder.output("".join(self._pending))
+            self._pending = []
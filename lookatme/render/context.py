@@ -0,0 +1,151 @@
+"""
+Defines the render context: the state that render functions share while the
+tokens of a slide are rendered, such as the list that is currently being
+rendered.
+
+The context is kept on the ``stack`` that is passed to every render function.
+Each container pushed onto the stack gets a new :any:`RenderContext` frame
+that links to the frame below it, so pushing a container is O(1) no matter how
+deeply lists and block quotes are nested.
+
+Widgets added to a container are collected in a plain list on its frame, and
+the container (an ``urwid.Pile`` or ``urwid.ListBox``) is filled once, when
+its frame is popped. This avoids the modification callbacks that urwid's
+monitored lists fire for every single append.
+"""
+
+
+from typing import Any, Dict, List, Optional
+
+import urwid
+
+from lookatme.utils import pile_or_listbox_add
+
+
+class ListState(object):
+    """The state of a list that is being rendered. List items and containers
+    nested within the list (e.g. block quotes) share the same state.
+    """
+    __slots__ = ("level", "ordered", "item_count", "max_marker_width", "start_token")
+
+    def __init__(self, level: int, ordered: bool, start_token: Dict[str, Any],
+                 max_marker_width: int = 2):
+        """Create a new ListState
+
+        :param int level: The 1-based nesting level of the list
+        :param bool ordered: If the list is an ordered list
+        :param dict start_token: The ``list_start`` token of the list
+        :param int max_marker_width: The width of the widest list marker
+        """
+        self.level = level
+        self.ordered = ordered
+        self.item_count = 0
+        self.max_marker_width = max_marker_width
+        self.start_token = start_token
+
+
+class RenderContext(object):
+    """A frame of the render context. The links between frames and the list
+    state of a frame never change once the frame is created.
+    """
+    __slots__ = ("parent", "container", "list_state", "depth", "widgets")
+
+    def __init__(self, parent: Optional["RenderContext"], container: Any,
+                 list_state: Optional[ListState] = None):
+        self.parent = parent
+        self.container = container
+        self.list_state = list_state
+        self.depth = 0 if parent is None else parent.depth + 1
+        #: The widgets that have not been added to the container yet, or
+        #: None once the container has been filled
+        self.widgets: Optional[List[urwid.Widget]] = []
+
+    @property
+    def in_list(self) -> bool:
+        return self.list_state is not None
+
+    def push(self, container: Any, list_state: Optional[ListState] = None) -> "RenderContext":
+        """Return a new frame for ``container`` on top of this one. The list
+        state is inherited unless a new one is provided.
+        """
+        return RenderContext(self, container, list_state or self.list_state)
+
+    def _ends_with_divider(self) -> bool:
+        if len(self.widgets) > 0:
+            return isinstance(self.widgets[-1], urwid.Divider)
+        if isinstance(self.container, urwid.ListBox):
+            body = self.container.body
+            return len(body) > 0 and isinstance(body[-1], urwid.Divider)
+        if isinstance(self.container, urwid.Pile):
+            contents = self.container.contents
+            return len(contents) > 0 and isinstance(contents[-1][0], urwid.Divider)
+        return False
+
+    def add(self, widgets):
+        """Add the widget/widgets to the container. Consecutive dividers are
+        collapsed into one.
+        """
+        if self.widgets is None:
+            # the container was already filled
+            pile_or_listbox_add(self.container, widgets)
+            return
+
+        if not isinstance(widgets, list):
+            widgets = [widgets]
+        for widget in widgets:
+            if isinstance(widget, urwid.Divider) and self._ends_with_divider():
+                continue
+            self.widgets.append(widget)
+
+    def flush(self):
+        """Fill the container with the collected widgets
+        """
+        if self.widgets is None:
+            return
+        widgets, self.widgets = self.widgets, None
+        if len(widgets) == 0:
+            return
+
+        if isinstance(self.container, urwid.ListBox):
+            self.container.body.extend(widgets)
+        elif isinstance(self.container, urwid.Pile):
+            options = self.container.options()
+            self.container.contents.extend([(w, options) for w in widgets])
+        else:
+            raise ValueError("Container was not listbox, nor pile")
+
+
+class RenderStack(list):
+    """The stack of containers that render functions add widgets to. Render
+    functions use it like a list, e.g. ``stack.append(urwid.Pile([]))`` and
+    ``stack.pop()``, and read the current :any:`RenderContext` with
+    ``stack.context``. Popped containers are filled with their widgets.
+    """
+
+    def __init__(self, root: Any):
+        list.__init__(self, [root])
+        self._contexts = [RenderContext(None, root)]
+
+    @property
+    def context(self) -> RenderContext:
+        """The render context of the top-most container
+        """
+        return self._contexts[-1]
+
+    def append(self, container: Any, list_state: Optional[ListState] = None):
+        """Push a container, optionally starting a new list
+        """
+        list.append(self, container)
+        self._contexts.append(self._contexts[-1].push(container, list_state))
+
+    def pop(self, index: int = -1) -> Any:
+        if index not in (-1, len(self) - 1):
+            raise ValueError("Only the top-most container can be popped")
+        self._contexts.pop().flush()
+        return list.pop(self)
+
+    def flush(self):
+        """Fill all containers that are still on the stack
+        """
+        for context in reversed(self._contexts):
+            context.flush()
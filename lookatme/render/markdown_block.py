@@ -14,41 +14,11 @@ import lookatme.render.markdown_inline as markdown_inline_renderer
 import lookatme.render.pygments as pygments_render
 import lookatme.utils as utils
 from lookatme.contrib import contrib_first
+from lookatme.render.context import ListState
 from lookatme.tutorial import tutor
 from lookatme.widgets.clickable_text import ClickableText
 
 
-def _meta(item):
-    if not hasattr(item, "meta"):
-        meta = {}
-        setattr(item, "meta", meta)
-    else:
-        meta = getattr(item, "meta")
-    return meta
-
-
-def _set_is_list(item, level=1, ordered=False):
-    _meta(item).update({
-        "is_list": True,
-        "list_level": level,
-        "ordered": ordered,
-        "item_count": 0,
-    })
-
-
-def _inc_item_count(item):
-    _meta(item)["item_count"] += 1
-    return _meta(item)["item_count"]
-
-
-def _is_list(item):
-    return _meta(item).get("is_list", False)
-
-
-def _list_level(item):
-    return _meta(item).get("list_level", 1)
-
-
 @contrib_first
 def render_newline(token, body, stack, loop):
     """Render a newline
@@ -222,14 +192,18 @@ def render_list_start(token, body, stack, loop):
     """
     res = urwid.Pile([])
 
-    in_list = _is_list(stack[-1])
+    parent_list = stack.context.list_state
+    in_list = parent_list is not None
     list_level = 1
     if in_list:
-        list_level = _list_level(stack[-1]) + 1
-    _set_is_list(res, list_level, ordered=token['ordered'])
-    _meta(res)['list_start_token'] = token
-    _meta(res)['max_list_marker_width'] = token.get('max_list_marker_width', 2)
-    stack.append(res)
+        list_level = parent_list.level + 1
+    list_state = ListState(
+        list_level,
+        token['ordered'],
+        token,
+        max_marker_width=token.get('max_list_marker_width', 2),
+    )
+    stack.append(res, list_state=list_state)
 
     widgets = []
     if not in_list:
@@ -247,8 +221,8 @@ def render_list_end(token, body, stack, loop):
     See :any:`lookatme.tui.SlideRenderer.do_render` for argument and return
     value descriptions.
     """
-    meta = _meta(stack[-1])
-    meta['list_start_token']['max_list_marker_width'] = meta['max_list_marker_width']
+    list_state = stack.context.list_state
+    list_state.start_token['max_list_marker_width'] = list_state.max_marker_width
     stack.pop()
 
 
@@ -347,13 +321,13 @@ def _list_item_start(token, body, stack, loop):
     See :any:`lookatme.tui.SlideRenderer.do_render` for argument and return
     value descriptions.
     """
-    list_level = _list_level(stack[-1])
-    curr_count = _inc_item_count(stack[-1])
+    list_state = stack.context.list_state
+    list_level = list_state.level
+    list_state.item_count += 1
+    curr_count = list_state.item_count
     pile = urwid.Pile(urwid.SimpleFocusListWalker([]))
 
-    meta = _meta(stack[-1])
-
-    if meta["ordered"]:
+    if list_state.ordered:
         numbering = config.get_style()["numbering"]
         list_marker_type = numbering.get(str(list_level), numbering["default"])
         sequence = {
@@ -367,9 +341,9 @@ def _list_item_start(token, body, stack, loop):
         list_marker = bullets.get(str(list_level), bullets["default"])
 
     marker_text = list_marker + " "
-    if len(marker_text) > meta["max_list_marker_width"]:
-        meta["max_list_marker_width"] = len(marker_text)
-    marker_col_width = meta["max_list_marker_width"]
+    if len(marker_text) > list_state.max_marker_width:
+        list_state.max_marker_width = len(marker_text)
+    marker_col_width = list_state.max_marker_width
 
     res = urwid.Text(("bold", marker_text))
     res = urwid.Columns([
@@ -575,13 +549,14 @@ def render_block_quote_end(token, body, stack, loop):
     See :any:`lookatme.tui.SlideRenderer.do_render` for additional argument and
     return value descriptions.
     """
-    pile = stack.pop()
-
     # remove leading/trailing divider if they were added to the pile
-    if isinstance(pile.contents[0][0], urwid.Divider):
-        pile.contents = pile.contents[1:]
-    if isinstance(pile.contents[-1][0], urwid.Divider):
-        pile.contents = pile.contents[:-1]
+    widgets = stack.context.widgets
+    if len(widgets) > 0 and isinstance(widgets[0], urwid.Divider):
+        del widgets[0]
+    if len(widgets) > 0 and isinstance(widgets[-1], urwid.Divider):
+        widgets.pop()
+
+    stack.pop()
 
 
 @tutor(
@@ -617,7 +592,7 @@ def render_block_quote_end(token, body, stack, loop):
         pygments_values=" ".join(pygments.styles.get_all_styles()),
     )
 )
-@contrib_first
+@contrib_first(lang_routed=True)
 def render_code(token, body, stack, loop):
     """Renders a code block using the Pygments library.
 
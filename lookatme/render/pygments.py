@@ -2,7 +2,13 @@
 """
 
 
+import collections
+import concurrent.futures
+import contextlib
+import threading
 import time
+import weakref
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import pygments
 import pygments.lexers
@@ -12,10 +18,39 @@ import urwid
 from pygments.formatter import Formatter
 
 import lookatme.config as config
+import lookatme.scheduler
+from lookatme.contrib import contrib_first
+from lookatme.widgets.code_block import MAX_ROWS, CodeBlock, split_lines
 
 LEXER_CACHE = {}
 STYLE_CACHE = {}
 FORMATTER_CACHE = {}
+#: Highlighted markup keyed by ``(text, lang, style_name)``, most recently used
+#: last
+HIGHLIGHT_CACHE: collections.OrderedDict = collections.OrderedDict()
+HIGHLIGHT_CACHE_SIZE = 512
+_CACHE_LOCK = threading.Lock()
+
+#: Code blocks with at least this many characters are highlighted in the
+#: background in progressive mode, see :any:`highlight_owner`
+PROGRESSIVE_MIN_SIZE = 8 * 1024
+
+#: Background highlighting continues for slides within this many slides of the
+#: current slide, and is cancelled for all other slides
+HIGHLIGHT_NEAR = 2
+
+#: The number of lexed tokens between checks for cancellation
+CANCEL_CHECK_INTERVAL = 512
+
+_POOL = concurrent.futures.ThreadPoolExecutor(
+    max_workers=1,
+    thread_name_prefix="lookatme-highlight",
+)
+_JOBS_LOCK = threading.Lock()
+_JOBS: Dict[Tuple[str, str, str], "HighlightJob"] = {}
+_CURRENT_SLIDE: Optional[int] = None
+_OWNER = threading.local()
+_CODE_ROWS = threading.local()
 
 
 def get_formatter(style_name):
@@ -44,6 +79,68 @@ def get_lexer(lang, default="text"):
     return lexer
 
 
+@contrib_first(lang_routed=True)
+def code_lang(token) -> Optional[str]:
+    """Return the language that the code block ``token`` will be highlighted
+    as. Extensions that render code blocks of their own languages, e.g. the
+    ``file_loader`` extension, may override this. None means that the code
+    block is not highlighted.
+    """
+    return token.get("lang", None) or "text"
+
+
+def code_langs(slides: Iterable) -> List[str]:
+    """Return the languages of the code blocks of the slides, in the order
+    they first appear, see :any:`code_lang`
+    """
+    res: List[str] = []
+    for slide in slides:
+        for token in slide.tokens:
+            if token["type"] != "code":
+                continue
+            lang = code_lang(token)
+            if lang is not None and lang not in res:
+                res.append(lang)
+    return res
+
+
+def prewarm(slides: Iterable, style_name: str):
+    """Create the lexers for the languages of the code blocks of the slides,
+    and the formatter for the style, so that highlighting the first code
+    block of each language does not have to
+    """
+    log = config.get_log()
+    start = time.time()
+    for lang in code_langs(slides):
+        if lang in LEXER_CACHE:
+            continue
+        lang_start = time.time()
+        lexer = get_lexer(lang)
+        # the first lex may still do one-time setup
+        list(lexer.get_tokens("x\n"))
+        log.debug(f"Pre-warmed the {lang!r} lexer in {time.time() - lang_start}s")
+
+    if style_name not in FORMATTER_CACHE:
+        style_start = time.time()
+        get_formatter(style_name)
+        log.debug(f"Pre-warmed the {style_name!r} formatter in {time.time() - style_start}s")
+    log.debug(f"Pre-warmed highlighting in {time.time() - start}s")
+
+
+def prewarm_in_background(slides: Iterable, style_name: str) -> threading.Thread:
+    """Run :any:`prewarm` in a background thread
+    """
+    def run():
+        try:
+            prewarm(slides, style_name)
+        except Exception as e:
+            config.get_log().exception(f"Could not pre-warm highlighting: {e}")
+
+    thread = threading.Thread(target=run, name="lookatme-prewarm", daemon=True)
+    thread.start()
+    return thread
+
+
 def get_style(style_name):
     style = STYLE_CACHE.get(style_name, None)
     if style is None:
@@ -52,25 +149,25 @@ def get_style(style_name):
     return style
 
 
-def render_text(text, lang="text", style_name=None, plain=False):
-    """Render the provided text with the pygments renderer
+def _highlight_markup(text, lang, style_name, cancelled=None):
+    """Lex and format the text. If ``cancelled`` is set while the text is
+    being lexed, None is returned.
     """
-    if style_name is None:
-        style_name = config.get_style()["style"]
-
     lexer = get_lexer(lang)
     formatter, style_bg = get_formatter(style_name)
 
     start = time.time()
     code_tokens = lexer.get_tokens(text)
-    config.get_log().debug(
-        f"Took {time.time()-start}s to render {len(text)} bytes")
 
     markup = []
-    for x in formatter.formatgenerator(code_tokens):
+    for idx, x in enumerate(formatter.formatgenerator(code_tokens)):
+        if cancelled is not None and idx % CANCEL_CHECK_INTERVAL == 0 and cancelled.is_set():
+            return None
         if style_bg:
             x[0].background = style_bg
         markup.append(x)
+    config.get_log().debug(
+        f"Took {time.time()-start}s to render {len(text)} bytes")
 
     if markup[-1][1] == "\n":
         markup = markup[:-1]
@@ -79,11 +176,208 @@ def render_text(text, lang="text", style_name=None, plain=False):
         markup = [(None, "")]
     elif markup[-1][1].endswith("\n"):
         markup[-1] = (markup[-1][0], markup[-1][1][:-1])
+    return markup
+
+
+def _cached_markup(key):
+    with _CACHE_LOCK:
+        markup = HIGHLIGHT_CACHE.get(key, None)
+        if markup is not None:
+            HIGHLIGHT_CACHE.move_to_end(key)
+        return markup
+
+
+def _cache_markup(key, markup):
+    with _CACHE_LOCK:
+        HIGHLIGHT_CACHE[key] = markup
+        if len(HIGHLIGHT_CACHE) > HIGHLIGHT_CACHE_SIZE:
+            HIGHLIGHT_CACHE.popitem(last=False)
+
+
+def highlight(text, lang="text", style_name=None):
+    """Return the highlighted urwid markup for the provided text. Results are
+    cached, so highlighting the same text again is nearly free.
+    """
+    if style_name is None:
+        style_name = config.get_style()["style"]
+
+    key = (text, lang, style_name)
+    markup = _cached_markup(key)
+    if markup is None:
+        markup = _highlight_markup(text, lang, style_name)
+        _cache_markup(key, markup)
+    return list(markup)
+
+
+@contextlib.contextmanager
+def highlight_owner(slide_num: Optional[int], progressive: Optional[bool] = None):
+    """Attribute the code blocks that are highlighted in the background while
+    in this context to the slide ``slide_num``
+
+    :param bool progressive: If True, large code blocks rendered in this
+        context are displayed as plain text at first, and are highlighted in
+        the background. Inherited from the enclosing context if None, and
+        off outside of any context.
+    """
+    old_owner = getattr(_OWNER, "slide_num", None)
+    old_progressive = getattr(_OWNER, "progressive", False)
+    _OWNER.slide_num = slide_num
+    if progressive is not None:
+        _OWNER.progressive = progressive
+    try:
+        yield
+    finally:
+        _OWNER.slide_num = old_owner
+        _OWNER.progressive = old_progressive
+
+
+@contextlib.contextmanager
+def code_block_rows(max_rows: Optional[int]):
+    """Limit the code blocks rendered on this thread in this context to
+    ``max_rows`` rows, scrolling longer code blocks. Code blocks are not
+    limited if ``max_rows`` is None, e.g. when exporting slides.
+    """
+    old_max_rows = getattr(_CODE_ROWS, "max_rows", MAX_ROWS)
+    _CODE_ROWS.max_rows = max_rows
+    try:
+        yield
+    finally:
+        _CODE_ROWS.max_rows = old_max_rows
+
+
+def _is_near(slide_num: Optional[int]) -> bool:
+    if slide_num is None or _CURRENT_SLIDE is None:
+        return True
+    return abs(slide_num - _CURRENT_SLIDE) <= HIGHLIGHT_NEAR
+
+
+class HighlightJob(object):
+    """Highlights a code block in the background, and swaps the highlighted
+    lines into the code blocks that display it once it is done
+    """
+
+    def __init__(self, key: Tuple[str, str, str]):
+        self.key = key
+        self.owners = set()
+        self.blocks: "weakref.WeakSet[CodeBlock]" = weakref.WeakSet()
+        self.future: Optional[concurrent.futures.Future] = None
+        self.cancelled = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self.future is not None
+
+    def is_near(self) -> bool:
+        return any(_is_near(x) for x in self.owners)
+
+    def start(self):
+        """Start highlighting. Must be called with ``_JOBS_LOCK`` held.
+        """
+        if self.future is None:
+            self.cancelled = threading.Event()
+            self.future = _POOL.submit(self.run, self.cancelled)
+
+    def cancel(self):
+        """Cancel highlighting. Must be called with ``_JOBS_LOCK`` held.
+        """
+        if self.future is not None:
+            self.cancelled.set()
+            self.future.cancel()
+            self.future = None
+
+    def run(self, cancelled: threading.Event):
+        text, lang, style_name = self.key
+        try:
+            markup = _highlight_markup(text, lang, style_name, cancelled)
+        except Exception as e:
+            config.get_log().exception(f"Could not highlight {lang} code: {e}")
+            return
+        if markup is None:
+            return
+
+        _cache_markup(self.key, markup)
+        with _JOBS_LOCK:
+            if _JOBS.get(self.key, None) is self:
+                del _JOBS[self.key]
+        lookatme.scheduler.run_on_ui_thread(self.apply, markup)
+
+    def apply(self, markup):
+        lines = split_lines(markup)
+        for block in list(self.blocks):
+            block.set_lines(lines)
+
+
+def highlight_in_background(block: CodeBlock, text: str, lang: str, style_name: str):
+    """Highlight the text in the background, and display the highlighted
+    lines in ``block`` once they are ready. The highlighting is attributed to
+    the slide set with :any:`highlight_owner`.
+    """
+    key = (text, lang, style_name)
+    with _JOBS_LOCK:
+        job = _JOBS.get(key, None)
+        if job is None:
+            job = HighlightJob(key)
+            _JOBS[key] = job
+        job.owners.add(getattr(_OWNER, "slide_num", None))
+        job.blocks.add(block)
+        if job.is_near():
+            job.start()
+
+
+def update_highlighting(current_slide: int):
+    """Continue (or restart) background highlighting for slides near
+    ``current_slide``, and cancel it for all other slides
+    """
+    global _CURRENT_SLIDE
+    with _JOBS_LOCK:
+        _CURRENT_SLIDE = current_slide
+        for job in _JOBS.values():
+            if job.is_near():
+                job.start()
+            else:
+                job.cancel()
+
+
+def _plain_lines(text):
+    # e.g. the file loader provides the file contents as bytes
+    if isinstance(text, bytes):
+        text = text.decode("utf-8", errors="replace")
+    if text.endswith("\n"):
+        text = text[:-1]
+    return text.split("\n")
+
+
+def render_text(text, lang="text", style_name=None, plain=False, progressive=None):
+    """Render the provided text with the pygments renderer. In progressive
+    mode, large code blocks that have not been highlighted yet are displayed
+    as plain text until they are highlighted in the background.
+
+    :param bool progressive: If progressive mode is used. Defaults to the
+        mode of the current :any:`highlight_owner` context.
+    """
+    if style_name is None:
+        style_name = config.get_style()["style"]
+    if progressive is None:
+        progressive = getattr(_OWNER, "progressive", False)
+
+    _, style_bg = get_formatter(style_name)
+    max_rows = getattr(_CODE_ROWS, "max_rows", MAX_ROWS)
+    key = (text, lang, style_name)
+    if not plain and progressive and len(text) >= PROGRESSIVE_MIN_SIZE \
+            and _cached_markup(key) is None:
+        block = CodeBlock(_plain_lines(text), max_rows=max_rows)
+        highlight_in_background(block, text, lang, style_name)
+        return urwid.AttrMap(block, urwid.AttrSpec("default", style_bg))
+
+    markup = highlight(text, lang=lang, style_name=style_name)
 
     if plain:
         return markup
     else:
-        return urwid.AttrMap(urwid.Text(markup), urwid.AttrSpec("default", style_bg))
+        return urwid.AttrMap(
+            CodeBlock(split_lines(markup), max_rows=max_rows),
+            urwid.AttrSpec("default", style_bg),
+        )
 
 
 class UrwidFormatter(Formatter):
@@ -0,0 +1,300 @@
+"""
+This module defines the redraw scheduler for lookatme. Screen redraws and UI
+updates requested from any thread are funneled through the scheduler, which
+coalesces them, runs them on the UI thread, and caps the number of frames
+drawn per second.
+"""
+
+
+import asyncio
+import collections
+import os
+import threading
+import time
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+import urwid
+
+import lookatme.config
+
+SCHEDULER: Optional["RedrawScheduler"] = None
+
+
+def get_scheduler() -> Optional["RedrawScheduler"]:
+    """Return the active :any:`RedrawScheduler`, or None if the TUI is not
+    running
+    """
+    return SCHEDULER
+
+
+def request_redraw():
+    """Request that the screen be redrawn. Safe to call from any thread. Does
+    nothing if the TUI is not running.
+    """
+    if SCHEDULER is not None:
+        SCHEDULER.request()
+
+
+def get_asyncio_loop() -> Optional[asyncio.AbstractEventLoop]:
+    """Return the asyncio event loop that the TUI runs on, or None if the TUI
+    is not running or does not use asyncio (see ``--asyncio``). Extensions may
+    schedule their own I/O on it, e.g. with ``loop.create_task()``.
+    """
+    if SCHEDULER is None:
+        return None
+    return SCHEDULER.asyncio_loop
+
+
+def run_on_ui_thread(fn: Callable, *args):
+    """Run ``fn(*args)`` on the UI thread and redraw the screen afterwards.
+    Safe to call from any thread. If the TUI is not running, ``fn`` is called
+    immediately.
+    """
+    if SCHEDULER is None:
+        fn(*args)
+    else:
+        SCHEDULER.call_soon(fn, *args)
+
+
+class RedrawScheduler(object):
+    """Coalesces redraw requests and UI callbacks from any thread and
+    services them on the UI thread, drawing at most ``max_fps`` frames per
+    second.
+    """
+
+    def __init__(self, loop: urwid.MainLoop, max_fps: int = 30):
+        """Create a new RedrawScheduler
+
+        :param urwid.MainLoop loop: The main loop whose screen is redrawn
+        :param int max_fps: The maximum number of frames to draw per second
+        """
+        self.loop = loop
+        #: The asyncio event loop of the main loop, or None if the main loop
+        #: does not run on asyncio
+        self.asyncio_loop: Optional[asyncio.AbstractEventLoop] = getattr(loop, "asyncio_loop", None)
+        self.min_interval = 1.0 / max(max_fps, 1)
+        self.frames_drawn = 0
+
+        self._lock = threading.Lock()
+        self._calls: Deque[Tuple[Callable, tuple]] = collections.deque()
+        self._redraw_requested = False
+        self._wake_pending = False
+        self._alarm = None
+        self._last_draw = 0.0
+        #: Set after a frame that was drawn by an alarm, see
+        #: :any:`ScheduledMainLoop.entering_idle`
+        self.skip_idle = False
+        self._ui_thread_id: Optional[int] = None
+        self._wake_fd: Optional[int] = None
+        self._frame_listeners: List[Callable[[urwid.MainLoop], None]] = []
+        self._log = lookatme.config.get_log().getChild("SCHEDULER")
+
+    def start(self):
+        """Start servicing requests. Must be called from the UI thread.
+        """
+        self._ui_thread_id = threading.get_ident()
+        if self.asyncio_loop is None:
+            self._wake_fd = self.loop.watch_pipe(self._on_wake)
+
+    def stop(self):
+        """Stop servicing requests from other threads
+        """
+        self._ui_thread_id = None
+        if self._wake_fd is not None:
+            self.loop.remove_watch_pipe(self._wake_fd)
+            self._wake_fd = None
+
+    def add_frame_listener(self, fn: Callable[[urwid.MainLoop], None]):
+        """Call ``fn(loop)`` on the UI thread after every drawn frame
+        """
+        self._frame_listeners.append(fn)
+
+    def request(self):
+        """Request a redraw. Multiple requests before the next frame result
+        in a single redraw.
+        """
+        with self._lock:
+            self._redraw_requested = True
+        self._wake()
+
+    def call_soon(self, fn: Callable, *args):
+        """Queue ``fn(*args)`` to be run on the UI thread before the next
+        frame is drawn
+        """
+        with self._lock:
+            self._calls.append((fn, args))
+            self._redraw_requested = True
+        self._wake()
+
+    def _wake(self):
+        if threading.get_ident() == self._ui_thread_id:
+            self._process()
+            return
+
+        with self._lock:
+            if self._wake_pending or self._ui_thread_id is None:
+                return
+            self._wake_pending = True
+        if self.asyncio_loop is not None:
+            self.asyncio_loop.call_soon_threadsafe(self._on_wake, None)
+        else:
+            os.write(self._wake_fd, b"!")
+
+    def _on_wake(self, _data):
+        with self._lock:
+            self._wake_pending = False
+        self._process()
+        # keep the pipe open
+        return True
+
+    def _process(self):
+        """Run all queued calls and schedule a redraw if one was requested.
+        Must only be called on the UI thread.
+        """
+        while True:
+            with self._lock:
+                if len(self._calls) == 0:
+                    break
+                fn, args = self._calls.popleft()
+            try:
+                fn(*args)
+            except Exception as e:
+                self._log.exception(f"Error running {fn!r} on the UI thread: {e}")
+
+        with self._lock:
+            if not self._redraw_requested or self._alarm is not None:
+                return
+
+        delay = self._last_draw + self.min_interval - time.monotonic()
+        if delay <= 0:
+            self._draw()
+        else:
+            self._alarm = self.loop.set_alarm_in(delay, self._alarm_fired)
+
+    def _alarm_fired(self, _loop, _user_data):
+        self._alarm = None
+        self._draw()
+        self.skip_idle = True
+
+    def _draw(self):
+        with self._lock:
+            if not self._redraw_requested:
+                return
+            self._redraw_requested = False
+
+        self._last_draw = time.monotonic()
+        if self.loop.screen.started:
+            self.frames_drawn += 1
+            urwid.MainLoop.draw_screen(self.loop)
+            for listener in self._frame_listeners:
+                try:
+                    listener(self.loop)
+                except Exception as e:
+                    self._log.exception(f"Error in frame listener {listener!r}: {e}")
+
+
+class AsyncioEventLoop(urwid.AsyncioEventLoop):
+    """An ``urwid.AsyncioEventLoop`` that enters idle once after file and
+    alarm callbacks have run, like urwid's select loop does. urwid's version
+    fakes idle by calling the idle callbacks 30 times per second, which would
+    redraw the screen even when nothing changed.
+    """
+
+    def __init__(self, **kwargs):
+        urwid.AsyncioEventLoop.__init__(self, **kwargs)
+        self._idle_callbacks: Dict[int, Callable] = {}
+        self._idle_handle = 0
+        self._idle_pending = False
+
+    def _schedule_idle(self):
+        if not self._idle_pending:
+            self._idle_pending = True
+            self._loop.call_soon(self._run_idle)
+
+    def _run_idle(self):
+        self._idle_pending = False
+        for callback in list(self._idle_callbacks.values()):
+            callback()
+
+    def _then_idle(self, callback: Callable) -> Callable:
+        def wrapper():
+            try:
+                callback()
+            finally:
+                self._schedule_idle()
+        return wrapper
+
+    def alarm(self, seconds, callback):
+        return urwid.AsyncioEventLoop.alarm(self, seconds, self._then_idle(callback))
+
+    def watch_file(self, fd, callback):
+        return urwid.AsyncioEventLoop.watch_file(self, fd, self._then_idle(callback))
+
+    def enter_idle(self, callback):
+        self._idle_handle += 1
+        self._idle_callbacks[self._idle_handle] = callback
+        self._schedule_idle()
+        return self._idle_handle
+
+    def remove_enter_idle(self, handle):
+        return self._idle_callbacks.pop(handle, None) is not None
+
+
+class ScheduledMainLoop(urwid.MainLoop):
+    """An ``urwid.MainLoop`` whose idle redraws go through a
+    :any:`RedrawScheduler` instead of happening after every event. If
+    ``use_asyncio`` is True, the main loop runs on a new asyncio event loop,
+    ``asyncio_loop``.
+    """
+
+    def __init__(self, *args, max_fps: int = 30, use_asyncio: bool = False, **kwargs):
+        self.asyncio_loop: Optional[asyncio.AbstractEventLoop] = None
+        if use_asyncio:
+            self.asyncio_loop = asyncio.new_event_loop()
+            kwargs["event_loop"] = AsyncioEventLoop(loop=self.asyncio_loop)
+        urwid.MainLoop.__init__(self, *args, **kwargs)
+        self.redraw_scheduler = RedrawScheduler(self, max_fps=max_fps)
+
+    def entering_idle(self):
+        # the main loop enters idle after every alarm, including the ones
+        # that draw throttled frames. Nothing changed since such a frame was
+        # drawn, so it must not request the next one.
+        if self.redraw_scheduler.skip_idle:
+            self.redraw_scheduler.skip_idle = False
+            return
+        if self.screen.started:
+            self.redraw_scheduler.request()
+
+    def process_input(self, keys):
+        self.redraw_scheduler.skip_idle = False
+        return urwid.MainLoop.process_input(self, keys)
+
+    def draw_screen(self):
+        """Request a redraw through the scheduler. Safe to call from any
+        thread.
+        """
+        self.redraw_scheduler.request()
+
+    def run(self):
+        global SCHEDULER
+        self.redraw_scheduler.start()
+        SCHEDULER = self.redraw_scheduler
+        try:
+            urwid.MainLoop.run(self)
+        finally:
+            SCHEDULER = None
+            self.redraw_scheduler.stop()
+            if self.asyncio_loop is not None:
+                self._close_asyncio_loop()
+
+    def _close_asyncio_loop(self):
+        """Cancel the tasks that are still running, e.g. file watchers, and
+        close the asyncio event loop
+        """
+        tasks = asyncio.all_tasks(self.asyncio_loop)
+        for task in tasks:
+            task.cancel()
+        if len(tasks) > 0:
+            self.asyncio_loop.run_until_complete(
+                asyncio.gather(*tasks, return_exceptions=True))
+        self.asyncio_loop.close()
@@ -0,0 +1,165 @@
+"""
+This module defines full-text search across the slides of a presentation.
+An inverted index maps normalized words to the slides that contain them, and
+prefix lookups use a sorted word list, so each keystroke of an interactive
+search only costs a few binary searches and set intersections.
+"""
+
+
+import bisect
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from lookatme.slide import Slide
+
+WORD_RE = re.compile(r"\w+")
+
+# token fields that hold displayed text
+_TEXT_FIELDS = ("text", "header", "cells")
+
+
+def normalize_words(text: str) -> List[str]:
+    """Split text into casefolded words
+    """
+    return [x.casefold() for x in WORD_RE.findall(text)]
+
+
+def _strings(value) -> Iterable[str]:
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _strings(item)
+
+
+def slide_words(slide: Slide) -> Tuple[Set[str], Set[str], str]:
+    """Return the words of the slide, the words of its headings, and the text
+    of its first heading
+    """
+    words: Set[str] = set()
+    heading_words: Set[str] = set()
+    first_heading = ""
+    for token in slide.tokens:
+        for field in _TEXT_FIELDS:
+            for text in _strings(token.get(field, None)):
+                token_words = normalize_words(text)
+                words.update(token_words)
+                if token["type"] == "heading":
+                    heading_words.update(token_words)
+                    if first_heading == "":
+                        first_heading = text
+    return words, heading_words, first_heading
+
+
+class SlideIndex(object):
+    """An inverted index of the words in a presentation's slides
+    """
+
+    def __init__(self):
+        #: word -> slide numbers containing the word
+        self.postings: Dict[str, Set[int]] = {}
+        #: word -> slide numbers with the word in a heading
+        self.heading_postings: Dict[str, Set[int]] = {}
+        #: slide number -> the first heading of the slide
+        self.titles: Dict[int, str] = {}
+
+        self._slide_hashes: Dict[int, str] = {}
+        self._slide_words: Dict[int, Tuple[Set[str], Set[str]]] = {}
+        # words extracted from slides, keyed by content hash. Slides that only
+        # moved (e.g. a slide was inserted before them) are not re-scanned.
+        self._words_by_hash: Dict[str, Tuple[Set[str], Set[str], str]] = {}
+        self._sorted_words: Optional[List[str]] = None
+
+    def update(self, slides: List[Slide]) -> int:
+        """Update the index to match ``slides``. Only slides whose content
+        changed are re-indexed.
+
+        :returns: The number of slides that were re-indexed
+        """
+        changed = 0
+        for slide in slides:
+            content_hash = slide.content_hash
+            if self._slide_hashes.get(slide.number, None) == content_hash:
+                continue
+            self._remove(slide.number)
+
+            extracted = self._words_by_hash.get(content_hash, None)
+            if extracted is None:
+                extracted = slide_words(slide)
+            words, heading_words, title = extracted
+            self._add(slide.number, words, heading_words)
+            self._slide_hashes[slide.number] = content_hash
+            self.titles[slide.number] = title
+            changed += 1
+
+        for number in [x for x in self._slide_hashes if x >= len(slides)]:
+            self._remove(number)
+
+        self._words_by_hash = {
+            self._slide_hashes[num]: (words, heading_words, self.titles[num])
+            for num, (words, heading_words) in self._slide_words.items()
+        }
+        return changed
+
+    def _add(self, number: int, words: Set[str], heading_words: Set[str]):
+        for word in words:
+            if word not in self.postings:
+                self._sorted_words = None
+            self.postings.setdefault(word, set()).add(number)
+        for word in heading_words:
+            self.heading_postings.setdefault(word, set()).add(number)
+        self._slide_words[number] = (words, heading_words)
+
+    def _remove(self, number: int):
+        words, heading_words = self._slide_words.pop(number, (set(), set()))
+        for word in words:
+            postings = self.postings[word]
+            postings.discard(number)
+            if len(postings) == 0:
+                del self.postings[word]
+                self._sorted_words = None
+        for word in heading_words:
+            postings = self.heading_postings[word]
+            postings.discard(number)
+            if len(postings) == 0:
+                del self.heading_postings[word]
+        self._slide_hashes.pop(number, None)
+        self.titles.pop(number, None)
+
+    def _words_with_prefix(self, prefix: str) -> Iterable[str]:
+        if self._sorted_words is None:
+            self._sorted_words = sorted(self.postings)
+        idx = bisect.bisect_left(self._sorted_words, prefix)
+        while idx < len(self._sorted_words) and self._sorted_words[idx].startswith(prefix):
+            yield self._sorted_words[idx]
+            idx += 1
+
+    def search(self, query: str) -> List[int]:
+        """Return the numbers of the slides that contain every word of the
+        query. Each query word matches words it is a prefix of, so results
+        narrow as the query is typed. Slides whose headings match are listed
+        first.
+        """
+        terms = normalize_words(query)
+        if len(terms) == 0:
+            return []
+
+        matches: Optional[Set[int]] = None
+        heading_matches: Optional[Set[int]] = None
+        for term in terms:
+            term_matches: Set[int] = set()
+            term_heading_matches: Set[int] = set()
+            for word in self._words_with_prefix(term):
+                term_matches |= self.postings[word]
+                term_heading_matches |= self.heading_postings.get(word, set())
+
+            matches = term_matches if matches is None else matches & term_matches
+            if heading_matches is None:
+                heading_matches = term_heading_matches
+            else:
+                heading_matches = heading_matches & term_heading_matches
+            if len(matches) == 0:
+                return []
+
+        heading_matches = heading_matches & matches  # type: ignore
+        return sorted(heading_matches) + sorted(matches - heading_matches)  # type: ignore
@@ -0,0 +1,478 @@
+"""
+This module defines the lookatme render daemon. The daemon keeps imported
+modules, parsed decks, and highlighted code warm between invocations. Clients
+connect over a Unix socket and pass along their terminal's file descriptors,
+and the daemon forks a child that presents the deck directly on the client's
+terminal.
+"""
+
+
+import hashlib
+import io
+import os
+import selectors
+import signal
+import socket
+import stat
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+import pygments.lexers
+import pygments.util
+
+import lookatme.config
+import lookatme.include
+import lookatme.log
+import lookatme.parser
+import lookatme.render.pygments as pygments_render
+from lookatme.ipc import peer_uid, recv_message, send_message
+from lookatme.pres import Presentation
+
+
+def _default_socket_dir() -> str:
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR", "")
+    if runtime_dir != "" and os.path.isdir(runtime_dir):
+        return os.path.join(runtime_dir, "lookatme")
+    return os.path.join(tempfile.gettempdir(), "lookatme-{}".format(os.getuid()))
+
+
+#: The directory of the default socket. It is only accessible by the user
+#: that runs the daemon.
+DEFAULT_SOCKET_DIR = _default_socket_dir()
+DEFAULT_SOCKET_PATH = os.path.join(DEFAULT_SOCKET_DIR, "render.sock")
+
+#: The environment variables of the client that the presenting child uses.
+#: Other variables (e.g. secrets) are never sent to the daemon.
+FORWARDED_ENV = [
+    "TERM", "COLORTERM", "TERMINFO", "LANG", "LANGUAGE", "LC_ALL", "LC_CTYPE",
+    "LC_MESSAGES", "TZ", "COLUMNS", "LINES", "LOOKATME_EXTS",
+]
+
+
+def client_env() -> Dict[str, str]:
+    """Return the environment variables that are sent to the daemon
+    """
+    return {k: v for k, v in os.environ.items() if k in FORWARDED_ENV}
+
+
+def ensure_private_dir(path: str):
+    """Create the directory ``path`` with mode 0700 if it does not exist, and
+    make sure that it is only accessible by the current user
+
+    :raises RuntimeError: If the directory is owned by another user or is
+        accessible by other users
+    """
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid():
+        raise RuntimeError(f"{path} is not a directory owned by the current user")
+    if info.st_mode & 0o077 != 0:
+        raise RuntimeError(f"{path} must not be accessible by other users (mode 0700)")
+
+
+def is_private_dir(path: str) -> bool:
+    """Return True if the directory is owned by the current user and is not
+    accessible by other users, see :any:`ensure_private_dir`
+    """
+    try:
+        info = os.lstat(path)
+    except OSError:
+        return False
+    return (
+        stat.S_ISDIR(info.st_mode)
+        and info.st_uid == os.getuid()
+        and info.st_mode & 0o077 == 0
+    )
+
+
+def peer_allowed(sock: socket.socket, socket_path: str) -> Tuple[bool, str]:
+    """Return if the process on the other end of the socket runs as the
+    current user, and the reason if it does not.
+
+    Platforms that do not provide the peer's credentials fail closed: the peer
+    is only trusted if the socket is in a private (0700) directory of the
+    current user, since no other user can reach a socket in that directory.
+    """
+    uid = peer_uid(sock)
+    if uid is None:
+        if is_private_dir(os.path.dirname(os.path.abspath(socket_path))):
+            return True, ""
+        return False, "the peer is unknown and the socket is not in a private directory"
+    if uid != os.getuid():
+        return False, f"the peer runs as another user (uid {uid})"
+    return True, ""
+
+
+# builtin extensions are imported ahead of time so that clients do not pay
+# for the imports. They are only loaded (used) if a client asks for them.
+WARM_MODULES = [
+    "lookatme.contrib.file_loader",
+    "lookatme.contrib.table_file",
+    "lookatme.contrib.terminal",
+]
+
+
+class CachedDeck(object):
+    """A parsed deck held by the daemon
+    """
+
+    def __init__(self, path: str, data: str, meta: Dict, slides: List):
+        self.path = path
+        self.data = data
+        self.digest = hashlib.sha1(data.encode("utf-8")).hexdigest()
+        self.meta = meta
+        self.slides = slides
+        self.stat_key: Optional[Tuple[float, int]] = None
+        self.include_fingerprint: Tuple = ()
+        self.last_used = time.monotonic()
+
+
+class DeckCache(object):
+    """Parsed decks keyed by their path and parse options. Decks are re-read
+    when the file changes, and are only re-parsed if the content changed.
+    Decks that have not been used for ``ttl`` seconds are evicted.
+    """
+
+    def __init__(self, ttl: float = 600):
+        self.ttl = ttl
+        self.decks: Dict[Tuple[str, bool], CachedDeck] = {}
+
+    def get(self, path: str, single_slide: bool = False) -> CachedDeck:
+        stat = os.stat(path)
+        stat_key = (stat.st_mtime, stat.st_size)
+        key = (path, single_slide)
+
+        deck = self.decks.get(key, None)
+        includes_changed = (
+            deck is not None
+            and deck.include_fingerprint != lookatme.include.INCLUDES.fingerprint(path)
+        )
+        if deck is None or deck.stat_key != stat_key or includes_changed:
+            with open(path, "r") as f:
+                data = f.read()
+            digest = hashlib.sha1(data.encode("utf-8")).hexdigest()
+            if deck is None or deck.digest != digest or includes_changed:
+                parser = lookatme.parser.Parser(single_slide=single_slide, source_path=path)
+                meta, slides = parser.parse(data)
+                deck = CachedDeck(path, data, meta, slides)
+                deck.include_fingerprint = lookatme.include.INCLUDES.fingerprint(path)
+                self.decks[key] = deck
+            deck.stat_key = stat_key
+
+        deck.last_used = time.monotonic()
+        return deck
+
+    def evict_idle(self) -> List[str]:
+        """Evict all decks that have not been used recently
+
+        :returns: The paths of the evicted decks
+        """
+        now = time.monotonic()
+        stale = [k for k, v in self.decks.items() if now - v.last_used > self.ttl]
+        for key in stale:
+            del self.decks[key]
+        return [x[0] for x in stale]
+
+
+def warm_highlighting(deck: CachedDeck, theme: str, style_override: Optional[str]):
+    """Highlight all code blocks of the deck so that the highlighted markup is
+    cached when the deck is rendered
+    """
+    theme_mod = __import__("lookatme.themes." + theme, fromlist=[theme])
+    styles = lookatme.config.get_style_with_precedence(
+        theme_mod,
+        deck.meta.get("styles", {}),
+        style_override,
+    )
+    for slide in deck.slides:
+        for token in slide.tokens:
+            if token["type"] != "code":
+                continue
+            lang = token.get("lang", None) or "text"
+            # code blocks for extensions (e.g. ``file``) are not highlighted
+            # as-is
+            try:
+                pygments.lexers.get_lexer_by_name(lang)
+            except pygments.util.ClassNotFound:
+                continue
+            pygments_render.highlight(token["text"], lang=lang, style_name=styles["style"])
+
+
+class ServerPresentation(Presentation):
+    """A presentation whose initial parse comes from the daemon's deck cache
+    """
+
+    def __init__(self, deck: CachedDeck, *args, **kwargs):
+        self.deck = deck
+        Presentation.__init__(self, *args, **kwargs)
+
+    def parse(self, data, source_path=None):
+        if data == self.deck.data:
+            return self.deck.meta, self.deck.slides
+        return Presentation.parse(self, data, source_path)
+
+
+class RenderServer(object):
+    """The lookatme render daemon
+    """
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET_PATH,
+                 idle_timeout: float = 1800, deck_ttl: float = 600):
+        """Create a new RenderServer
+
+        :param str socket_path: The path of the Unix socket to listen on
+        :param float idle_timeout: Shut down after no clients have connected
+            for this many seconds
+        :param float deck_ttl: Evict parsed decks that have not been used for
+            this many seconds
+        """
+        self.socket_path = socket_path
+        self.idle_timeout = idle_timeout
+        self.deck_cache = DeckCache(ttl=deck_ttl)
+        self.children: Set[int] = set()
+        self.last_activity = time.monotonic()
+        self._sock: Optional[socket.socket] = None
+        self._log = lookatme.config.get_log().getChild("SERVER")
+
+    def warm(self):
+        """Import everything a client may need
+        """
+        for module_name in WARM_MODULES:
+            __import__(module_name)
+
+    def _bind(self) -> socket.socket:
+        if os.path.dirname(self.socket_path) == DEFAULT_SOCKET_DIR:
+            ensure_private_dir(DEFAULT_SOCKET_DIR)
+
+        if os.path.exists(self.socket_path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.socket_path)
+            except OSError:
+                # left over from a server that did not exit cleanly
+                os.unlink(self.socket_path)
+            else:
+                raise RuntimeError(f"A server is already listening on {self.socket_path}")
+            finally:
+                probe.close()
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)
+        try:
+            sock.bind(self.socket_path)
+        finally:
+            os.umask(old_umask)
+        sock.listen(16)
+        return sock
+
+    def serve_forever(self):
+        """Serve clients until the server has been idle for ``idle_timeout``
+        seconds
+        """
+        self.warm()
+        self._sock = self._bind()
+        self._log.info(f"Listening on {self.socket_path}")
+
+        selector = selectors.DefaultSelector()
+        selector.register(self._sock, selectors.EVENT_READ)
+        try:
+            while True:
+                if selector.select(timeout=1.0):
+                    conn, _ = self._sock.accept()
+                    self.last_activity = time.monotonic()
+                    try:
+                        allowed, reason = peer_allowed(conn, self.socket_path)
+                        if not allowed:
+                            self._log.warning(f"Refused a client: {reason}")
+                        else:
+                            self.handle(conn)
+                    except Exception as e:
+                        self._log.exception(f"Error handling client: {e}")
+                    finally:
+                        conn.close()
+
+                self._reap_children()
+                for path in self.deck_cache.evict_idle():
+                    self._log.debug(f"Evicted idle deck {path}")
+
+                if len(self.children) > 0:
+                    self.last_activity = time.monotonic()
+                elif time.monotonic() - self.last_activity > self.idle_timeout:
+                    self._log.info("Idle timeout reached, shutting down")
+                    break
+        finally:
+            selector.close()
+            self._sock.close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    def _reap_children(self):
+        for pid in list(self.children):
+            try:
+                done_pid, _ = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                done_pid = pid
+            if done_pid != 0:
+                self.children.discard(pid)
+
+    def handle(self, conn: socket.socket):
+        """Handle a single client connection. The deck is parsed (or fetched
+        from the cache) in the server process, then a child is forked to
+        present it on the client's terminal.
+        """
+        msg, fds = recv_message(conn)
+        try:
+            if len(fds) != 3:
+                raise ValueError("Expected the client's stdin, stdout, and stderr")
+
+            start = time.time()
+            deck = self.deck_cache.get(msg["path"], msg["single_slide"])
+            warm_highlighting(deck, msg["theme"], msg["code_style"])
+            self._log.debug(f"Prepared {deck.path} in {time.time() - start}s")
+        except Exception as e:
+            send_message(conn, {"error": str(e)})
+            for fd in fds:
+                os.close(fd)
+            return
+
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                self._sock.close()
+                code = run_client_child(conn, msg, fds, deck)
+            finally:
+                os._exit(code)
+
+        self.children.add(pid)
+        for fd in fds:
+            os.close(fd)
+
+
+def run_client_child(conn: socket.socket, msg: Dict, fds: List[int],
+                     deck: CachedDeck) -> int:
+    """Present the deck on the client's terminal. This runs in the child
+    process forked by the server.
+
+    :returns: The exit code
+    """
+    for target_fd, fd in enumerate(fds):
+        os.dup2(fd, target_fd)
+        os.close(fd)
+    os.chdir(msg["cwd"])
+    os.environ.update({k: v for k, v in msg["env"].items() if k in FORWARDED_ENV})
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+
+    if msg["debug"]:
+        lookatme.config.LOG = lookatme.log.create_log(msg["log_path"])
+    else:
+        lookatme.config.LOG = lookatme.log.create_null_log()
+
+    send_message(conn, {"pid": os.getpid()})
+
+    # exit if the client goes away
+    def watch_client():
+        try:
+            conn.recv(1)
+        except OSError:
+            pass
+        os.kill(os.getpid(), signal.SIGTERM)
+    threading.Thread(target=watch_client, daemon=True).start()
+
+    code = 0
+    try:
+        input_stream = io.StringIO(deck.data)
+        input_stream.name = deck.path
+        pres = ServerPresentation(
+            deck,
+            input_stream,
+            msg["theme"],
+            msg["code_style"],
+            live_reload=msg["live_reload"],
+            single_slide=msg["single_slide"],
+            preload_extensions=msg["extensions"],
+            safe=msg["safe"],
+            no_ext_warn=msg["no_ext_warn"],
+            ignore_ext_failure=msg["ignore_ext_failure"],
+            max_fps=msg["max_fps"],
+            broadcast=msg.get("broadcast", None),
+            record=msg.get("record", None),
+            use_asyncio=msg.get("use_asyncio", False),
+        )
+        pres.run()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    except Exception as e:
+        lookatme.config.get_log().exception(f"Error presenting {deck.path}: {e}")
+        print(f"Error: {e}", file=sys.stderr)
+        code = 1
+
+    sys.stdout.flush()
+    sys.stderr.flush()
+    try:
+        send_message(conn, {"exit": code})
+    except OSError:
+        pass
+    return code
+
+
+_FORWARDED_SIGNALS = [signal.SIGWINCH, signal.SIGINT, signal.SIGTERM, signal.SIGHUP]
+
+
+def run_client(msg: Dict, socket_path: str = DEFAULT_SOCKET_PATH) -> Optional[int]:
+    """Present a deck through the daemon listening on ``socket_path``. The
+    terminal's file descriptors are passed to the daemon, and signals such as
+    ``SIGWINCH`` are forwarded to the process presenting the deck.
+
+    :returns: The exit code, or None if no daemon is listening
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        return None
+
+    old_handlers = {}
+    try:
+        # never hand the terminal to a socket that another user bound
+        allowed, reason = peer_allowed(sock, socket_path)
+        if not allowed:
+            print(f"Error: refusing to use the server at {socket_path}: {reason}", file=sys.stderr)
+            return 1
+
+        send_message(sock, msg, fds=[0, 1, 2])
+        reply, _ = recv_message(sock)
+        if "error" in reply:
+            print(f"Error: {reply['error']}", file=sys.stderr)
+            return 1
+
+        child_pid = reply["pid"]
+
+        def forward(signum, _frame):
+            try:
+                os.kill(child_pid, signum)
+            except ProcessLookupError:
+                pass
+        for signum in _FORWARDED_SIGNALS:
+            old_handlers[signum] = signal.signal(signum, forward)
+
+        while True:
+            try:
+                reply, _ = recv_message(sock)
+            except EOFError:
+                return 1
+            if "exit" in reply:
+                return reply["exit"]
+    finally:
+        for signum, handler in old_handlers.items():
+            signal.signal(signum, handler)
+        sock.close()
@@ -3,6 +3,11 @@ Slide info holder
 """
 
 
+import copy
+import hashlib
+import json
+
+
 class Slide(object):
     """This class defines a single slide. It operates on mistune's lexed
     tokens from the input markdown
@@ -16,3 +21,27 @@ class Slide(object):
         """
         self.tokens = tokens
         self.number = number
+        #: The directory of the file the slide came from, if it differs from
+        #: the presentation's source directory
+        self.source_dir = None
+        self._content_hash = None
+
+    @property
+    def content_hash(self) -> str:
+        """A hash of the slide's tokens. The hash is computed the first time
+        it is accessed, which should be before the slide is rendered, since
+        rendering may modify the tokens.
+        """
+        if self._content_hash is None:
+            data = json.dumps(self.tokens, sort_keys=True, default=str)
+            self._content_hash = hashlib.sha1(data.encode("utf-8")).hexdigest()
+        return self._content_hash
+
+    def copy(self, number: int) -> "Slide":
+        """Return a copy of this slide with the provided number. The tokens
+        are deep copied, since rendering may modify them.
+        """
+        res = Slide(copy.deepcopy(self.tokens), number)
+        res.source_dir = self.source_dir
+        res._content_hash = self.content_hash
+        return res
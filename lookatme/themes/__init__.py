@@ -3,19 +3,34 @@ Defines the built-in styles for lookatme
 """
 
 
-from typing import Any, Dict
+import copy
+from typing import Any, Dict, Tuple
 
 from lookatme.schemas import StyleSchema
 from lookatme.utils import dict_deep_update
 
+# (theme module name, id of the theme dict) -> theme with defaults
+_THEME_DEFAULTS: Dict[Tuple[str, int], Dict[str, Any]] = {}
 
-def ensure_defaults(mod) -> Dict[str, Any]:
-    """Ensure that all required attributes exist within the provided module
-    """
-    defaults = StyleSchema().dump(None)
-    dict_deep_update(defaults, mod.theme)
 
-    if not isinstance(defaults, dict):
-        raise ValueError("Schemas didn't return a dict")
+def theme_defaults(mod) -> Dict[str, Any]:
+    """Return the theme of the provided module with all defaults filled in.
+    The result is computed once per theme and is shared, so it must not be
+    modified.
+    """
+    key = (mod.__name__, id(mod.theme))
+    defaults = _THEME_DEFAULTS.get(key, None)
+    if defaults is None:
+        defaults = StyleSchema().dump(None)
+        dict_deep_update(defaults, mod.theme)
 
+        if not isinstance(defaults, dict):
+            raise ValueError("Schemas didn't return a dict")
+        _THEME_DEFAULTS[key] = defaults
     return defaults
+
+
+def ensure_defaults(mod) -> Dict[str, Any]:
+    """Ensure that all required attributes exist within the provided module
+    """
+    return copy.deepcopy(theme_defaults(mod))
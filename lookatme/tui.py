@@ -3,10 +3,12 @@ This module defines the text user interface (TUI) for lookatme
 """
 
 
-import copy
+import asyncio
+import functools
 import threading
 import time
 from collections import defaultdict
+from collections.abc import Mapping
 from queue import Queue
 
 import urwid
@@ -15,13 +17,22 @@ import lookatme.config
 import lookatme.config as config
 import lookatme.contrib
 import lookatme.render.markdown_block as markdown_block
+import lookatme.render.pygments as pygments_render
 from lookatme.contrib import contrib_first
+from lookatme.render.asciinema import RecordingScreen
+from lookatme.render.context import RenderStack
+from lookatme.scheduler import (ScheduledMainLoop, get_scheduler,
+                                request_redraw, run_on_ui_thread)
 from lookatme.tutorial import tutor
-from lookatme.utils import pile_or_listbox_add, spec_from_style
+from lookatme.utils import spec_from_style
+from lookatme.widgets.clickable_text import widget_links
+from lookatme.widgets.code_block import MAX_ROWS as CODE_MAX_ROWS
+from lookatme.widgets.lazy_walker import LazySlideWalker, split_top_level
+from lookatme.widgets.overview import SlideOverview
 
 
 def text(style, data, align="left"):
-    if isinstance(style, dict):
+    if isinstance(style, Mapping):
         style = spec_from_style(style)
     return urwid.Text((style, data), align=align)
 
@@ -40,22 +51,53 @@ def root_urwid_widget(to_wrap):
 class SlideRenderer(threading.Thread):
     daemon = True
 
-    def __init__(self, loop):
+    #: Slides with more top-level token groups than this are rendered lazily
+    #: with a :any:`LazySlideWalker` instead of all at once
+    LAZY_RENDER_THRESHOLD = 200
+
+    def __init__(self, loop, progressive_highlighting=False,
+                 code_max_rows=CODE_MAX_ROWS):
+        """
+        :param bool progressive_highlighting: Highlight large code blocks in
+            the background instead of while the slide is rendered, see
+            :any:`lookatme.render.pygments.highlight_owner`
+        :param int code_max_rows: The number of rows that long code blocks
+            scroll within. Every line of code blocks is displayed if None.
+        """
         threading.Thread.__init__(self)
         self.events = defaultdict(threading.Event)
         self.keep_running = threading.Event()
         self.queue = Queue()
         self.loop = loop
         self.cache = {}
+        self.progressive_highlighting = progressive_highlighting
+        self.code_max_rows = code_max_rows
+        #: Incremented each time the cache is flushed
+        self.generation = 0
+        #: The number of the slide that is being rendered, or None
+        self.rendering = None
+        #: Slide number to the callbacks to run once the slide is rendered
+        self.callbacks = defaultdict(list)
+        self._callbacks_lock = threading.Lock()
         self._log = lookatme.config.get_log().getChild("RENDER")
 
-    def flush_cache(self):
+    def flush_cache(self, keep=None):
         """Clea everything out of the queue and the cache.
+
+        :param set keep: The numbers of slides whose rendered widgets should
+            be kept in the cache (optional)
         """
         # clear all pending items
         with self.queue.mutex:
             self.queue.queue.clear()
-        self.cache.clear()
+        self.generation += 1
+        with self._callbacks_lock:
+            self.callbacks.clear()
+        if keep is None:
+            self.cache.clear()
+        else:
+            for slide_num in [x for x in self.cache if x not in keep]:
+                del self.cache[slide_num]
 
     def queue_render(self, slide):
         """Queue up a slide to be rendered.
@@ -63,6 +105,67 @@ class SlideRenderer(threading.Thread):
         self.events[slide.number].clear()
         self.queue.put(slide)
 
+    def prioritize(self, slide_nums):
+        """Move the queued slides to the front of the queue, in the order of
+        ``slide_nums``
+        """
+        order = {num: idx for idx, num in enumerate(slide_nums)}
+        with self.queue.mutex:
+            queued = sorted(
+                self.queue.queue,
+                key=lambda x: order.get(x.number, len(order)),
+            )
+            self.queue.queue.clear()
+            self.queue.queue.extend(queued)
+
+    def is_queued(self, slide_num):
+        """Return True if the slide is waiting in the queue
+        """
+        with self.queue.mutex:
+            return any(x.number == slide_num for x in self.queue.queue)
+
+    def render_async(self, slide, callback=None):
+        """Render a slide without blocking. ``callback(slide_num)`` is called
+        on the UI thread once the slide is in the cache, or immediately if it
+        already is. Unless the slide is already being rendered, it is moved to
+        the front of the queue. Slides are never queued more than once.
+        """
+        with self._callbacks_lock:
+            ready = slide.number in self.cache
+            if not ready and callback is not None and callback not in self.callbacks[slide.number]:
+                self.callbacks[slide.number].append(callback)
+        if ready:
+            if callback is not None:
+                callback(slide.number)
+            return
+
+        if self.rendering != slide.number:
+            if not self.is_queued(slide.number):
+                self.queue_render(slide)
+            self.prioritize([slide.number])
+
+    def render_future(self, slide, loop):
+        """Return an ``asyncio.Future`` that resolves to the rendered widgets
+        of a slide, see :any:`render_async`. Must be called on the thread that
+        runs ``loop``.
+        """
+        future = loop.create_future()
+
+        def rendered(slide_num):
+            if future.done():
+                return
+            res = self.cache.get(slide_num, None)
+            if res is None:
+                # flushed in the meantime
+                future.cancel()
+            elif isinstance(res, Exception):
+                future.set_exception(res)
+            else:
+                future.set_result(res)
+
+        self.render_async(slide, rendered)
+        return future
+
     def render_slide(self, slide, force=False):
         """Render a slide, blocking until the slide completes. If ``force`` is
         True, rerender the slide even if it is in the cache.
@@ -77,15 +180,6 @@ class SlideRenderer(threading.Thread):
             raise res
         return res
 
-    def _propagate_meta(self, item1, item2):
-        """Copy the metadata from item1 to item2
-        """
-        meta = getattr(item1, "meta", {})
-        existing_meta = getattr(item2, "meta", {})
-        new_meta = copy.deepcopy(meta)
-        new_meta.update(existing_meta)
-        setattr(item2, "meta", new_meta)
-
     def stop(self):
         self.keep_running.clear()
 
@@ -94,16 +188,32 @@ class SlideRenderer(threading.Thread):
         """
         self.keep_running.set()
         while self.keep_running.is_set():
-            to_render = self.queue.get()
-            slide_num = to_render.number
+            self.render_next()
 
-            try:
-                res = self.do_render(to_render, slide_num)
-                self.cache[slide_num] = res
-            except Exception as e:
-                self.cache[slide_num] = e
-            finally:
-                self.events[slide_num].set()
+    def render_next(self):
+        """Render the next queued slide, waiting for one if the queue is empty
+        """
+        to_render = self.queue.get()
+        slide_num = to_render.number
+        generation = self.generation
+        self.rendering = slide_num
+
+        try:
+            res = self.do_render(to_render, slide_num)
+        except Exception as e:
+            res = e
+        finally:
+            self.rendering = None
+
+        # the slide was flushed while it was being rendered
+        if generation != self.generation:
+            return
+        with self._callbacks_lock:
+            self.cache[slide_num] = res
+            callbacks = self.callbacks.pop(slide_num, [])
+        self.events[slide_num].set()
+        for callback in callbacks:
+            run_on_ui_thread(callback, slide_num)
 
     def do_render(self, to_render, slide_num):
         """Perform the actual rendering of a slide. This is done by:
@@ -124,11 +234,17 @@ class SlideRenderer(threading.Thread):
 
           * ``token`` - the lexed markdown token - a dictionary
           * ``body`` - the current ``urwid.Pile()`` that return values will be
-            added to (same as ``stack[-1]``)
+            added to (same as ``stack[-1]``). Return values are collected by
+            ``stack.context`` and are added to the container all at once,
+            when it is popped from the stack.
           * ``stack`` - The stack of ``urwid.Pile()`` used during rendering.
             E.g., when rendering nested lists, each nested list will push a new
             ``urwid.Pile()`` to the stack, each wrapped with its own additional
-            indentation.
+            indentation. The stack is a
+            :any:`lookatme.render.context.RenderStack`, and
+            ``stack.context`` is the :any:`lookatme.render.context.RenderContext`
+            of ``stack[-1]``, which holds e.g. the state of the list being
+            rendered.
           * ``loop`` - the ``urwid.MainLoop`` instance being used by lookatme.
             This won't usually be used, but is available if needed.
 
@@ -146,18 +262,45 @@ class SlideRenderer(threading.Thread):
         self._log.debug(f"Rendering slide {slide_num}")
         start = time.time()
 
-        # initial processing loop - results are discarded, but render functions
-        # may add extra metadata to the token itself. For example, list rendering
-        # uses this to determine the max indent size for each level.
         tokens = to_render.tokens
-        self._render_tokens(tokens)
-        res = self._render_tokens(tokens)
+        token_groups = split_top_level(tokens)
+        if len(token_groups) > self.LAZY_RENDER_THRESHOLD:
+            # very long slides (e.g. --single on a large document) only build
+            # the widgets that the ListBox actually asks for
+            self._log.debug(
+                f"Lazily rendering {len(token_groups)} token groups")
+            res = LazySlideWalker(
+                token_groups,
+                functools.partial(
+                    self._render_token_group,
+                    slide_num=slide_num,
+                    source_dir=to_render.source_dir,
+                ),
+            )
+        else:
+            res = self._render_token_group(
+                tokens, slide_num=slide_num, source_dir=to_render.source_dir)
 
         total = time.time() - start
         self._log.debug(f"Rendered slide {slide_num} in {total}")
 
         return res
 
+    def _render_token_group(self, tokens, slide_num=None, source_dir=None):
+        """Render the provided tokens, returning the list of created widgets.
+        Relative paths (e.g. of loaded files) are relative to ``source_dir``,
+        the directory of the file the slide came from. Lazily rendered groups
+        are rendered on the UI thread, after other slides may have been
+        rendered.
+        """
+        # initial processing loop - results are discarded, but render functions
+        # may add extra metadata to the token itself. For example, list rendering
+        # uses this to determine the max indent size for each level.
+        with config.slide_source_dir(source_dir), pygments_render.code_block_rows(self.code_max_rows):
+            with pygments_render.highlight_owner(slide_num, self.progressive_highlighting):
+                self._render_tokens(tokens)
+                return self._render_tokens(tokens)
+
     @tutor(
         "general",
         "markdown supported features",
@@ -185,27 +328,27 @@ class SlideRenderer(threading.Thread):
     )
     def _render_tokens(self, tokens):
         tmp_listbox = urwid.ListBox([])
-        stack = [tmp_listbox]
+        stack = RenderStack(tmp_listbox)
         for token in tokens:
             self._log.debug(f"{'  '*len(stack)}Rendering token {token}")
 
-            last_stack = stack[-1]
-            last_stack_len = len(stack)
+            last_context = stack.context
 
             render_token = getattr(markdown_block, f"render_{token['type']}")
             res = render_token(token, stack[-1], stack, self.loop)
-            if len(stack) > last_stack_len:
-                self._propagate_meta(last_stack, stack[-1])
             if res is None:
                 continue
-            pile_or_listbox_add(last_stack, res)
+            last_context.add(res)
 
+        stack.flush()
         return tmp_listbox.body
 
 
 class MarkdownTui(urwid.Frame):
-    def __init__(self, pres, start_idx=0):
+    def __init__(self, pres, start_idx=0, recorder=None):
         """
+        :param AsciinemaRecorder recorder: Records everything drawn to the
+            terminal (optional)
         """
         self.slide_body = urwid.ListBox(
             urwid.SimpleFocusListWalker([urwid.Text("test")]))
@@ -219,23 +362,47 @@ class MarkdownTui(urwid.Frame):
         self.bottom_spacing = urwid.Filler(self.slide_footer, top=0, bottom=0)
         self.bottom_spacing_box = urwid.BoxAdapter(self.bottom_spacing, 1)
 
+        self.search_edit = urwid.Edit("/")
+        self.search_status = text("", "", "right")
+        self.search_footer = urwid.Columns([self.search_edit, self.search_status])
+        urwid.connect_signal(self.search_edit, "change", self._on_search_change)
+        self.searching = False
+        self.overview = None
+        self.search_matches = []
+        self.search_match_idx = 0
+        self._search_origin = 0
+        #: The focused link as ``(body position, link index)``, or None
+        self.focused_link = None
+        #: The number of links at each position of the slide body, filled in
+        #: as positions are searched for links
+        self._link_counts = {}
+        self._highlighted_link = None
+        #: The asyncio task that waits for the current slide to be rendered
+        self._body_task = None
+
         self._log = lookatme.config.get_log()
 
         urwid.set_encoding('utf8')
-        screen = urwid.raw_display.Screen()
+        if recorder is None:
+            screen = urwid.raw_display.Screen()
+        else:
+            screen = RecordingScreen(recorder)
         screen.set_terminal_properties(colors=256)
 
         self.root_margins = urwid.Padding(self, left=2, right=2)
         self.root_paddings = urwid.Padding(self.slide_body, left=10, right=10)
 
         root_widget = root_urwid_widget(self.root_margins)
-        self.loop = urwid.MainLoop(
+        self.loop = ScheduledMainLoop(
             root_widget,
             screen=screen,
+            max_fps=pres.max_fps,
+            use_asyncio=pres.use_asyncio,
         )
 
-        # used to track slides that are being rendered
-        self.slide_renderer = SlideRenderer(self.loop)
+        # used to track slides that are being rendered. Large code blocks are
+        # highlighted in the background so that they do not hold up navigation
+        self.slide_renderer = SlideRenderer(self.loop, progressive_highlighting=True)
         self.slide_renderer.start()
 
         self.pres = pres
@@ -254,10 +421,18 @@ class MarkdownTui(urwid.Frame):
         self.curr_slide = self.pres.slides[start_idx]
         self.update()
 
+        # create the lexers the other slides need while the first slide is
+        # displayed
+        pygments_render.prewarm_in_background(
+            list(self.pres.slides),
+            config.get_style()["style"],
+        )
+
         # now queue up the rest of the slides while we're at it so they'll be
         # ready when we need them
-        for slide in filter(lambda x: x.number != start_idx, self.pres.slides):
-            self.slide_renderer.queue_render(slide)
+        for slide in self.pres.slides:
+            if slide.number != start_idx and slide.number not in self.slide_renderer.cache:
+                self.slide_renderer.queue_render(slide)
 
     def update_slide_num(self):
         """Update the slide number
@@ -334,10 +509,162 @@ class MarkdownTui(urwid.Frame):
         ])
 
     def update_body(self):
-        """Render the provided slide body
+        """Display the body of the current slide. While the presentation is
+        running, slides that are not rendered yet do not block the UI: a
+        placeholder is displayed until the slide is ready. Rapidly passing
+        through several slides only renders the slide that is landed on first.
+        """
+        if get_scheduler() is None:
+            self.set_body(self.slide_renderer.render_slide(self.curr_slide))
+            return
+
+        if self._body_task is not None:
+            self._body_task.cancel()
+            self._body_task = None
+
+        if self.curr_slide.number in self.slide_renderer.cache:
+            self._slide_rendered(self.curr_slide.number)
+            return
+
+        self.set_body(self.placeholder_body(self.curr_slide))
+        asyncio_loop = self.loop.asyncio_loop
+        if asyncio_loop is None:
+            self.slide_renderer.render_async(self.curr_slide, self._slide_rendered)
+        else:
+            future = self.slide_renderer.render_future(self.curr_slide, asyncio_loop)
+            self._body_task = asyncio_loop.create_task(
+                self._display_when_rendered(self.curr_slide, future))
+
+    def _slide_rendered(self, slide_num):
+        # the slide may have been left, or flushed, in the meantime
+        if slide_num != self.curr_slide.number:
+            return
+        rendered = self.slide_renderer.cache.get(slide_num, None)
+        if rendered is None:
+            return
+
+        if isinstance(rendered, Exception):
+            rendered = self.error_body(slide_num, rendered)
+        self.set_body(rendered)
+
+    async def _display_when_rendered(self, slide, future):
+        try:
+            rendered = await future
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            rendered = self.error_body(slide.number, e)
+        self._body_task = None
+        self.set_body(rendered)
+        request_redraw()
+
+    def error_body(self, slide_num, error):
+        """Return the body that is displayed for a slide that could not be
+        rendered
+        """
+        self._log.error(
+            f"Error rendering slide {slide_num + 1}: {error}",
+            exc_info=error,
+        )
+        spec = spec_from_style(config.get_style()["slides"])
+        return urwid.SimpleFocusListWalker([
+            text(spec, f"Error rendering slide {slide_num + 1}: {error}"),
+        ])
+
+    def placeholder_body(self, slide):
+        """Return the body that is displayed while ``slide`` is rendered
+        """
+        spec = spec_from_style(config.get_style()["slides"])
+        title = self.pres.search_index.titles.get(slide.number, "")
+        return urwid.SimpleFocusListWalker([
+            urwid.Divider(),
+            text(spec, title or f"slide {slide.number + 1}", "center"),
+            urwid.Divider(),
+            text(spec, "rendering...", "center"),
+        ])
+
+    def set_body(self, body):
+        """Replace the widgets of the slide body
         """
-        rendered = self.slide_renderer.render_slide(self.curr_slide)
-        self.slide_body.body = rendered
+        self.clear_link_focus()
+        self.slide_body.body = body
+
+    def clear_link_focus(self):
+        """Forget the links of the displayed slide, and stop highlighting the
+        focused link
+        """
+        self._set_highlighted_link(None)
+        self._link_counts = {}
+        self.focused_link = None
+
+    def _set_highlighted_link(self, link):
+        if self._highlighted_link is not None:
+            widget, run_idx = self._highlighted_link
+            widget.set_focused_link(None)
+        self._highlighted_link = link
+        if link is not None:
+            widget, run_idx = link
+            widget.set_focused_link(run_idx)
+
+    def _links_at(self, position):
+        """Return the links of the widget at ``position`` of the slide body.
+        The widget is looked up each time, since lazily built slide bodies
+        rebuild widgets that were evicted. Positions known to have no links
+        are not built again.
+        """
+        if self._link_counts.get(position, None) == 0:
+            return []
+        links = widget_links(self.slide_body.body[position])
+        self._link_counts[position] = len(links)
+        return links
+
+    def focus_link(self, offset):
+        """Move the link focus to the next (``offset > 0``) or previous link
+        of the displayed slide, wrapping around at either end. Positions of
+        the slide body are only searched until a link is found.
+        """
+        body = self.slide_body.body
+        if len(body) == 0:
+            return
+
+        step = 1 if offset > 0 else -1
+        if self.focused_link is None:
+            position = 0 if step > 0 else len(body) - 1
+            link_idx = None
+        else:
+            position, link_idx = self.focused_link
+
+        # every position is searched at most once, plus the starting position
+        # again after wrapping around
+        for _ in range(len(body) + 1):
+            links = self._links_at(position)
+            if link_idx is None:
+                link_idx = -1 if step > 0 else len(links)
+            link_idx += step
+            if 0 <= link_idx < len(links):
+                break
+            position = (position + step) % len(body)
+            link_idx = None
+        else:
+            return
+
+        self.focused_link = (position, link_idx)
+        self._set_highlighted_link(links[link_idx])
+        self.slide_body.set_focus(position)
+
+    def activate_focused_link(self):
+        """Activate the focused link, as if it were clicked
+        """
+        if self.focused_link is None:
+            return
+        position, link_idx = self.focused_link
+        links = self._links_at(position)
+        if link_idx >= len(links):
+            return
+        # the widget may have been rebuilt since the link was focused
+        self._set_highlighted_link(links[link_idx])
+        widget, run_idx = links[link_idx]
+        widget.activate_link(run_idx)
 
     def update_slide_settings(self):
         """Update the slide margins and paddings
@@ -364,24 +691,144 @@ class MarkdownTui(urwid.Frame):
         """
         """
         self.update_slide_settings()
+        pygments_render.update_highlighting(self.curr_slide.number)
         self.update_slide_num()
         self.update_title()
         self.update_creation()
         self.update_body()
 
-    def reload(self):
+    def reload(self, changed=None):
         """Reload the input, keeping the current slide in focus
+
+        :param list changed: The indices of the input files that changed
+            (optional). All input files are re-read if not provided.
         """
         curr_slide_idx = self.curr_slide.number
-        self.slide_renderer.flush_cache()
-        self.pres.reload()
+        self.search_matches = []
+        old_hashes = {x.number: x.content_hash for x in self.pres.slides}
+        old_styles = self.pres.styles
+        self.pres.reload(changed=changed)
+
+        # only slides whose content changed are rendered again, unless the
+        # styles changed or a full reload was requested
+        keep = None
+        if changed is not None and self.pres.styles == old_styles:
+            keep = {
+                x.number for x in self.pres.slides
+                if old_hashes.get(x.number, None) == x.content_hash
+            }
+        self.slide_renderer.flush_cache(keep=keep)
+        curr_slide_idx = min(curr_slide_idx, len(self.pres.slides) - 1)
         self.prep_pres(self.pres, curr_slide_idx)
         self.update()
 
+    def start_search(self):
+        """Show the search prompt in place of the slide footer
+        """
+        self.searching = True
+        self._search_origin = self.curr_slide.number
+        self.search_edit.set_edit_text("")
+        self.search_status.set_text("")
+        self.bottom_spacing.body = self.search_footer
+        self.focus_position = "footer"
+
+    def stop_search(self, jump=True):
+        """Hide the search prompt. If ``jump`` is True, go to the selected
+        match.
+        """
+        self.searching = False
+        self.bottom_spacing.body = self.slide_footer
+        self.focus_position = "body"
+        if jump and len(self.search_matches) > 0:
+            self.goto_slide(self.search_matches[self.search_match_idx])
+
+    def _on_search_change(self, _edit, query):
+        """Narrow the matches as the query is typed. The selected match is
+        rendered in the background so that jumping to it is instant.
+        """
+        self.search_matches = self.pres.search_index.search(query)
+        self.search_match_idx = 0
+        if len(self.search_matches) == 0:
+            self.search_status.set_text("no matches" if query.strip() else "")
+            return
+        for idx, slide_num in enumerate(self.search_matches):
+            if slide_num >= self._search_origin:
+                self.search_match_idx = idx
+                break
+        self._select_search_match(0)
+
+    def _select_search_match(self, offset):
+        if len(self.search_matches) == 0:
+            return
+
+        self.search_match_idx = (self.search_match_idx + offset) % len(self.search_matches)
+        slide_num = self.search_matches[self.search_match_idx]
+        self.search_status.set_text("[{}/{}] slide {}".format(
+            self.search_match_idx + 1,
+            len(self.search_matches),
+            slide_num + 1,
+        ))
+        # render the selected match ahead of the other slides so that jumping
+        # to it is instant
+        self.slide_renderer.render_async(self.pres.slides[slide_num])
+
+    def _search_keypress(self, size, key):
+        if key == "esc":
+            self.search_matches = []
+            self.stop_search(jump=False)
+        elif key == "enter":
+            self.stop_search()
+        elif key == "down":
+            self._select_search_match(1)
+        elif key == "up":
+            self._select_search_match(-1)
+        else:
+            self.search_edit.keypress((size[0],), key)
+
+    def open_overview(self):
+        """Replace the slide body with a grid of slide thumbnails
+        """
+        self.overview = SlideOverview(
+            self.pres.slides,
+            self.pres.search_index.titles,
+            self.slide_renderer,
+            selected=self.curr_slide.number,
+            on_select=self.close_overview,
+            selected_spec=spec_from_style(config.get_style()["slides"]),
+        )
+        self.overview.start_filling(self.loop)
+        self.body = self.overview
+
+    def close_overview(self, slide_num=None):
+        """Close the overview, going to ``slide_num`` if it is not None
+        """
+        self.overview.stop_filling()
+        self.overview = None
+        self.body = self.root_paddings
+        if slide_num is not None:
+            self.goto_slide(slide_num)
+
+    def goto_slide(self, slide_num):
+        """Display the slide with the provided (0-based) number
+        """
+        if slide_num == self.curr_slide.number:
+            return
+        self.curr_slide = self.pres.slides[slide_num]
+        self.update()
+
     def keypress(self, size, key):
         """Handle keypress events
         """
         self._log.debug(f"KEY: {key}")
+        if self.searching:
+            self._search_keypress(size, key)
+            return
+        if self.overview is not None:
+            key = urwid.Frame.keypress(self, size, key)
+            if key in ["esc", "o", "q", "Q"]:
+                self.close_overview()
+            return
+
         key = self._get_key(size, key)
         if key is None:
             return
@@ -396,6 +843,17 @@ class MarkdownTui(urwid.Frame):
             raise urwid.ExitMainLoop()
         elif key == "r":
             self.reload()
+        elif key == "/":
+            self.start_search()
+        elif key == "o":
+            self.open_overview()
+        elif key in ["n", "N"] and len(self.search_matches) > 0:
+            self._select_search_match(1 if key == "n" else -1)
+            self.goto_slide(self.search_matches[self.search_match_idx])
+        elif key in ["tab", "shift tab"]:
+            self.focus_link(-1 if key == "shift tab" else 1)
+        elif key == "enter":
+            self.activate_focused_link()
 
         if slide_direction == 0:
             return
@@ -406,11 +864,7 @@ class MarkdownTui(urwid.Frame):
         elif new_slide_num >= len(self.pres.slides):
             new_slide_num = len(self.pres.slides) - 1
 
-        if new_slide_num == self.curr_slide.number:
-            return
-
-        self.curr_slide = self.pres.slides[new_slide_num]
-        self.update()
+        self.goto_slide(new_slide_num)
 
     def _get_key(self, size, key):
         """Resolve the key that was pressed.
@@ -427,10 +881,11 @@ class MarkdownTui(urwid.Frame):
         self.loop.run()
 
 
-def create_tui(pres, start_slide=0):
+def create_tui(pres, start_slide=0, recorder=None):
     """Run the provided presentation
 
     :param int start_slide: 0-based slide index
+    :param AsciinemaRecorder recorder: Records the session (optional)
     """
-    tui = MarkdownTui(pres, start_slide)
+    tui = MarkdownTui(pres, start_slide, recorder=recorder)
     return tui
@@ -137,7 +137,7 @@ class Tutor:
 
     def _handle_style_yaml(self, contents: str) -> str:
         contents = contents.strip()
-        style = config.get_style()[contents]
+        style = utils.to_plain_dict(config.get_style()[contents])
         style = {"styles": {contents: style}}
         return "```yaml\n---\n{style_yaml}---\n```".format(
             style_yaml=yaml.dump(style).encode().decode("unicode-escape"),
@@ -2,6 +2,9 @@
 """
 
 
+from collections.abc import Mapping, MutableMapping
+from typing import Any, Dict, Iterator
+
 import urwid
 
 
@@ -47,6 +50,110 @@ def dict_deep_update(to_update, new_vals):
             to_update[key] = value
 
 
+_DELETED = object()
+
+
+class LayeredDict(MutableMapping):
+    """A copy-on-write view of several layered dicts. Values in later layers
+    take precedence over values in earlier layers, and nested dicts are
+    layered the same way, as if the layers had been merged with
+    :any:`dict_deep_update`. The layers are never modified: writes go to a
+    dict that is local to the view.
+
+    Resolved values are memoized, so the layers must not be modified while
+    the view is in use.
+    """
+
+    def __init__(self, *layers: Mapping):
+        self.layers = [x for x in layers if x]
+        self._local: Dict[Any, Any] = {}
+        # key -> resolved value (nested mappings are LayeredDicts)
+        self._resolved: Dict[Any, Any] = {}
+
+    def __getitem__(self, key):
+        try:
+            return self._resolved[key]
+        except KeyError:
+            pass
+
+        if key in self._local:
+            value = self._local[key]
+            if value is _DELETED:
+                raise KeyError(key)
+            return value
+
+        nested = []
+        for layer in reversed(self.layers):
+            if key not in layer:
+                continue
+            value = layer[key]
+            if not isinstance(value, Mapping):
+                if len(nested) == 0:
+                    self._resolved[key] = value
+                    return value
+                break
+            nested.append(value)
+
+        if len(nested) == 0:
+            raise KeyError(key)
+        child = LayeredDict(*reversed(nested))
+        self._resolved[key] = child
+        return child
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def __setitem__(self, key, value):
+        self._resolved.pop(key, None)
+        self._local[key] = value
+
+    def __delitem__(self, key):
+        self[key]
+        self._resolved.pop(key, None)
+        self._local[key] = _DELETED
+
+    def __iter__(self) -> Iterator:
+        seen = set()
+        for layer in self.layers + [self._local]:
+            for key in layer:
+                if key not in seen:
+                    seen.add(key)
+                    if key not in self._local or self._local[key] is not _DELETED:
+                        yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"LayeredDict({self.to_dict()!r})"
+
+    def to_dict(self) -> Dict:
+        """Return the merged layers as a plain, nested dict
+        """
+        return to_plain_dict(self)
+
+
+def to_plain_dict(value):
+    """Return a copy of ``value`` with all nested mappings (e.g.
+    :any:`LayeredDict`) converted to plain dicts
+    """
+    if isinstance(value, Mapping):
+        return {k: to_plain_dict(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [to_plain_dict(x) for x in value]
+    return value
+
+
 def spec_from_style(styles):
     """Create an urwid.AttrSpec from a {fg:"", bg:""} style dict. If styles
     is a string, it will be used as the foreground
@@ -66,7 +173,7 @@ def get_fg_bg_styles(style):
         return list(filter(None, res))
 
     # from lookatme.config.get_style()
-    if isinstance(style, dict):
+    if isinstance(style, Mapping):
         return non_empty_split(style["fg"]), non_empty_split(style["bg"])
     # just a str will only set the foreground color
     elif isinstance(style, str):
@@ -3,8 +3,11 @@ This module contains code for ClickableText
 """
 
 
+import bisect
+from typing import Iterator, List, Optional, Tuple
+
 import urwid
-from urwid.util import is_mouse_press
+from urwid.util import calc_text_pos, is_mouse_press
 
 
 class LinkIndicatorSpec(urwid.AttrSpec):
@@ -24,56 +27,159 @@ class LinkIndicatorSpec(urwid.AttrSpec):
             self, orig_spec.foreground, orig_spec.background)
 
 
+def _focused_spec(spec: urwid.AttrSpec) -> urwid.AttrSpec:
+    return urwid.AttrSpec(spec.foreground + ",standout", spec.background)
+
+
 class ClickableText(urwid.Text):
     """Allows clickable/changing text to be part of the Text() contents
     """
 
     signals = ["click", "change"]
 
+    def __init__(self, *args, **kwargs):
+        # the start offset of each attribute run, built when first needed
+        self._run_starts: Optional[List[int]] = None
+        self._focused_link: Optional[int] = None
+        urwid.Text.__init__(self, *args, **kwargs)
+
+    def _invalidate(self):
+        self._run_starts = None
+        urwid.Text._invalidate(self)
+
+    def get_text(self):
+        text, attrib = urwid.Text.get_text(self)
+        if self._focused_link is None:
+            return text, attrib
+
+        attrib = list(attrib)
+        spec, length = attrib[self._focused_link]
+        attrib[self._focused_link] = (_focused_spec(spec), length)
+        return text, attrib
+
+    def run_starts(self) -> List[int]:
+        """Return the text offset that each attribute run starts at
+        """
+        if self._run_starts is None:
+            starts = []
+            offset = 0
+            for _, length in self._attrib:
+                starts.append(offset)
+                offset += length
+            self._run_starts = starts
+        return self._run_starts
+
+    def links(self) -> List[int]:
+        """Return the indices of the attribute runs that are links
+        """
+        return [
+            idx for idx, (spec, _) in enumerate(self._attrib)
+            if isinstance(spec, LinkIndicatorSpec)
+        ]
+
+    def run_at(self, offset: int) -> Optional[int]:
+        """Return the index of the attribute run that contains the text
+        offset, or None
+        """
+        starts = self.run_starts()
+        idx = bisect.bisect_right(starts, offset) - 1
+        if idx < 0 or offset >= starts[idx] + self._attrib[idx][1]:
+            return None
+        return idx
+
+    def offset_at(self, maxcol: int, x: int, y: int) -> Optional[int]:
+        """Return the text offset displayed at the column ``x`` of the row
+        ``y``, using the layout of the text at the width ``maxcol``
+        """
+        translation = self.get_line_translation(maxcol)
+        if not 0 <= y < len(translation):
+            return None
+
+        col = 0
+        for segment in translation[y]:
+            width = segment[0]
+            if x < col + width:
+                if len(segment) != 3:
+                    # padding or inserted whitespace
+                    return None
+                _, start, end = segment
+                pos, _ = calc_text_pos(self._text, start, end, x - col)
+                return pos
+            col += width
+        return None
+
+    def set_focused_link(self, run_idx: Optional[int]):
+        """Highlight the link at the attribute run ``run_idx``, or no link if
+        None
+        """
+        if run_idx != self._focused_link:
+            self._focused_link = run_idx
+            self._invalidate()
+
+    def activate_link(self, run_idx: int):
+        """Toggle the link at the attribute run ``run_idx`` between displaying
+        its label and its target
+        """
+        spec, length = self._attrib[run_idx]
+        start = self.run_starts()[run_idx]
+        text = self._text
+        if text[start:start + length] == spec.link_label:
+            new_text = spec.link_target
+        else:
+            new_text = spec.link_label
+        self._text = text[:start] + new_text + text[start + length:]
+        self._attrib[run_idx] = (spec, len(new_text))
+        self._invalidate()
+
+        self._emit("change")
+
     def mouse_event(self, size, event, button, x, y, focus):
         """Handle mouse events!
         """
         if button != 1 or not is_mouse_press(event):
             return False
 
-        total_offset = (y * size[0]) + x
-
-        text, chunk_stylings = self.get_text()
-        curr_offset = 0
-
-        found_style = None
-        found_text = None
-        found_idx = 0
-        found_length = 0
-
-        for idx, info in enumerate(chunk_stylings):
-            style, length = info
-            if curr_offset < total_offset <= curr_offset + length:
-                found_text = text[curr_offset:curr_offset + length]
-                found_style = style
-                found_idx = idx
-                found_length = length
-                break
-            curr_offset += length
-
-        if found_style is None or not isinstance(found_style, LinkIndicatorSpec):
+        offset = self.offset_at(size[0], x, y)
+        run_idx = None if offset is None else self.run_at(offset)
+        if run_idx is None or not isinstance(self._attrib[run_idx][0], LinkIndicatorSpec):
             self._emit('click')
             return True
 
         # it's a link, so change the text and update the RLE!
-        if found_text == found_style.link_label:
-            new_text = found_style.link_target
-        else:
-            new_text = found_style.link_label
-        text = text[:curr_offset] + new_text + text[curr_offset+found_length:]
-        new_rle = len(new_text)
-
-        chunk_stylings[found_idx] = (found_style, new_rle)
-
-        self._text = text
-        self._attrib = chunk_stylings
-        self._invalidate()
+        self.activate_link(run_idx)
+        return True
 
-        self._emit("change")
 
-        return True
+def _clickable_texts(widget: urwid.Widget) -> Iterator[ClickableText]:
+    """Yield the ClickableText widgets within ``widget`` in display order.
+    Nested ``urwid.ListBox`` widgets (e.g. virtualized table rows) build
+    their contents lazily, and are skipped.
+    """
+    to_visit = [widget]
+    while len(to_visit) > 0:
+        curr = to_visit.pop()
+        if isinstance(curr, ClickableText):
+            yield curr
+            continue
+        if isinstance(curr, urwid.ListBox):
+            continue
+
+        children: List[urwid.Widget] = []
+        if isinstance(curr, (urwid.Pile, urwid.Columns)):
+            children = [x[0] for x in curr.contents]
+        elif isinstance(curr, urwid.WidgetDecoration):
+            children = [curr.original_widget]
+        elif isinstance(curr, urwid.WidgetWrap):
+            children = [curr._w]
+        to_visit.extend(reversed(children))
+
+
+def widget_links(widget: urwid.Widget) -> List[Tuple[ClickableText, int]]:
+    """Return every link within ``widget`` in display order, as
+    ``(ClickableText, attribute run index)``
+    """
+    return [
+        (text, run_idx)
+        for text in _clickable_texts(widget)
+        for run_idx in text.links()
+    ]
@@ -0,0 +1,191 @@
+"""
+This module defines the CodeBlock widget, which displays highlighted code as
+an array of lines, so that only the lines that are visible are laid out and
+rendered.
+"""
+
+
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import urwid
+
+#: Code blocks with more lines than this scroll within a window of this many
+#: rows
+MAX_ROWS = 40
+
+#: The scroll indicator displayed below the window of scrolling code blocks
+SCROLL_INDICATOR = "{up}lines {first}-{last} of {total}{down}"
+
+#: The number of laid out lines to keep for each code block
+LINE_CACHE_SIZE = 256
+
+#: The number of lines that a mouse wheel step scrolls
+WHEEL_LINES = 3
+
+
+def split_lines(markup: List) -> List:
+    """Split urwid text markup (a list of strings and ``(attr, text)``
+    tuples) into the markup of each line
+    """
+    lines: List[List] = [[]]
+    for item in markup:
+        if isinstance(item, tuple):
+            attr, text = item
+        else:
+            attr, text = None, item
+        for idx, part in enumerate(text.split("\n")):
+            if idx > 0:
+                lines.append([])
+            if part != "":
+                lines[-1].append((attr, part))
+    return [x if len(x) > 0 else "" for x in lines]
+
+
+class CodeBlock(urwid.Widget):
+    """A flow widget that displays lines of highlighted code. Code blocks
+    longer than ``max_rows`` lines only display ``max_rows`` rows at a time,
+    followed by a :any:`SCROLL_INDICATOR` row, and are scrolled with the
+    up/down and page up/page down keys (or the mouse wheel) once they have
+    focus. Keys that would scroll past either end are left for the slide to
+    handle.
+    """
+    _sizing = frozenset(["flow"])
+
+    def __init__(self, lines: List, max_rows: Optional[int] = MAX_ROWS):
+        """Create a new CodeBlock
+
+        :param list lines: The urwid text markup of each line, see
+            :any:`split_lines`
+        :param int max_rows: The number of rows to display of long code
+            blocks. Every line is displayed if None.
+        """
+        urwid.Widget.__init__(self)
+        self.lines = lines
+        self.max_rows = max_rows
+        #: The index of the first displayed line
+        self.top = 0
+        self._texts: "OrderedDict[int, urwid.Text]" = OrderedDict()
+        self._max_tops: Dict[int, int] = {}
+
+    def set_lines(self, lines: List):
+        """Replace the displayed lines, e.g. with highlighted lines
+        """
+        self.lines = lines
+        self._texts.clear()
+        self._max_tops.clear()
+        self._invalidate()
+
+    @property
+    def scrollable(self) -> bool:
+        return self.max_rows is not None and len(self.lines) > self.max_rows
+
+    def selectable(self) -> bool:
+        return self.scrollable
+
+    def line_text(self, idx: int) -> urwid.Text:
+        """Return the Text widget of a single line. Only the most recently
+        displayed lines are kept.
+        """
+        text = self._texts.get(idx, None)
+        if text is None:
+            text = urwid.Text(self.lines[idx])
+            self._texts[idx] = text
+            while len(self._texts) > LINE_CACHE_SIZE:
+                self._texts.popitem(last=False)
+        else:
+            self._texts.move_to_end(idx)
+        return text
+
+    def max_top(self, maxcol: int) -> int:
+        """Return the index of the first line when scrolled to the bottom.
+        Only the lines at the end of the code block are laid out.
+        """
+        res = self._max_tops.get(maxcol, None)
+        if res is None:
+            res = len(self.lines)
+            rows = 0
+            while res > 0 and rows < self.max_rows:
+                res -= 1
+                rows += self.line_text(res).rows((maxcol,))
+            self._max_tops[maxcol] = res
+        return res
+
+    def rows(self, size, focus=False):
+        maxcol, = size
+        if self.scrollable:
+            return self.max_rows + 1
+        return sum(self.line_text(x).rows((maxcol,)) for x in range(len(self.lines)))
+
+    def visible_lines(self, maxcol: int) -> List[Tuple[int, urwid.Text]]:
+        """Return the lines that are visible at the current scroll position
+        """
+        if not self.scrollable:
+            return [(x, self.line_text(x)) for x in range(len(self.lines))]
+
+        self.top = max(0, min(self.top, self.max_top(maxcol)))
+        res = []
+        rows = 0
+        idx = self.top
+        while idx < len(self.lines) and rows < self.max_rows:
+            text = self.line_text(idx)
+            rows += text.rows((maxcol,))
+            res.append((idx, text))
+            idx += 1
+        return res
+
+    def scroll_indicator(self, visible: List[Tuple[int, urwid.Text]]) -> urwid.Text:
+        """Return the indicator of the displayed part of a scrolling code
+        block
+        """
+        first, last = visible[0][0], visible[-1][0]
+        return urwid.Text(SCROLL_INDICATOR.format(
+            up="↑ " if first > 0 else "",
+            down=" ↓" if last < len(self.lines) - 1 else "",
+            first=first + 1,
+            last=last + 1,
+            total=len(self.lines),
+        ), align="right", wrap="clip")
+
+    def render(self, size, focus=False):
+        maxcol, = size
+        visible = self.visible_lines(maxcol)
+        canvases = [(text.render((maxcol,)), None, False) for _, text in visible]
+        if len(canvases) == 0:
+            return urwid.SolidCanvas(" ", maxcol, 1)
+        if not self.scrollable:
+            return urwid.CanvasCombine(canvases)
+
+        canvas = urwid.CompositeCanvas(urwid.CanvasCombine(canvases))
+        if canvas.rows() > self.max_rows:
+            canvas.trim_end(canvas.rows() - self.max_rows)
+        return urwid.CanvasCombine([
+            (canvas, None, False),
+            (self.scroll_indicator(visible).render((maxcol,)), None, False),
+        ])
+
+    def scroll(self, maxcol: int, delta: int) -> bool:
+        """Scroll by ``delta`` lines
+
+        :returns: True if the scroll position changed
+        """
+        new_top = max(0, min(self.top + delta, self.max_top(maxcol)))
+        if new_top == self.top:
+            return False
+        self.top = new_top
+        self._invalidate()
+        return True
+
+    def keypress(self, size, key):
+        if not self.scrollable:
+            return key
+        page = self.max_rows - 1
+        delta = {"up": -1, "down": 1, "page up": -page, "page down": page}.get(key, None)
+        if delta is None or not self.scroll(size[0], delta):
+            return key
+        return None
+
+    def mouse_event(self, size, event, button, col, row, focus):
+        if not self.scrollable or event != "mouse press" or button not in (4, 5):
+            return False
+        return self.scroll(size[0], -WHEEL_LINES if button == 4 else WHEEL_LINES)
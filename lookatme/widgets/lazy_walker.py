@@ -0,0 +1,144 @@
+"""
+This module defines a ListWalker that lazily builds slide widgets
+"""
+
+
+from collections import OrderedDict
+from typing import Callable, Dict, List
+
+import urwid
+
+
+def split_top_level(tokens: List[Dict]) -> List[List[Dict]]:
+    """Split the provided tokens into groups of top-level tokens. A group
+    starts and ends at the top level of the slide, meaning that all
+    ``*_start`` tokens within a group have their matching ``*_end`` token in
+    the same group (e.g. an entire list or block quote).
+
+    :param list tokens: The mistune tokens of a slide
+    :returns: A list of token lists
+    """
+    res = []
+    curr_group: List[Dict] = []
+    depth = 0
+    for token in tokens:
+        curr_group.append(token)
+        token_type = token["type"]
+        if token_type.endswith("_start"):
+            depth += 1
+        elif token_type.endswith("_end"):
+            depth = max(depth - 1, 0)
+
+        if depth == 0:
+            res.append(curr_group)
+            curr_group = []
+
+    if len(curr_group) > 0:
+        res.append(curr_group)
+
+    return res
+
+
+class LazySlideWalker(urwid.ListWalker):
+    """A ListWalker that keeps the top-level token groups of a slide and only
+    builds widgets for the positions that an ``urwid.ListBox`` asks for.
+
+    Built widgets are memoized. Once more than ``2 * window`` positions have
+    been built, positions further than ``window`` away from the focus are
+    evicted and will be rebuilt if they are requested again.
+    """
+
+    def __init__(self, token_groups: List[List[Dict]], build_fn: Callable,
+                 window: int = 100):
+        """Create a new LazySlideWalker
+
+        :param list token_groups: Top-level token groups, see :any:`split_top_level`
+        :param callable build_fn: A function that accepts a list of tokens and
+            returns a list of widgets
+        :param int window: The number of positions around the focus to keep
+            built widgets for
+        """
+        self.token_groups = token_groups
+        self.build_fn = build_fn
+        self.window = window
+        self.focus = 0
+        self._built: "OrderedDict[int, urwid.Widget]" = OrderedDict()
+        # tracked separately from the built widgets so that evicting a
+        # position does not require rebuilding it to de-duplicate dividers
+        self._ends_with_divider: Dict[int, bool] = {}
+
+    def __len__(self):
+        return len(self.token_groups)
+
+    def __getitem__(self, position):
+        if not isinstance(position, int) or not 0 <= position < len(self):
+            raise IndexError(position)
+
+        if position in self._built:
+            self._built.move_to_end(position)
+            return self._built[position]
+
+        widget = self._build(position)
+        self._built[position] = widget
+        self._evict()
+        return widget
+
+    def _build(self, position):
+        """Build the widget for the token group at ``position``
+        """
+        widgets = self._build_widgets(position)
+        if (
+            position > 0
+            and len(widgets) > 1
+            and isinstance(widgets[0], urwid.Divider)
+            and self._prev_ends_with_divider(position)
+        ):
+            widgets = widgets[1:]
+
+        if len(widgets) == 1:
+            return widgets[0]
+        return urwid.Pile(widgets)
+
+    def _build_widgets(self, position):
+        """Build the raw list of widgets for the token group at ``position``
+        """
+        widgets = list(self.build_fn(self.token_groups[position]))
+        if len(widgets) == 0:
+            widgets = [urwid.Divider()]
+        self._ends_with_divider[position] = isinstance(
+            widgets[-1], urwid.Divider)
+        return widgets
+
+    def _prev_ends_with_divider(self, position):
+        prev = position - 1
+        if prev not in self._ends_with_divider:
+            self._build_widgets(prev)
+        return self._ends_with_divider[prev]
+
+    def _evict(self):
+        if len(self._built) <= self.window * 2:
+            return
+        for position in list(self._built.keys()):
+            if abs(position - self.focus) > self.window:
+                del self._built[position]
+
+    def set_focus(self, position):
+        if not 0 <= position < len(self):
+            raise IndexError(f"No widget at position {position}")
+        self.focus = position
+        self._modified()
+
+    def next_position(self, position):
+        if position + 1 >= len(self):
+            raise IndexError(position)
+        return position + 1
+
+    def prev_position(self, position):
+        if position <= 0:
+            raise IndexError(position)
+        return position - 1
+
+    def positions(self, reverse=False):
+        if reverse:
+            return range(len(self) - 1, -1, -1)
+        return range(len(self))
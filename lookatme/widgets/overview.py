@@ -0,0 +1,334 @@
+"""
+This module defines the slide overview: a grid of low-resolution slide
+thumbnails that can be used to quickly jump around large decks.
+"""
+
+
+import time
+from collections import Counter, OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import urwid
+
+import lookatme.scheduler
+
+#: The size (cols, rows) of a thumbnail, not including its border and label
+THUMB_SIZE = (24, 6)
+
+#: Slides are rendered at the thumbnail size multiplied by this (cols, rows)
+#: scale, and are then downsampled to the thumbnail size
+RENDER_SCALE = (4, 4)
+
+#: Glyphs used for increasing amounts of text within a thumbnail cell
+DENSITY_GLYPHS = " .:-=+*#"
+
+#: The number of thumbnails to keep cached
+THUMB_CACHE_SIZE = 1024
+
+# (content hash, thumbnail size) -> urwid text markup
+_THUMB_CACHE: "OrderedDict[Tuple[str, Tuple[int, int]], List]" = OrderedDict()
+
+
+def downsample_canvas(canvas: urwid.Canvas, size: Tuple[int, int]) -> List:
+    """Downsample the canvas to ``size`` (cols, rows). Each thumbnail cell
+    covers a block of canvas cells. The cell's glyph reflects how much text
+    the block contains, and its attribute is the block's most common
+    attribute.
+
+    :returns: urwid text markup
+    """
+    cells: List[List[Tuple[object, bool]]] = []
+    for row in canvas.content():
+        row_cells = []
+        for attr, _cs, text in row:
+            for char in text.decode("utf-8", errors="replace"):
+                row_cells.append((attr, not char.isspace()))
+        cells.append(row_cells)
+
+    src_rows = len(cells)
+    src_cols = max((len(x) for x in cells), default=0)
+    cols, rows = size
+    markup: List = []
+    for thumb_row in range(rows):
+        if thumb_row > 0:
+            markup.append("\n")
+        y0 = thumb_row * src_rows // rows
+        y1 = max((thumb_row + 1) * src_rows // rows, y0 + 1)
+        for thumb_col in range(cols):
+            x0 = thumb_col * src_cols // cols
+            x1 = max((thumb_col + 1) * src_cols // cols, x0 + 1)
+
+            attrs: Counter = Counter()
+            filled = 0
+            total = 0
+            for row_cells in cells[y0:y1]:
+                for attr, is_text in row_cells[x0:x1]:
+                    attrs[attr] += 1
+                    filled += is_text
+                    total += 1
+
+            density = filled / total if total else 0
+            glyph_idx = min(int(round(density * (len(DENSITY_GLYPHS) - 1) * 2)), len(DENSITY_GLYPHS) - 1)
+            attr = attrs.most_common(1)[0][0] if attrs else None
+            markup.append((attr, DENSITY_GLYPHS[glyph_idx]))
+    return markup
+
+
+def render_thumbnail(contents, size: Tuple[int, int] = THUMB_SIZE) -> List:
+    """Render the widgets of a slide (as cached by the slide renderer) at a
+    virtual size and downsample the result to ``size``
+    """
+    container = urwid.ListBox([urwid.Text("")])
+    container.body = contents
+    canvas = container.render((size[0] * RENDER_SCALE[0], size[1] * RENDER_SCALE[1]))
+    return downsample_canvas(canvas, size)
+
+
+def get_cached_thumbnail(content_hash: str, size: Tuple[int, int]) -> Optional[List]:
+    key = (content_hash, size)
+    markup = _THUMB_CACHE.get(key, None)
+    if markup is not None:
+        _THUMB_CACHE.move_to_end(key)
+    return markup
+
+
+def cache_thumbnail(content_hash: str, size: Tuple[int, int], markup: List):
+    _THUMB_CACHE[(content_hash, size)] = markup
+    while len(_THUMB_CACHE) > THUMB_CACHE_SIZE:
+        _THUMB_CACHE.popitem(last=False)
+
+
+def _placeholder(size: Tuple[int, int], label: str) -> str:
+    lines = [""] * size[1]
+    lines[size[1] // 2] = label.center(size[0])
+    return "\n".join(lines)
+
+
+class ThumbnailCell(urwid.WidgetWrap):
+    """A single slide in the overview grid
+    """
+
+    def __init__(self, slide, title: str, size: Tuple[int, int]):
+        self.slide = slide
+        self.size = size
+        self.thumb = urwid.Text(_placeholder(size, "..."), wrap="clip")
+        label = urwid.Text(f"{slide.number + 1}. {title}", wrap="clip")
+        self.border = urwid.AttrMap(
+            urwid.LineBox(urwid.Pile([self.thumb, label])),
+            None,
+        )
+        urwid.WidgetWrap.__init__(self, self.border)
+
+        markup = get_cached_thumbnail(slide.content_hash, size)
+        if markup is not None:
+            self.set_thumbnail(markup)
+
+    def set_thumbnail(self, markup: List):
+        self.thumb.set_text(markup)
+
+    def set_selected(self, selected: bool, spec):
+        self.border.set_attr_map({None: spec if selected else None})
+
+
+class _GridWalker(urwid.ListWalker):
+    """Builds the rows of the overview grid as the ListBox asks for them, so
+    that the grid opens instantly for decks with hundreds of slides
+    """
+
+    def __init__(self, overview: "SlideOverview"):
+        self.overview = overview
+        self.focus = 0
+
+    def __len__(self):
+        return self.overview.num_rows()
+
+    def __getitem__(self, position):
+        if not isinstance(position, int) or not 0 <= position < len(self):
+            raise IndexError(position)
+        return self.overview.row_widget(position)
+
+    def next_position(self, position):
+        if position + 1 >= len(self):
+            raise IndexError(position)
+        return position + 1
+
+    def prev_position(self, position):
+        if position <= 0:
+            raise IndexError(position)
+        return position - 1
+
+    def set_focus(self, position):
+        self.focus = position
+        self._modified()
+
+
+class SlideOverview(urwid.ListBox):
+    """A scrollable grid of slide thumbnails. Thumbnails that have not been
+    made yet show placeholders, and are filled in nearest-first from the
+    selected slide by :any:`SlideOverview.fill_step`.
+    """
+
+    #: The number of seconds of UI thread time to spend making thumbnails
+    #: before yielding to input handling
+    FILL_BUDGET = 0.015
+
+    def __init__(self, slides: List, titles: Dict[int, str], slide_renderer,
+                 selected: int = 0, on_select: Optional[Callable] = None,
+                 selected_spec=None, thumb_size: Tuple[int, int] = THUMB_SIZE):
+        """Create a new SlideOverview
+
+        :param list slides: The slides of the presentation
+        :param dict titles: Slide number to slide title
+        :param SlideRenderer slide_renderer: The renderer whose cached slide
+            widgets are used to make thumbnails
+        :param int selected: The initially selected slide number
+        :param callable on_select: Called with the slide number when a slide
+            is chosen
+        """
+        self.slides = slides
+        self.titles = titles
+        self.slide_renderer = slide_renderer
+        self.selected = selected
+        self.on_select = on_select
+        self.selected_spec = selected_spec or urwid.AttrSpec("standout", "")
+        self.thumb_size = thumb_size
+        self.per_row = 1
+        self._cells: Dict[int, ThumbnailCell] = {}
+        self._rows: Dict[Tuple[int, int], urwid.Widget] = {}
+        self._pending: List[int] = []
+        self._alarm = None
+        self._loop = None
+
+        urwid.ListBox.__init__(self, _GridWalker(self))
+
+    @property
+    def cell_width(self) -> int:
+        # the border takes up two columns
+        return self.thumb_size[0] + 2
+
+    def num_rows(self) -> int:
+        return (len(self.slides) + self.per_row - 1) // self.per_row
+
+    def cell(self, slide_num: int) -> ThumbnailCell:
+        cell = self._cells.get(slide_num, None)
+        if cell is None:
+            cell = ThumbnailCell(
+                self.slides[slide_num],
+                self.titles.get(slide_num, ""),
+                self.thumb_size,
+            )
+            cell.set_selected(slide_num == self.selected, self.selected_spec)
+            self._cells[slide_num] = cell
+        return cell
+
+    def row_widget(self, row: int) -> urwid.Widget:
+        key = (row, self.per_row)
+        widget = self._rows.get(key, None)
+        if widget is None:
+            start = row * self.per_row
+            stop = min(start + self.per_row, len(self.slides))
+            widget = urwid.Columns(
+                [(self.cell_width, self.cell(x)) for x in range(start, stop)],
+                dividechars=1,
+            )
+            self._rows[key] = widget
+        return widget
+
+    def render(self, size, focus=False):
+        per_row = max(1, (size[0] + 1) // (self.cell_width + 1))
+        if per_row != self.per_row:
+            self.per_row = per_row
+            self._rows.clear()
+            self.body.set_focus(self.selected // per_row)
+        return urwid.ListBox.render(self, size, focus)
+
+    def select(self, slide_num: int):
+        slide_num = max(0, min(slide_num, len(self.slides) - 1))
+        self.cell(self.selected).set_selected(False, self.selected_spec)
+        self.selected = slide_num
+        self.cell(slide_num).set_selected(True, self.selected_spec)
+        self.body.set_focus(slide_num // self.per_row)
+
+    def keypress(self, size, key):
+        offsets = {
+            "left": -1, "h": -1,
+            "right": 1, "l": 1,
+            "up": -self.per_row, "k": -self.per_row,
+            "down": self.per_row, "j": self.per_row,
+        }
+        if key in offsets:
+            new_selected = self.selected + offsets[key]
+            if 0 <= new_selected < len(self.slides):
+                self.select(new_selected)
+            return None
+        if key == "enter":
+            if self.on_select is not None:
+                self.on_select(self.selected)
+            return None
+        if key in ("page up", "page down", "home", "end"):
+            return urwid.ListBox.keypress(self, size, key)
+        return key
+
+    def start_filling(self, loop=None):
+        """Start making the missing thumbnails, nearest to the selected slide
+        first. Slides that have not been rendered yet are moved to the front
+        of the slide renderer's queue in the same order.
+        """
+        self._loop = loop
+        order = sorted(range(len(self.slides)), key=lambda x: (abs(x - self.selected), x))
+        self._pending = [
+            x for x in order
+            if get_cached_thumbnail(self.slides[x].content_hash, self.thumb_size) is None
+        ]
+        self.slide_renderer.prioritize(self._pending)
+        self._schedule()
+
+    def stop_filling(self):
+        if self._alarm is not None and self._loop is not None:
+            self._loop.remove_alarm(self._alarm)
+        self._alarm = None
+        self._pending = []
+
+    def _schedule(self, delay: float = 0):
+        if self._loop is not None and self._alarm is None and len(self._pending) > 0:
+            self._alarm = self._loop.set_alarm_in(delay, self._alarm_fired)
+
+    def _alarm_fired(self, _loop, _user_data):
+        self._alarm = None
+        waiting = self.fill_step()
+        # slides still being rendered in the background are checked again
+        # shortly
+        self._schedule(0.05 if waiting else 0)
+
+    def fill_step(self) -> bool:
+        """Make thumbnails for pending slides until ``FILL_BUDGET`` seconds
+        have passed. Must be called on the UI thread.
+
+        :returns: True if only slides that are not rendered yet remain
+        """
+        start = time.monotonic()
+        still_pending = []
+        made = 0
+        for idx, slide_num in enumerate(self._pending):
+            if time.monotonic() - start > self.FILL_BUDGET:
+                still_pending += self._pending[idx:]
+                break
+
+            contents = self.slide_renderer.cache.get(slide_num, None)
+            if contents is None:
+                still_pending.append(slide_num)
+                continue
+
+            slide = self.slides[slide_num]
+            if isinstance(contents, Exception):
+                markup: List = [_placeholder(self.thumb_size, "error")]
+            else:
+                markup = render_thumbnail(contents, self.thumb_size)
+                cache_thumbnail(slide.content_hash, self.thumb_size, markup)
+            self.cell(slide_num).set_thumbnail(markup)
+            made += 1
+
+        self._pending = still_pending
+        if made > 0:
+            lookatme.scheduler.request_redraw()
+        return made == 0 and len(self._pending) > 0
@@ -3,8 +3,9 @@ Defines a basic Table widget for urwid
 """
 
 
+import math
 from collections import defaultdict
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
 import urwid
 
@@ -14,18 +15,123 @@ from lookatme.utils import styled_text
 from lookatme.widgets.clickable_text import ClickableText
 
 
+def _sort_key(cell: str) -> Tuple:
+    """Return the sort key for a raw cell value
+    """
+    text = cell.strip().strip("*_~`").strip()
+    try:
+        number = float(text.replace(",", ""))
+    except ValueError:
+        number = None
+
+    if number is None or not math.isfinite(number):
+        return (1, 0.0, text.casefold())
+    return (0, number, "")
+
+
+class TableRowWalker(urwid.ListWalker):
+    """A ListWalker over the rows of a virtualized :any:`Table`. Row widgets
+    are only built once they are requested by the ``urwid.ListBox``.
+
+    Positions are mapped to row indices through the table's current row
+    order, and built row widgets are memoized by row index, so sorting or
+    filtering the table reuses already-built rows.
+    """
+
+    def __init__(self, table, window: int = 100):
+        """Create a new TableRowWalker
+
+        :param Table table: The table whose rows should be walked
+        :param int window: The number of rows around the focus to keep built
+            row widgets for
+        """
+        self.table = table
+        self.window = window
+        self.focus = 0
+        self.built: Dict[int, urwid.Widget] = {}
+
+    def __len__(self):
+        return len(self.table.row_order)
+
+    def __getitem__(self, position):
+        if not isinstance(position, int) or not 0 <= position < len(self):
+            raise IndexError(position)
+
+        row_idx = self.table.row_order[position]
+        row_widget = self.built.get(row_idx, None)
+        if row_widget is None:
+            row_widget = self.table.create_row_widget(row_idx)
+            self.built[row_idx] = row_widget
+            self._evict()
+        return row_widget
+
+    def _evict(self):
+        if len(self.built) <= self.window * 2:
+            return
+        order = self.table.row_order
+        keep = set(order[max(self.focus - self.window, 0):self.focus + self.window + 1])
+        for row_idx in list(self.built.keys()):
+            if row_idx not in keep:
+                del self.built[row_idx]
+
+    def order_changed(self):
+        """Reset the focus after the table's row order changed
+        """
+        self.focus = 0
+        self._modified()
+
+    def set_focus(self, position):
+        if not 0 <= position < len(self):
+            raise IndexError(f"No row at position {position}")
+        self.focus = position
+        self._modified()
+
+    def next_position(self, position):
+        if position + 1 >= len(self):
+            raise IndexError(position)
+        return position + 1
+
+    def prev_position(self, position):
+        if position <= 0:
+            raise IndexError(position)
+        return position - 1
+
+    def positions(self, reverse=False):
+        if reverse:
+            return range(len(self) - 1, -1, -1)
+        return range(len(self))
+
+
 class Table(urwid.Pile):
     """Create a table from a list of headers, alignment values, and rows.
+
+    Tables with more than :any:`Table.VIRTUALIZE_THRESHOLD` rows are
+    virtualized: only the header is rendered up front, and body rows are
+    built lazily as they are scrolled into view inside of a fixed-height
+    ``urwid.ListBox``.
+
+    Clicking a header sorts the table by that column; clicking it again
+    reverses the sort. Rows can be filtered with :any:`Table.set_filter`.
+    Sorting and filtering only reorder references to existing row widgets.
     """
 
     signals = ["change"]
 
-    def __init__(self, rows, headers=None, aligns: Optional[List[str]] = None):
+    #: Tables with more rows than this are virtualized by default
+    VIRTUALIZE_THRESHOLD = 200
+
+    def __init__(self, rows, headers=None, aligns: Optional[List[str]] = None,
+                 virtualize: Optional[bool] = None, visible_rows: int = 20):
         """Create a new table
 
         :param list columns: The rows to use for the table
         :param list headers: (optional) Headers for the table
         :param list aligns: (optional) Alignment values for each column
+        :param bool virtualize: (optional) Force virtualized rows on or off.
+            Defaults to virtualizing tables with more than
+            :any:`Table.VIRTUALIZE_THRESHOLD` rows.
+        :param int visible_rows: The number of body rows visible at once in a
+            virtualized table
         """
         self.table_rows = rows
         self.table_headers = headers
@@ -43,8 +149,16 @@ class Table(urwid.Pile):
             aligns = ["left"] * self.num_columns
         self.table_aligns = aligns
 
+        if virtualize is None:
+            virtualize = len(rows) > self.VIRTUALIZE_THRESHOLD
+        self.virtualized = virtualize
+
+        self.header_markup = []
+
         def header_modifier(cell):
-            return ClickableText(styled_text(cell.text, "bold"), align=cell.align)
+            markup = styled_text(cell.text, "bold")
+            self.header_markup.append(markup)
+            return ClickableText(markup, align=cell.align)
 
         if self.table_headers is not None:
             self.rend_headers = self.create_cells(
@@ -52,9 +166,26 @@ class Table(urwid.Pile):
             )
         else:
             self.rend_headers = []
-        self.rend_rows = self.create_cells(self.table_rows)
+
+        self._raw_column_maxes = None
+        if self.virtualized:
+            # rows are rendered on demand by the TableRowWalker
+            self.rend_rows = []
+        else:
+            self.rend_rows = self.create_cells(self.table_rows)
 
         self.column_maxes = self.calc_column_maxes()
+        self._layout_dirty = False
+
+        # sorting/filtering state. Sort keys are computed once, sorts are
+        # cached as permutations of row indices
+        self.sort_keys = self.calc_sort_keys()
+        self.sort_column: Optional[int] = None
+        self.sort_reverse = False
+        self.filter_text = ""
+        self._sort_perms: Dict[Tuple[int, bool], List[int]] = {}
+        self._filter_haystacks: Optional[List[str]] = None
+        self.row_order = list(range(len(self.table_rows)))
 
         cell_spacing = config.get_style()["table"]["column_spacing"]
         self.total_width = sum(self.column_maxes.values()) + (
@@ -69,6 +200,8 @@ class Table(urwid.Pile):
             header_columns = []
             for idx, header in enumerate(self.rend_headers[0]):
                 header = header[0]
+                urwid.connect_signal(
+                    header, "click", self._header_clicked, user_args=[idx])
                 header_with_div = urwid.Pile([
                     self.watch(header),
                     urwid.Divider(config.get_style()[
@@ -78,23 +211,28 @@ class Table(urwid.Pile):
                     (self.column_maxes[idx], header_with_div))
             final_rows.append(urwid.Columns(header_columns, cell_spacing))
 
-        for rend_row in self.rend_rows:
-            row_columns = []
-            for cell_idx, rend_cell in enumerate(rend_row):
-                rend_widgets = [self.watch(rend_widget)
-                                for rend_widget in rend_cell]
-                rend_pile = urwid.Pile(rend_widgets)
-                row_columns.append((self.column_maxes[cell_idx], rend_pile))
-
-            column_row = urwid.Columns(row_columns, cell_spacing)
-            final_rows.append(column_row)
+        if self.virtualized:
+            self.row_walker = TableRowWalker(self)
+            self.row_listbox = urwid.ListBox(self.row_walker)
+            final_rows.append(urwid.BoxAdapter(
+                self.row_listbox,
+                height=max(min(visible_rows, len(self.table_rows)), 1),
+            ))
+        else:
+            self.num_header_rows = len(final_rows)
+            self.row_widgets = [
+                self.create_row_columns(rend_row)
+                for rend_row in self.rend_rows
+            ]
+            final_rows += self.row_widgets
 
         urwid.Pile.__init__(self, final_rows)
 
     def render(self, *args, **kwargs):
         """Do whatever needs to be done to render the table
         """
-        self.set_column_maxes()
+        if self._layout_dirty:
+            self.set_column_maxes()
         return urwid.Pile.render(self, *args, **kwargs)
 
     def watch(self, w):
@@ -104,27 +242,161 @@ class Table(urwid.Pile):
             return w
 
         def wrapper(*_, **__):
+            # the new column widths must be known before listeners of the
+            # "change" signal (e.g. the padding around the table) run
+            self.set_column_maxes()
             self._invalidate()
             self._emit("change")
 
         urwid.connect_signal(w, "change", wrapper)
         return w
 
-    def _invalidate(self):
-        self.set_column_maxes()
-        urwid.Pile._invalidate(self)
+    def calc_sort_keys(self) -> List[List[Tuple]]:
+        """Calculate the sort key of every cell, per column. Cells that look
+        like numbers sort numerically before all other cells, which sort by
+        their casefolded text.
+        """
+        res: List[List[Tuple]] = [[] for _ in range(self.num_columns)]
+        for row in self.table_rows:
+            for idx in range(self.num_columns):
+                cell = row[idx] if idx < len(row) else ""
+                res[idx].append(_sort_key(cell))
+        return res
+
+    def sorted_order(self, column_idx: int, reverse: bool = False) -> List[int]:
+        """Return the permutation of row indices that sorts the table by
+        ``column_idx``. Permutations are cached, and the descending order is
+        derived from the ascending one without sorting again.
+        """
+        cache_key = (column_idx, reverse)
+        perm = self._sort_perms.get(cache_key, None)
+        if perm is not None:
+            return perm
+
+        keys = self.sort_keys[column_idx]
+        if not reverse:
+            perm = sorted(range(len(self.table_rows)), key=keys.__getitem__)
+        else:
+            # reverse the runs of equal keys, but not the rows within a run,
+            # so that ties keep their original order like a stable sort
+            perm = []
+            run_end = len(self.table_rows)
+            ascending = self.sorted_order(column_idx)
+            for idx in range(len(ascending) - 1, -1, -1):
+                if idx == 0 or keys[ascending[idx - 1]] != keys[ascending[idx]]:
+                    perm.extend(ascending[idx:run_end])
+                    run_end = idx
+        self._sort_perms[cache_key] = perm
+        return perm
+
+    def sort_by(self, column_idx: Optional[int], reverse: bool = False):
+        """Sort the table by the column at ``column_idx``. If ``column_idx``
+        is None, the original row order is restored.
+        """
+        self.sort_column = column_idx
+        self.sort_reverse = reverse
+        self._update_header_indicators()
+        self._apply_row_order()
+
+    def set_filter(self, filter_text: str):
+        """Only show rows that contain ``filter_text`` (case-insensitive) in
+        any of their cells. An empty string shows all rows.
+        """
+        self.filter_text = filter_text.casefold()
+        self._apply_row_order()
+
+    def _header_clicked(self, column_idx, _header):
+        reverse = False
+        if self.sort_column == column_idx:
+            reverse = not self.sort_reverse
+        self.sort_by(column_idx, reverse)
+
+    def _update_header_indicators(self):
+        for idx, header in enumerate(self.rend_headers[0] if self.rend_headers else []):
+            markup = [self.header_markup[idx]]
+            if idx == self.sort_column:
+                spec = self.header_markup[idx][0]
+                markup.append((spec, " ▼" if self.sort_reverse else " ▲"))
+            header[0].set_text(markup)
+        self._layout_dirty = True
+
+    def _apply_row_order(self):
+        if self.sort_column is None:
+            order = range(len(self.table_rows))
+        else:
+            order = self.sorted_order(self.sort_column, self.sort_reverse)
+
+        if self.filter_text != "":
+            haystacks = self._get_filter_haystacks()
+            order = [idx for idx in order if self.filter_text in haystacks[idx]]
+        self.row_order = list(order)
+
+        if self.virtualized:
+            self.row_walker.order_changed()
+        else:
+            header_contents = self.contents[:self.num_header_rows]
+            self.contents = header_contents + [
+                (self.row_widgets[idx], self.options())
+                for idx in self.row_order
+            ]
+
+        if self._layout_dirty:
+            self.set_column_maxes()
+        self._invalidate()
+        self._emit("change")
+
+    def _get_filter_haystacks(self) -> List[str]:
+        if self._filter_haystacks is None:
+            self._filter_haystacks = [
+                "\0".join(row[:self.num_columns]).casefold()
+                for row in self.table_rows
+            ]
+        return self._filter_haystacks
+
+    def create_row_columns(self, rend_row):
+        """Create the ``urwid.Columns`` instance for a single rendered row
+        """
+        cell_spacing = config.get_style()["table"]["column_spacing"]
+        row_columns = []
+        for cell_idx, rend_cell in enumerate(rend_row):
+            rend_widgets = [self.watch(rend_widget)
+                            for rend_widget in rend_cell]
+            rend_pile = urwid.Pile(rend_widgets)
+            row_columns.append((self.column_maxes[cell_idx], rend_pile))
+        return urwid.Columns(row_columns, cell_spacing)
+
+    def create_row_widget(self, row_idx):
+        """Render the row at ``row_idx`` of a virtualized table
+        """
+        if self._layout_dirty:
+            self.set_column_maxes()
+        rend_row = self.create_cells([self.table_rows[row_idx]])[0]
+        return self.create_row_columns(rend_row)
+
+    def _all_row_columns(self):
+        """Yield every ``urwid.Columns`` row that currently exists in the
+        table
+        """
+        for widget, _ in self.contents:
+            if isinstance(widget, urwid.Columns):
+                yield widget
+        if self.virtualized:
+            yield from self.row_walker.built.values()
 
     def set_column_maxes(self):
         """Calculate and set the column maxes for this table
         """
-        self.column_maxes = self.calc_column_maxes()
+        self._layout_dirty = False
+        column_maxes = self.calc_column_maxes()
         cell_spacing = config.get_style()["table"]["column_spacing"]
-        self.total_width = sum(self.column_maxes.values()) + (
+        self.total_width = sum(column_maxes.values()) + (
             cell_spacing * (self.num_columns - 1)
         )
+        if column_maxes == self.column_maxes:
+            return
+        self.column_maxes = column_maxes
 
-        for columns, info in self.contents:
-            # row should be a Columns instance
+        for columns in self._all_row_columns():
             new_columns = []
             for idx, column_items in enumerate(columns.contents):
                 column_widget, column_info = column_items
@@ -146,8 +418,27 @@ class Table(urwid.Pile):
                     if idx > self.num_columns:
                         break
                     column_maxes[idx] = max(column_maxes[idx], widg_len)
+
+        if self.virtualized:
+            for idx, raw_max in self.calc_raw_column_maxes().items():
+                column_maxes[idx] = max(column_maxes[idx], raw_max)
+
         return column_maxes
 
+    def calc_raw_column_maxes(self):
+        """Calculate the column maxes of a virtualized table from the raw cell
+        text. Rendering every cell is what virtualization avoids, so the raw
+        text length is used as an upper bound instead. The result is only
+        calculated once.
+        """
+        if self._raw_column_maxes is None:
+            raw_maxes = defaultdict(int)
+            for row in self.table_rows:
+                for idx, cell in enumerate(row[:self.num_columns]):
+                    raw_maxes[idx] = max(raw_maxes[idx], len(cell))
+            self._raw_column_maxes = raw_maxes
+        return self._raw_column_maxes
+
     def create_cells(self, body_rows, modifier=None):
         """Create the rows for the body, optionally calling a modifier function
         on each created cell Text. The modifier must accept an urwid.Text object
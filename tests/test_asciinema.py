@@ -0,0 +1,69 @@
+"""
+Test the asciinema recording in lookatme/render/asciinema.py
+"""
+
+
+import io
+import json
+
+import urwid.raw_display
+
+from lookatme.render.asciinema import AsciinemaRecorder, RecordingScreen
+
+
+def _read_cast(path):
+    with open(path, "r") as f:
+        lines = [json.loads(x) for x in f.read().splitlines()]
+    return lines[0], lines[1:]
+
+
+def test_recorder(tmpdir):
+    """Test that output is written as v2 events, and that output close
+    together is merged
+    """
+    cast_path = str(tmpdir.join("out.cast"))
+    recorder = AsciinemaRecorder(cast_path, title="Talk", min_interval=60)
+    recorder.output("before size ")
+    recorder.resize(100, 30)
+    recorder.output("hello ")
+    recorder.output("world")
+    recorder.resize(80, 20)
+    recorder.output("!")
+    recorder.close()
+
+    header, events = _read_cast(cast_path)
+    assert header["version"] == 2
+    assert (header["width"], header["height"]) == (100, 30)
+    assert header["title"] == "Talk"
+
+    assert [x[1:] for x in events] == [
+        ["o", "before size "],
+        ["o", "hello world"],
+        ["r", "80x20"],
+        ["o", "!"],
+    ]
+    timestamps = [x[0] for x in events]
+    assert timestamps == sorted(timestamps)
+
+
+def test_recording_screen(tmpdir, mocker):
+    """Test that flushed terminal output and size changes are recorded
+    """
+    mocker.patch.object(
+        urwid.raw_display.Screen, "get_cols_rows", return_value=(40, 10))
+    cast_path = str(tmpdir.join("out.cast"))
+    recorder = AsciinemaRecorder(cast_path, min_interval=0)
+
+    output = io.StringIO()
+    screen = RecordingScreen(recorder, output=output)
+    assert screen.get_cols_rows() == (40, 10)
+    screen.write("\x1b[1;1H")
+    screen.write("hi")
+    screen.flush()
+    screen.get_cols_rows()
+    recorder.close()
+
+    assert output.getvalue() == "\x1b[1;1Hhi"
+    header, events = _read_cast(cast_path)
+    assert (header["width"], header["height"]) == (40, 10)
+    assert [x[1:] for x in events] == [["o", "\x1b[1;1Hhi"]]
@@ -0,0 +1,161 @@
+"""
+Tests for ClickableText and link navigation
+"""
+
+
+import urwid
+
+import lookatme.tui
+from lookatme.widgets.clickable_text import (ClickableText, LinkIndicatorSpec,
+                                             widget_links)
+from lookatme.widgets.lazy_walker import LazySlideWalker
+from tests.utils import create_test_tui
+
+LINK_SPEC = urwid.AttrSpec("#33c,underline", "default")
+
+
+def _link(label, target):
+    return (LinkIndicatorSpec(label, target, LINK_SPEC), label)
+
+
+def test_click_wrapped_link():
+    """Test that clicks are mapped to the text through the wrapped layout of
+    the text
+    """
+    text = ClickableText([
+        "some words here ",
+        _link("first", "http://first"),
+        " and then ",
+        _link("second", "http://second"),
+    ])
+    changed = []
+    urwid.connect_signal(text, "change", lambda *args: changed.append(True))
+
+    # wrapped at 12 columns, "second" starts the third row
+    assert text.render((12,)).text[2].rstrip() == b"and then"
+    assert text.render((12,)).text[3].rstrip() == b"second"
+    assert text.mouse_event((12,), "mouse press", 1, 0, 3, True)
+    assert text.text.endswith("http://second")
+    assert len(changed) == 1
+
+    # the first character of a link is part of the link
+    first_row = text.render((12,)).text[1]
+    assert first_row.startswith(b"here first")
+    text.mouse_event((12,), "mouse press", 1, 5, 1, True)
+    assert "http://first" in text.text
+
+
+def test_click_outside_links():
+    """Test that clicks on plain text and past the end of a row emit the
+    click signal
+    """
+    text = ClickableText(["plain ", _link("link", "target")], align="center")
+    clicked = []
+    urwid.connect_signal(text, "click", lambda *args: clicked.append(True))
+
+    text.mouse_event((30,), "mouse press", 1, 0, 0, True)
+    text.mouse_event((30,), "mouse press", 1, 29, 0, True)
+    text.mouse_event((30,), "mouse press", 1, 10, 0, True)
+    assert len(clicked) == 3
+    assert text.text == "plain link"
+
+
+def test_run_at():
+    """Test that attribute runs are found by text offset
+    """
+    text = ClickableText(["ab", _link("cd", "x"), "ef"])
+    # urwid does not keep a run for trailing text without attributes
+    assert [text.run_at(x) for x in range(7)] == [0, 0, 1, 1, None, None, None]
+    assert text.links() == [1]
+
+
+def test_widget_links_and_focus():
+    """Test that links are found in display order within nested widgets, and
+    that focused links are highlighted
+    """
+    first = ClickableText([_link("a", "1"), " ", _link("b", "2")])
+    second = ClickableText([_link("c", "3")])
+    widget = urwid.Padding(urwid.Columns([first, urwid.Pile([urwid.Divider(), second])]))
+    assert widget_links(urwid.Text("no links")) == []
+    assert widget_links(widget) == [(first, 0), (first, 2), (second, 0)]
+
+    first.set_focused_link(2)
+    spec = first.get_text()[1][2][0]
+    assert "standout" in spec.foreground
+    first.set_focused_link(None)
+    assert first.get_text()[1][2][0] is first._attrib[2][0]
+
+
+def test_tui_link_navigation(tmpdir, mocker):
+    """Test that tab cycles through the links of the slide, and that enter
+    activates the focused link
+    """
+    tui = create_test_tui(
+        tmpdir, mocker,
+        "# Links\n\n[one](http://one) and [two](http://two)\n\n* [three](http://three)",
+    )
+    renderer = lookatme.tui.SlideRenderer(tui.loop)
+    tui.slide_body.body = renderer.do_render(tui.pres.slides[0], 0)
+
+    size = (80, 20)
+    tui.keypress(size, "tab")
+    tui.keypress(size, "tab")
+    position, link_idx = tui.focused_link
+    widget, run_idx = widget_links(tui.slide_body.body[position])[link_idx]
+    assert widget.text[widget.run_starts()[run_idx]:].startswith("two")
+
+    tui.keypress(size, "enter")
+    assert "http://two" in widget.text
+
+    tui.keypress(size, "tab")
+    tui.keypress(size, "tab")
+    assert tui.focused_link == (position, 0)
+    tui.keypress(size, "shift tab")
+    assert tui.slide_body.focus_position == tui.focused_link[0]
+    assert tui.focused_link[0] > position
+
+
+def test_tui_link_navigation_lazy(tmpdir, mocker):
+    """Test that links of lazily built slide bodies are looked up by
+    position, so that the focused link is the displayed widget even after
+    positions were evicted and rebuilt
+    """
+    mocker.patch.object(lookatme.tui.SlideRenderer, "LAZY_RENDER_THRESHOLD", new=0)
+
+    # links at the start and the end, more than 2 * window positions apart
+    paragraphs = ["[first](http://first)"]
+    paragraphs += [f"paragraph {idx}" for idx in range(30)]
+    paragraphs += ["[last](http://last)"]
+    tui = create_test_tui(tmpdir, mocker, "\n\n".join(paragraphs))
+    renderer = lookatme.tui.SlideRenderer(tui.loop)
+    body = renderer.do_render(tui.pres.slides[0], 0)
+    assert isinstance(body, LazySlideWalker)
+    body.window = 5
+    tui.slide_body.body = body
+    build_spy = mocker.spy(body, "_build")
+
+    size = (80, 20)
+    tui.keypress(size, "shift tab")
+    assert tui.focused_link == (len(body) - 1, 0)
+    # the widgets in between are not built
+    assert build_spy.call_count < len(body) // 2
+
+    last = len(body) - 1
+    old_widget, _ = widget_links(body[last])[0]
+
+    # scrolling away evicts the position of the focused link
+    body.set_focus(0)
+    for position in range(2 * body.window + 1):
+        body[position]
+    assert last not in body._built
+
+    tui.keypress(size, "enter")
+    widget, run_idx = widget_links(body[last])[0]
+    assert widget is not old_widget
+    assert "http://last" in widget.text
+    assert widget._focused_link == run_idx
+    assert "http://last" not in old_widget.text
+
+    tui.keypress(size, "tab")
+    assert tui.focused_link == (0, 0)
+    assert tui.slide_body.focus_position == 0
@@ -0,0 +1,100 @@
+"""
+Tests for the code block widget
+"""
+
+
+import urwid
+
+import lookatme.widgets.code_block as code_block
+from lookatme.widgets.code_block import CodeBlock, split_lines
+from tests.utils import row_text
+
+
+def _texts(canvas):
+    return [row_text(x).rstrip() for x in canvas.content()]
+
+
+def test_split_lines():
+    """Test that markup is split into the markup of each line
+    """
+    markup = [("a", "def f():\n"), ("b", "    pass"), "\n", "\n", ("c", "x")]
+    assert split_lines(markup) == [
+        [("a", "def f():")],
+        [("b", "    pass")],
+        "",
+        [("c", "x")],
+    ]
+
+
+def test_short_blocks_not_scrollable():
+    """Test that code blocks with at most ``max_rows`` lines display every
+    line, including wrapped lines
+    """
+    block = CodeBlock(["a" * 15, "b"], max_rows=2)
+    assert not block.selectable()
+    assert block.rows((10,)) == 3
+    assert _texts(block.render((10,))) == [b"a" * 10, b"a" * 5, b"b"]
+    assert block.keypress((10,), "down") == "down"
+
+
+def test_long_blocks_scroll(mocker):
+    """Test that long code blocks display and lay out only the visible lines,
+    followed by a scroll indicator, and leave keys that would scroll past
+    either end unhandled
+    """
+    mocker.patch.object(code_block, "LINE_CACHE_SIZE", new=8)
+    block = CodeBlock([f"line {x}" for x in range(1000)], max_rows=3)
+    assert block.selectable()
+    assert block.rows((20,)) == 4
+    assert _texts(block.render((20,))) == [
+        b"line 0", b"line 1", b"line 2", "lines 1-3 of 1000 ↓".rjust(20).encode(),
+    ]
+
+    assert block.keypress((20,), "up") == "up"
+    assert block.keypress((20,), "down") is None
+    assert block.keypress((20,), "page down") is None
+    assert _texts(block.render((25,))) == [
+        b"line 3", b"line 4", b"line 5", "↑ lines 4-6 of 1000 ↓".rjust(25).encode(),
+    ]
+
+    block.top = 10000
+    assert _texts(block.render((25,)))[:3] == [b"line 997", b"line 998", b"line 999"]
+    assert _texts(block.render((25,)))[3].strip() == "↑ lines 998-1000 of 1000".encode()
+    assert block.keypress((20,), "down") == "down"
+    assert block.mouse_event((20,), "mouse press", 4, 0, 0, True)
+    assert block.top == 994
+    assert len(block._texts) <= 8
+
+
+def test_scroll_with_wrapped_lines():
+    """Test that long code blocks with wrapped lines always fill the window
+    """
+    block = CodeBlock(["x"] * 5 + ["y" * 25], max_rows=4)
+    assert block.max_top(10) == 4
+    block.top = 5
+    assert _texts(block.render((10,)))[:4] == [b"x", b"y" * 10, b"y" * 10, b"y" * 5]
+
+
+def test_unlimited_rows():
+    """Test that code blocks without ``max_rows`` display every line
+    """
+    block = CodeBlock([f"line {x}" for x in range(100)], max_rows=None)
+    assert not block.selectable()
+    assert block.rows((20,)) == 100
+    assert _texts(block.render((20,)))[-1] == b"line 99"
+
+
+def test_code_block_in_listbox():
+    """Test that the slide scrolls past a code block once it is scrolled to
+    its end
+    """
+    block = CodeBlock([f"line {x}" for x in range(20)], max_rows=4)
+    listbox = urwid.ListBox(urwid.SimpleFocusListWalker([
+        urwid.Text("before"),
+        urwid.AttrMap(block, None),
+        urwid.Text("after"),
+    ]))
+    for _ in range(30):
+        listbox.keypress((20, 3), "down")
+    assert block.top == 16
+    assert _texts(listbox.render((20, 3)))[-1] == b"after"
@@ -0,0 +1,99 @@
+"""
+Test style resolution and metadata caching
+"""
+
+
+import pytest
+
+import lookatme.config
+import lookatme.parser
+import lookatme.themes
+import lookatme.themes.dark as dark_theme
+from lookatme.utils import LayeredDict, dict_deep_update
+
+
+def test_layered_dict_precedence():
+    """Test that later layers take precedence, and that nested dicts are
+    merged the same way as with dict_deep_update
+    """
+    base = {"a": 1, "nested": {"x": 1, "y": 2}, "replaced": {"x": 1}}
+    override = {"nested": {"y": 3}, "replaced": "scalar", "b": 2}
+    layered = LayeredDict(base, override)
+
+    merged = {"a": 1, "nested": {"x": 1, "y": 2}, "replaced": {"x": 1}}
+    dict_deep_update(merged, override)
+    assert layered.to_dict() == merged
+    assert layered == merged
+    assert layered["nested"]["y"] == 3
+    assert layered.get("missing", "default") == "default"
+    assert "b" in layered
+    assert sorted(layered) == ["a", "b", "nested", "replaced"]
+
+
+def test_layered_dict_copy_on_write():
+    """Test that writes never modify the layers
+    """
+    base = {"a": 1, "nested": {"x": 1}}
+    layered = LayeredDict(base)
+
+    layered["a"] = 2
+    layered["nested"]["x"] = 2
+    del layered["nested"]["x"]
+    layered["new"] = 3
+
+    assert base == {"a": 1, "nested": {"x": 1}}
+    assert layered.to_dict() == {"a": 2, "nested": {}, "new": 3}
+    with pytest.raises(KeyError):
+        layered["nested"]["x"]
+
+
+def test_theme_defaults_cached(mocker):
+    """Test that the defaults of a theme are only dumped once
+    """
+    mocker.patch.object(lookatme.themes, "_THEME_DEFAULTS", new={})
+    dump = mocker.spy(lookatme.themes.StyleSchema, "dump")
+
+    first = lookatme.themes.theme_defaults(dark_theme)
+    second = lookatme.themes.theme_defaults(dark_theme)
+    assert first is second
+    assert dump.call_count == 1
+
+    # ensure_defaults returns a copy that may be modified
+    defaults = lookatme.themes.ensure_defaults(dark_theme)
+    defaults["style"] = "changed"
+    assert first["style"] != "changed"
+
+
+def test_style_precedence():
+    """Test that presentation styles override the theme, and that the CLI
+    style overrides both
+    """
+    styles = lookatme.config.get_style_with_precedence(
+        dark_theme,
+        {"style": "emacs", "table": {"column_spacing": 7}},
+        None,
+    )
+    defaults = lookatme.themes.theme_defaults(dark_theme)
+    assert styles["style"] == "emacs"
+    assert styles["table"]["column_spacing"] == 7
+    assert styles["table"]["header_divider"] == defaults["table"]["header_divider"]
+
+    styles = lookatme.config.get_style_with_precedence(dark_theme, {"style": "emacs"}, "vim")
+    assert styles["style"] == "vim"
+
+
+def test_meta_cached(mocker):
+    """Test that unchanged metadata is only validated once, and that the
+    returned metadata can be modified
+    """
+    mocker.patch.object(lookatme.parser, "_META_CACHE", new=lookatme.parser.OrderedDict())
+    loads = mocker.spy(lookatme.parser.MetaSchema, "loads_partial_styles")
+
+    data = "---\ntitle: Title\nstyles:\n  style: emacs\n---\n# Slide"
+    _, meta = lookatme.parser.Parser().parse_meta(data)
+    meta["styles"]["style"] = "changed"
+    _, meta = lookatme.parser.Parser().parse_meta(data)
+
+    assert loads.call_count == 1
+    assert meta["title"] == "Title"
+    assert meta["styles"]["style"] == "emacs"
@@ -2,6 +2,8 @@
 This module tests contrib-specific functionality
 """
 
+import sys
+
 import urwid
 from six.moves import StringIO, reload_module  # type: ignore
 
@@ -45,3 +47,156 @@ def test_overridable_root(mocker):
     tui = lookatme.tui.MarkdownTui(pres)
 
     assert isinstance(tui.loop.widget, Wrapper)
+
+
+def test_declined_and_dispatch_rebuild(mocker):
+    """Ensure that DECLINED falls through to the next handler, and that the
+    dispatch table follows changes to the loaded contrib modules
+    """
+    calls = []
+
+    @lookatme.contrib.contrib_first
+    def hook(value):
+        calls.append("default")
+        return "default"
+
+    class Declines:
+        @staticmethod
+        def hook(value):
+            calls.append("declines")
+            return lookatme.contrib.DECLINED
+
+    class Handles:
+        @staticmethod
+        def hook(value):
+            calls.append("handles")
+            return value * 2
+
+    mocker.patch("lookatme.contrib.CONTRIB_MODULES", new=[Declines])
+    assert hook(1) == "default"
+    assert calls == ["declines", "default"]
+
+    lookatme.contrib.CONTRIB_MODULES.append(Handles)
+    calls.clear()
+    assert hook(2) == 4
+    assert calls == ["declines", "handles"]
+
+
+def test_render_code_lang_routing(mocker):
+    """Ensure that render_code is only routed to contrib modules whose
+    CODE_LANGS match, and that changed languages are re-routed
+    """
+    calls = []
+
+    class FileLike:
+        CODE_LANGS = ["file"]
+
+        @staticmethod
+        def render_code(token, body, stack, loop):
+            calls.append("file")
+            token["lang"] = "shout"
+            return lookatme.contrib.DECLINED
+
+    class Shout:
+        CODE_LANGS = ["shout*"]
+
+        @staticmethod
+        def render_code(token, body, stack, loop):
+            calls.append("shout")
+            return [urwid.Text(token["text"].upper())]
+
+    mocker.patch("lookatme.contrib.CONTRIB_MODULES", new=[FileLike, Shout])
+
+    render_code = lookatme.render.markdown_block.render_code
+    res = render_code({"type": "code", "lang": "file", "text": "hi"}, None, None, None)
+    assert res[0].text == "HI"
+    assert calls == ["file", "shout"]
+
+    calls.clear()
+    render_code({"type": "code", "lang": "shout-loud", "text": "hi"}, None, None, None)
+    assert calls == ["shout"]
+
+    calls.clear()
+    mocker.patch.object(lookatme.config, "LOG")
+    mocker.patch("lookatme.config.STYLE", new={"style": "monokai"})
+    render_code({"type": "code", "lang": "python", "text": "hi"}, None, None, None)
+    assert calls == []
+
+
+def test_entry_point_extensions_load_lazily(tmpdir, mocker):
+    """Ensure that extensions registered through entry points are only
+    imported once a matching code block is rendered
+    """
+    tmpdir.join("lazy_ext_mod.py").write(
+        "import urwid\n"
+        "def render_code(token, body, stack, loop):\n"
+        "    return [urwid.Text('lazy ' + token['text'])]\n"
+    )
+    mocker.patch("sys.path", new=[str(tmpdir)] + sys.path)
+    mocker.patch.dict(sys.modules)
+    sys.modules.pop("lazy_ext_mod", None)
+
+    entry_point = mocker.Mock()
+    entry_point.name = "lazy"
+    entry_point.load.return_value = {
+        "module": "lazy_ext_mod",
+        "hooks": ["render_code"],
+        "code_langs": ["lazy"],
+        "user_warnings": ["be careful"],
+    }
+    mocker.patch.object(lookatme.contrib, "_entry_points", return_value=[entry_point])
+    mocker.patch.object(lookatme.contrib, "_ENTRY_POINT_SPECS", new=None)
+    mocker.patch.object(lookatme.contrib, "_LAZY_CONTRIBS", new={})
+    mocker.patch("lookatme.contrib.CONTRIB_MODULES", new=[])
+
+    lookatme.contrib.load_contribs(["lazy"], {"lazy"})
+    assert "lazy_ext_mod" not in sys.modules
+    assert lookatme.contrib.validate_extension_mod("lazy", lookatme.contrib.CONTRIB_MODULES[0]) == [
+        "be careful",
+    ]
+
+    mocker.patch.object(lookatme.config, "LOG")
+    mocker.patch("lookatme.config.STYLE", new={"style": "monokai"})
+    render_code = lookatme.render.markdown_block.render_code
+    render_code({"type": "code", "lang": "python", "text": "hi"}, None, None, None)
+    assert "lazy_ext_mod" not in sys.modules
+
+    res = render_code({"type": "code", "lang": "lazy", "text": "hi"}, None, None, None)
+    assert res[0].text == "lazy hi"
+    assert "lazy_ext_mod" in sys.modules
+
+
+def test_builtin_extensions_are_lazy(mocker):
+    """Ensure that loading the builtin extensions, including displaying their
+    user warnings, does not import them
+    """
+    mocker.patch.dict(sys.modules)
+    for name in lookatme.contrib.BUILTIN_EXTENSIONS:
+        sys.modules.pop(f"lookatme.contrib.{name}", None)
+        # importing the module again replaces the package attribute
+        if hasattr(lookatme.contrib, name):
+            mocker.patch.object(lookatme.contrib, name, new=getattr(lookatme.contrib, name))
+    mocker.patch.object(lookatme.contrib, "_LAZY_CONTRIBS", new={})
+    mocker.patch("lookatme.contrib.CONTRIB_MODULES", new=[])
+    yes = mocker.patch("lookatme.prompt.yes", return_value=True)
+    mocker.patch("builtins.print")
+
+    lookatme.contrib.load_contribs(list(lookatme.contrib.BUILTIN_EXTENSIONS), set())
+    assert yes.call_count == 1
+    assert len(lookatme.contrib.CONTRIB_MODULES) == len(lookatme.contrib.BUILTIN_EXTENSIONS)
+    for name, spec in lookatme.contrib.BUILTIN_EXTENSIONS.items():
+        assert spec["module"] not in sys.modules
+        assert lookatme.contrib.find_extension(name).load().user_warnings() == spec["user_warnings"]
+
+
+def test_missing_extension_module(mocker):
+    """Ensure that extensions whose module cannot be found fail to load
+    """
+    mocker.patch.object(lookatme.contrib, "_LAZY_CONTRIBS", new={})
+    mocker.patch("lookatme.contrib.CONTRIB_MODULES", new=[])
+    mocker.patch.dict(lookatme.contrib.BUILTIN_EXTENSIONS, {
+        "missing": {"module": "lookatme_missing_ext_mod", "hooks": ["render_code"]},
+    })
+
+    lookatme.contrib.load_contribs(["missing"], {"missing"}, ignore_load_failure=True)
+    assert lookatme.contrib.CONTRIB_MODULES == []
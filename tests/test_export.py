@@ -0,0 +1,127 @@
+"""
+Test the headless exporting of presentations
+"""
+
+
+import urwid
+
+import lookatme.export
+import lookatme.widgets.code_block
+from tests.utils import setup_lookatme
+
+
+def test_ansi_sgr():
+    """Test that attribute specs are converted to SGR sequences
+    """
+    assert lookatme.export.ansi_sgr(None) == "\x1b[0m"
+
+    spec = urwid.AttrSpec("#f30,bold,italics", "default", colors=256)
+    assert lookatme.export.ansi_sgr(spec) == "\x1b[0;1;3;38;2;255;95;0m"
+
+
+def test_canvas_rows_string_attrs():
+    """Test that plain string attributes are converted to specs
+    """
+    canvas = urwid.Text([("bold", "hi"), " there"]).render((10,))
+    rows = lookatme.export.canvas_rows(canvas)
+    assert len(rows) == 1
+    (spec, text), (plain_spec, plain_text) = rows[0]
+    assert text == "hi"
+    assert spec.bold
+    assert plain_spec is None
+    assert plain_text == " there" + " " * 2
+
+
+def test_encodings():
+    """Test that text is escaped in the HTML and SVG encodings
+    """
+    rows = [[(urwid.AttrSpec("bold", "#000", colors=256), "a<b")]]
+    html = lookatme.export.encode_rows(rows, "html", 3, 1)
+    assert '<span style="background:#000000;font-weight:bold">a&lt;b</span>' in html
+
+    svg = lookatme.export.encode_rows(rows, "svg", 3, 1)
+    assert 'font-weight="bold"' in svg
+    assert "a&lt;b</text>" in svg
+    assert 'fill="#000000"' in svg
+
+
+def test_export_decks(tmpdir, mocker):
+    """Test that every slide of every deck is exported
+    """
+    # the presentation's theme styles replace the patched global style
+    setup_lookatme(tmpdir, mocker, style={})
+    mocker.patch.object(lookatme.export, "_WORKER_PRESENTATIONS", new={})
+
+    deck1 = tmpdir.join("deck.md")
+    deck1.write("# Slide 1\n\n---\n\n# Slide 2\n")
+    deck2 = tmpdir.mkdir("other").join("deck.md")
+    deck2.write("# Other\n")
+    out_dir = tmpdir.join("out")
+
+    written = lookatme.export.export_decks(
+        [str(deck1), str(deck2)],
+        str(out_dir),
+        fmt="ansi",
+        width=40,
+        height=5,
+        jobs=1,
+    )
+    assert sorted(written) == [
+        str(out_dir.join("deck", "slide_0001.ans")),
+        str(out_dir.join("deck", "slide_0002.ans")),
+        str(out_dir.join("deck_2", "slide_0001.ans")),
+    ]
+
+    lines = out_dir.join("deck", "slide_0002.ans").read().splitlines()
+    assert len(lines) == 5
+    # the dark theme's padding is applied
+    assert lines[1].startswith("\x1b[0m" + " " * 10 + "\x1b[0;1;38;2;135;255;215m██ Slide 2")
+
+
+def test_export_decks_parallel(tmpdir, mocker):
+    """Test that decks are only parsed by the worker processes, and that
+    their slides are spread across the workers
+    """
+    setup_lookatme(tmpdir, mocker, style={})
+    mocker.patch.object(lookatme.export, "_WORKER_PRESENTATIONS", new={})
+
+    deck1 = tmpdir.join("deck.md")
+    deck1.write("\n\n---\n\n".join(f"# Slide {idx}" for idx in range(5)))
+    deck2 = tmpdir.join("other.md")
+    deck2.write("# Other")
+    out_dir = tmpdir.join("out")
+
+    written = lookatme.export.export_decks(
+        [str(deck1), str(deck2)],
+        str(out_dir),
+        fmt="ansi",
+        width=40,
+        height=5,
+        jobs=2,
+    )
+    assert written == [
+        str(out_dir.join("deck", f"slide_{idx:04d}.ans")) for idx in range(1, 6)
+    ] + [str(out_dir.join("other", "slide_0001.ans"))]
+    assert lookatme.export._WORKER_PRESENTATIONS == {}
+    assert "Slide 4" in out_dir.join("deck", "slide_0005.ans").read()
+
+
+def test_export_long_code_block(tmpdir, mocker):
+    """Test that exported code blocks are not cut off at the scroll window
+    of the TUI
+    """
+    setup_lookatme(tmpdir, mocker, style={})
+    mocker.patch.object(lookatme.export, "_WORKER_PRESENTATIONS", new={})
+
+    num_lines = lookatme.widgets.code_block.MAX_ROWS + 10
+    code = "\n".join(f"line_{idx} = {idx}" for idx in range(num_lines))
+    deck = tmpdir.join("deck.md")
+    deck.write(f"# Code\n\n```python\n{code}\n```\n")
+    out_dir = tmpdir.join("out")
+
+    lookatme.export.export_decks(
+        [str(deck)], str(out_dir), fmt="html", width=60, height=num_lines + 10, jobs=1,
+    )
+    exported = out_dir.join("deck", "slide_0001.html").read()
+    assert f"line_{num_lines - 1}" in exported
+    assert " of {}".format(num_lines) not in exported
@@ -4,11 +4,15 @@ Test the file loader built-in extension
 
 
 import pytest
+import urwid
 
 import lookatme.config
 import lookatme.contrib.file_loader
 import lookatme.render.pygments
-from tests.utils import assert_render, render_markdown
+import lookatme.tui
+from lookatme.pres import Presentation
+from lookatme.widgets.lazy_walker import LazySlideWalker
+from tests.utils import assert_render, render_markdown, row_text
 
 TEST_STYLE = {
     "style": "monokai",
@@ -129,3 +133,46 @@ path: does_not_exist.py
         b'',
     ]
     assert_render(stripped_rows, rendered)
+
+
+def test_file_loader_auto_lang(tmpdir, mocker):
+    """Test that the language of the file is detected from its filename by
+    default
+    """
+    tmppath = tmpdir.join("test.py")
+    tmppath.write("print('hello')")
+    token = {"type": "code", "lang": "file", "text": f"path: {tmppath}\nrelative: false"}
+
+    assert lookatme.contrib.file_loader.code_lang(token) == "python"
+    lookatme.contrib.file_loader.render_code(token, None, None, None)
+    assert token["lang"] == "python"
+
+    assert lookatme.contrib.file_loader.detect_lang("notes.unknownext") == "text"
+
+
+def test_file_loader_lazy_multiple_files(tmpdir, mocker):
+    """Test that files loaded by lazily rendered slides are relative to the
+    file the slide came from, even after slides of other files were rendered
+    """
+    mocker.patch.object(lookatme.tui.SlideRenderer, "LAZY_RENDER_THRESHOLD", new=0)
+    paths = []
+    for name in ["part1", "part2"]:
+        tmpdir.mkdir(name).join("data.txt").write(f"data of {name}")
+        path = tmpdir.join(name, "slides.md")
+        path.write(f"# {name}\n\n```file\npath: data.txt\n```")
+        paths.append(str(path))
+
+    streams = [open(x, "r") for x in paths]
+    try:
+        pres = Presentation(streams, "dark")
+    finally:
+        for stream in streams:
+            stream.close()
+
+    renderer = lookatme.tui.SlideRenderer(mocker.Mock())
+    bodies = [renderer.do_render(slide, slide.number) for slide in pres.slides]
+    assert all(isinstance(x, LazySlideWalker) for x in bodies)
+
+    for name, body in reversed(list(zip(["part1", "part2"], bodies))):
+        rows = [row_text(x).strip() for x in urwid.ListBox(body).render((60, 20)).content()]
+        assert f"data of {name}".encode() in rows
@@ -0,0 +1,126 @@
+"""
+Test the image extension in examples/image_contrib
+"""
+
+
+import collections
+import importlib.util
+import os
+import threading
+
+import pytest
+
+numpy = pytest.importorskip("numpy")
+Image = pytest.importorskip("PIL.Image")
+
+IMAGE_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "examples", "image_contrib", "lookatme",
+    "contrib", "image.py",
+)
+
+
+@pytest.fixture(scope="module")
+def image():
+    spec = importlib.util.spec_from_file_location("image_contrib", IMAGE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    yield module
+    module._POOL.shutdown()
+
+
+@pytest.fixture
+def empty_caches(image, mocker):
+    mocker.patch.object(image, "_SIZES", new={})
+    mocker.patch.object(image, "_DECODED", new=collections.OrderedDict())
+    mocker.patch.object(image, "_RESULTS", new=collections.OrderedDict())
+    mocker.patch.object(image, "_PENDING", new={})
+
+
+def _write_image(path, color, size=(4, 4)):
+    Image.new("RGB", size, color).save(str(path))
+
+
+def _markup(image, key):
+    done = threading.Event()
+    markup = image.get_markup(key, done.set)
+    if markup is None:
+        assert done.wait(5)
+        markup = image.get_markup(key, done.set)
+    return markup
+
+
+def test_fit_cells(image):
+    """Test that images are scaled to fit the width, keeping their aspect
+    ratio with two pixels per cell
+    """
+    assert image.fit_cells((100, 50), 40) == (40, 10)
+    # small images are not scaled up
+    assert image.fit_cells((10, 10), 80) == (10, 5)
+    # tall images are limited to MAX_ROWS, and narrowed to keep their aspect
+    assert image.fit_cells((100, 400), 80) == (20, image.MAX_ROWS)
+    assert image.fit_cells((10, 1000), 80) == (1, image.MAX_ROWS)
+
+
+def test_area_average(image):
+    """Test that downscaling averages the covered source pixels
+    """
+    pixels = numpy.zeros((4, 4, 3), dtype=numpy.uint8)
+    pixels[:2, 2:] = 200
+    pixels[2:, :2] = [10, 20, 30]
+    pixels[3, 3] = 100
+    integral = image.integral_image(pixels)
+
+    res = image.area_average(integral, 2, 2)
+    assert res.tolist() == [
+        [[0, 0, 0], [200, 200, 200]],
+        [[10, 20, 30], [25, 25, 25]],
+    ]
+    assert image.area_average(integral, 1, 1).tolist() == [[[59, 61, 64]]]
+    # upscaling repeats the source pixels
+    assert image.area_average(integral, 8, 8).shape == (8, 8, 3)
+
+
+def test_to_markup(image):
+    """Test that pixel pairs are merged into runs of half blocks
+    """
+    pixels = numpy.array([
+        [[255, 0, 0], [255, 0, 0], [0, 0, 0]],
+        [[0, 0, 255], [0, 0, 255], [0, 0, 0]],
+    ], dtype=numpy.uint8)
+    markup = image.to_markup(pixels, 2 ** 24)
+    assert [x[1] for x in markup] == ["▀▀", "▀"]
+    assert markup[0][0].foreground == "#ff0000"
+    assert markup[0][0].background == "#0000ff"
+
+    markup = image.to_markup(numpy.concatenate([pixels, pixels]), 256)
+    assert [x if isinstance(x, str) else x[1] for x in markup] == ["▀▀", "▀", "\n", "▀▀", "▀"]
+    assert markup[0][0].foreground == "#f00"
+
+
+def test_result_cache(image, empty_caches, tmpdir, mocker):
+    """Test that scaled images are cached by path, modification time, size,
+    and color depth
+    """
+    path = tmpdir.join("img.png")
+    _write_image(path, (255, 0, 0))
+    mtime = os.path.getmtime(str(path))
+    open_spy = mocker.spy(image.Image, "open")
+
+    key = (str(path), mtime, (2, 1), 2 ** 24)
+    markup = _markup(image, key)
+    assert markup[0][0].foreground == "#ff0000"
+    assert open_spy.call_count == 1
+    assert _markup(image, key) is markup
+    assert open_spy.call_count == 1
+
+    # other sizes are scaled from the decoded image
+    _markup(image, (str(path), mtime, (4, 2), 2 ** 24))
+    assert open_spy.call_count == 1
+
+    # a changed modification time invalidates the cached results
+    _write_image(path, (0, 255, 0))
+    os.utime(str(path), (mtime + 10, mtime + 10))
+    new_mtime = os.path.getmtime(str(path))
+    markup = _markup(image, (str(path), new_mtime, (2, 1), 2 ** 24))
+    assert markup[0][0].foreground == "#00ff00"
+    assert open_spy.call_count == 2
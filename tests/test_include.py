@@ -0,0 +1,185 @@
+"""
+Test the markdown include directive
+"""
+
+
+import os
+
+import pytest
+
+import lookatme.include
+from lookatme.exceptions import IncludeError
+from lookatme.include import IncludeCache
+from lookatme.parser import Parser
+from lookatme.pres import Presentation
+from tests.utils import create_test_tui, setup_lookatme
+
+
+def _texts(slides):
+    return [[x.get("text", None) for x in slide.tokens] for slide in slides]
+
+
+def _parse(path, includes):
+    parser = Parser(source_path=str(path), includes=includes)
+    return parser.parse(path.read())
+
+
+def _touch(path, data):
+    path.write(data)
+    # make sure the modification time changes
+    stat = os.stat(str(path))
+    os.utime(str(path), ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+def test_include_nested(tmpdir):
+    """Test that includes are expanded recursively, relative to the including
+    file
+    """
+    tmpdir.mkdir("sub")
+    main = tmpdir.join("main.md")
+    main.write("# One\n\n<!-- include: sub/a.md -->\n\n---\n\n# Two")
+    tmpdir.join("sub", "a.md").write("from a\n\n<!-- include: b.md -->")
+    tmpdir.join("sub", "b.md").write("from b")
+
+    includes = IncludeCache()
+    _, slides = _parse(main, includes)
+    assert _texts(slides) == [["One", "from a", "from b"], ["Two"]]
+    assert includes.dependencies(str(main)) == {
+        str(tmpdir.join("sub", "a.md")),
+        str(tmpdir.join("sub", "b.md")),
+    }
+    assert includes.dependents(str(tmpdir.join("sub", "b.md"))) == {
+        str(main),
+        str(tmpdir.join("sub", "a.md")),
+    }
+
+
+def test_include_in_code_block(tmpdir):
+    """Test that include directives within code blocks are not expanded
+    """
+    main = tmpdir.join("main.md")
+    main.write("```\n<!-- include: missing.md -->\n```")
+    _, slides = _parse(main, IncludeCache())
+    assert _texts(slides) == [["<!-- include: missing.md -->"]]
+
+
+def test_include_cycle(tmpdir):
+    """Test that include cycles are detected
+    """
+    main = tmpdir.join("main.md")
+    main.write("<!-- include: a.md -->")
+    tmpdir.join("a.md").write("<!-- include: main.md -->")
+
+    with pytest.raises(IncludeError, match="Include cycle"):
+        _parse(main, IncludeCache())
+
+
+def test_include_missing(tmpdir):
+    """Test that missing included files raise an error
+    """
+    main = tmpdir.join("main.md")
+    main.write("<!-- include: missing.md -->")
+
+    with pytest.raises(IncludeError, match="not found"):
+        _parse(main, IncludeCache())
+
+
+def test_include_cache(tmpdir):
+    """Test that included files are only lexed again when their content
+    changes, and that included tokens are copies
+    """
+    shared = tmpdir.join("shared.md")
+    shared.write("# Shared")
+    decks = []
+    for idx in range(2):
+        deck = tmpdir.join(f"deck{idx}.md")
+        deck.write("<!-- include: shared.md -->\n\n---\n\n# Own")
+        decks.append(deck)
+
+    includes = IncludeCache()
+    _, slides = _parse(decks[0], includes)
+    slides[0].tokens[0]["text"] = "modified"
+    _, slides = _parse(decks[1], includes)
+    assert _texts(slides)[0] == ["Shared"]
+    assert includes.lex_count == 1
+
+    # same content, new modification time
+    fingerprint = includes.fingerprint(str(decks[0]))
+    _touch(shared, "# Shared")
+    assert includes.fingerprint(str(decks[0])) != fingerprint
+    _parse(decks[0], includes)
+    assert includes.lex_count == 1
+
+    _touch(shared, "# Changed")
+    _, slides = _parse(decks[0], includes)
+    assert includes.lex_count == 2
+    assert _texts(slides)[0] == ["Changed"]
+
+
+def test_include_change_does_not_lex_parent(tmpdir, mocker):
+    """Test that the including document is not lexed again when only an
+    included file changed
+    """
+    main = tmpdir.join("main.md")
+    main.write("# Main\n\n---\n\n<!-- include: shared.md -->")
+    shared = tmpdir.join("shared.md")
+    shared.write("# Shared")
+    includes = IncludeCache()
+    _, slides = _parse(main, includes)
+
+    lex_spy = mocker.spy(lookatme.include.mistune.BlockLexer, "parse")
+    _touch(shared, "# Changed\n\n---\n\n# Added")
+    _, slides = _parse(main, includes)
+    assert lex_spy.call_count == 1
+    assert _texts(slides) == [["Main"], ["Changed"], ["Added"]]
+
+    # the cached tokens are not modified by splitting slides
+    _, slides = _parse(main, includes)
+    assert _texts(slides) == [["Main"], ["Changed"], ["Added"]]
+
+    main.write("# Other\n\n---\n\n<!-- include: shared.md -->")
+    _, slides = _parse(main, includes)
+    assert lex_spy.call_count == 2
+    assert _texts(slides)[0] == ["Other"]
+
+
+def test_pres_reparses_on_include_change(tmpdir, mocker):
+    """Test that presentations are parsed again when an included file
+    changes, and only then
+    """
+    setup_lookatme(tmpdir, mocker)
+    main = tmpdir.join("main.md")
+    main.write("# Main\n\n---\n\n<!-- include: shared.md -->")
+    shared = tmpdir.join("shared.md")
+    shared.write("# Shared")
+
+    with open(str(main), "r") as f:
+        pres = Presentation(f, "dark")
+    parse = mocker.spy(pres, "parse")
+
+    pres.reload(changed=[0])
+    assert parse.call_count == 0
+
+    _touch(shared, "# Changed")
+    pres.reload(changed=[0])
+    assert parse.call_count == 1
+    assert _texts(pres.slides) == [["Main"], ["Changed"]]
+
+
+def test_tui_reload_keeps_unchanged_slides(tmpdir, mocker):
+    """Test that a live reload only renders the slides that changed again
+    """
+    shared = tmpdir.join("shared.md")
+    shared.write("# Two")
+    tui = create_test_tui(
+        tmpdir, mocker, "# One\n\n---\n\n<!-- include: shared.md -->\n\n---\n\n# Three",
+    )
+    tui.slide_renderer.cache = {0: "zero", 1: "one", 2: "two"}
+
+    _touch(shared, "# Changed")
+    tui.reload(changed=[0])
+    assert tui.slide_renderer.cache == {0: "zero", 2: "two"}
+    assert [x.number for x in tui.slide_renderer.queue.queue] == [1]
+
+    tui.reload()
+    assert tui.slide_renderer.cache == {}
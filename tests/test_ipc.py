@@ -0,0 +1,37 @@
+"""
+Test the message framing in lookatme/ipc.py
+"""
+
+
+import os
+import socket
+
+import lookatme.ipc
+
+
+def test_message_fds():
+    """Test that messages and file descriptors are passed over the socket
+    """
+    left, right = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+    read_fd, write_fd = os.pipe()
+    try:
+        lookatme.ipc.send_message(left, {"hello": "world"}, fds=[write_fd])
+        lookatme.ipc.send_message(left, {"second": True})
+
+        msg, fds = lookatme.ipc.recv_message(right)
+        assert msg == {"hello": "world"}
+        assert len(fds) == 1
+
+        # the received fd refers to the same pipe
+        os.write(fds[0], b"hi")
+        os.close(fds[0])
+        assert os.read(read_fd, 2) == b"hi"
+
+        msg, fds = lookatme.ipc.recv_message(right)
+        assert msg == {"second": True}
+        assert fds == []
+    finally:
+        for fd in (read_fd, write_fd):
+            os.close(fd)
+        left.close()
+        right.close()
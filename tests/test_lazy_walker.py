@@ -0,0 +1,105 @@
+"""
+Test the lazily-rendering ListWalker in lookatme/widgets/lazy_walker.py
+"""
+
+
+import urwid
+
+import lookatme.tui
+from lookatme.widgets.lazy_walker import LazySlideWalker, split_top_level
+from tests.utils import render_markdown, row_text, setup_lookatme
+
+TEST_STYLE = {
+    "style": "monokai",
+    "bullets": {
+        "default": "*",
+    },
+    "headings": {
+        "default": {
+            "fg": "bold",
+            "bg": "",
+            "prefix": "|",
+            "suffix": "|",
+        },
+    },
+    "quote": {
+        "side": ">",
+        "top_corner": "-",
+        "bottom_corner": "-",
+        "style": {"fg": "", "bg": ""},
+    },
+}
+
+LONG_MARKDOWN = "\n".join(
+    f"""
+# Heading {idx}
+
+paragraph {idx}
+
+* item {idx}
+  * nested {idx}
+
+> quote {idx}
+""" for idx in range(20)
+)
+
+
+def test_split_top_level():
+    """Test that tokens are split into top-level groups
+    """
+    tokens = [
+        {"type": "heading"},
+        {"type": "list_start"},
+        {"type": "list_item_start"},
+        {"type": "text"},
+        {"type": "list_item_end"},
+        {"type": "list_end"},
+        {"type": "paragraph"},
+    ]
+    groups = split_top_level(tokens)
+    assert [len(x) for x in groups] == [1, 5, 1]
+
+
+def test_lazy_matches_eager(tmpdir, mocker):
+    """Test that a lazily rendered slide looks identical to an eagerly
+    rendered one
+    """
+    setup_lookatme(tmpdir, mocker, style=TEST_STYLE)
+    eager = render_markdown(LONG_MARKDOWN, height=300, single_slide=True)
+
+    mocker.patch.object(
+        lookatme.tui.SlideRenderer, "LAZY_RENDER_THRESHOLD", new=0)
+    lazy = render_markdown(LONG_MARKDOWN, height=300, single_slide=True)
+
+    assert [row_text(x) for x in lazy] == [row_text(x) for x in eager]
+
+
+def test_lazy_builds_only_requested():
+    """Test that only requested positions are built, and that built widgets
+    outside of the window are evicted
+    """
+    built = []
+
+    def build_fn(tokens):
+        built.append(tokens[0]["idx"])
+        return [urwid.Text(str(tokens[0]["idx"]))]
+
+    groups = [[{"type": "paragraph", "idx": idx}] for idx in range(1000)]
+    walker = LazySlideWalker(groups, build_fn, window=5)
+
+    listbox = urwid.ListBox(walker)
+    canvas = listbox.render((20, 3))
+    assert [row_text(x).strip() for x in canvas.content()] == [b"0", b"1", b"2"]
+    assert sorted(built) == [0, 1, 2]
+
+    # cached widgets are reused
+    listbox.render((20, 3))
+    assert sorted(built) == [0, 1, 2]
+
+    walker.set_focus(500)
+    listbox.render((20, 3))
+    for idx in range(500, 520):
+        walker[idx]
+    assert 500 in walker._built
+    assert 0 not in walker._built
+    assert len(walker._built) <= 2 * walker.window + 1
@@ -0,0 +1,106 @@
+"""
+Test presenter/audience mirroring in lookatme/mirror.py
+"""
+
+
+import io
+import os
+import socket
+import threading
+import time
+
+import pytest
+import urwid
+
+import lookatme.mirror
+from tests.utils import setup_lookatme
+
+
+def _frame(seq, rows):
+    return (seq, (10, len(rows)), rows, [hash(x) for x in rows])
+
+
+def test_parse_address():
+    """Test that Unix socket paths and TCP addresses are recognized
+    """
+    parse = lookatme.mirror.parse_address
+    assert parse("/tmp/x.sock") == (socket.AF_UNIX, "/tmp/x.sock")
+    assert parse("unix:x.sock") == (socket.AF_UNIX, "x.sock")
+    assert parse("0.0.0.0:9000") == (socket.AF_INET, ("0.0.0.0", 9000))
+    assert parse(":9000") == (socket.AF_INET, ("127.0.0.1", 9000))
+
+
+def test_frame_delta():
+    """Test that only changed rows are sent, unless the size changed
+    """
+    delta = lookatme.mirror.frame_delta
+    first = _frame(1, ["a", "b", "c"])
+    assert delta(first, None, None)["rows"] == {"0": "a", "1": "b", "2": "c"}
+
+    second = _frame(2, ["a", "B", "c"])
+    msg = delta(second, first[1], first[3])
+    assert msg["full"] is False
+    assert msg["rows"] == {"1": "B"}
+
+    resized = _frame(3, ["a", "B"])
+    msg = delta(resized, second[1], second[3])
+    assert msg["full"] is True
+    assert msg["rows"] == {"0": "a", "1": "B"}
+
+
+def test_broadcast_to_viewer(tmpdir, mocker):
+    """Test that frames reach a viewer, and that stats are collected
+    """
+    setup_lookatme(tmpdir, mocker)
+    address = str(tmpdir.join("mirror.sock"))
+    broadcaster = lookatme.mirror.MirrorBroadcaster(address)
+    broadcaster.start()
+
+    output = io.StringIO()
+    viewer = lookatme.mirror.MirrorViewer(address, output=output)
+    viewer_thread = threading.Thread(target=viewer.run, daemon=True)
+    viewer_thread.start()
+
+    def wait_for(condition):
+        for _ in range(200):
+            if condition():
+                return
+            time.sleep(0.01)
+        raise AssertionError("Timed out")
+
+    wait_for(lambda: len(broadcaster.viewers) == 1)
+    broadcaster.publish(urwid.Text("one\ntwo").render((5,)))
+    wait_for(lambda: len(viewer.rows) == 2)
+    broadcaster.publish(urwid.Text("one\nTWO").render((5,)))
+    wait_for(lambda: "TWO" in viewer.rows.get(1, ""))
+    wait_for(lambda: broadcaster.stats.latency_count == 2)
+
+    broadcaster.stop()
+    viewer_thread.join(2)
+    assert not viewer_thread.is_alive()
+
+    assert broadcaster.stats.frames == 2
+    assert broadcaster.stats.rows == 3
+    assert "one" in viewer.rows[0]
+    assert "\x1b[2;1H" in output.getvalue()
+
+
+def test_broadcast_path_not_socket(tmpdir, mocker):
+    """Test that broadcasting on a path that is not a socket fails without
+    removing the file, and that stale sockets are replaced
+    """
+    setup_lookatme(tmpdir, mocker)
+    notes = tmpdir.join("notes.md")
+    notes.write("# notes")
+    with pytest.raises(ValueError):
+        lookatme.mirror.MirrorBroadcaster(str(notes)).start()
+    assert notes.read() == "# notes"
+
+    address = str(tmpdir.join("stale.sock"))
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(address)
+    stale.close()
+    broadcaster = lookatme.mirror.MirrorBroadcaster(address)
+    broadcaster.start()
+    broadcaster.stop()
+    assert not os.path.exists(address)
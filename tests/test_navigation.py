@@ -0,0 +1,114 @@
+"""
+Tests for navigating between slides while they are rendered in the background
+"""
+
+
+import lookatme.tui
+from tests.utils import create_test_tui
+
+
+def _create_tui(tmpdir, mocker, num_slides, use_asyncio=False):
+    # the first slide is rendered before the presentation starts running
+    render_patch = mocker.patch.object(
+        lookatme.tui.SlideRenderer,
+        "render_slide",
+        return_value=[lookatme.tui.text("", "first")],
+    )
+    tui = create_test_tui(
+        tmpdir, mocker,
+        "\n\n---\n\n".join(f"# Slide {idx}\n\ncontents {idx}" for idx in range(num_slides)),
+        patch_update=False,
+        use_asyncio=use_asyncio,
+    )
+    mocker.stop(render_patch)
+    # pretend the presentation is running
+    mocker.patch.object(lookatme.tui, "get_scheduler", return_value=mocker.Mock())
+    return tui
+
+
+def _body_text(tui):
+    return [getattr(x, "text", "") for x in tui.slide_body.body]
+
+
+def test_navigation_does_not_block(tmpdir, mocker):
+    """Test that a placeholder is displayed until the slide is rendered, and
+    that the rendered slide is swapped in once it is ready
+    """
+    tui = _create_tui(tmpdir, mocker, 3)
+    renderer = tui.slide_renderer
+    renderer.flush_cache()
+
+    size = (80, 20)
+    tui.keypress(size, "l")
+    assert tui.curr_slide.number == 1
+    assert "rendering..." in _body_text(tui)
+    assert "Slide 1" in _body_text(tui)
+
+    renderer.render_next()
+    assert "contents 1" in _body_text(tui)
+
+
+def test_navigation_coalesces_keys(tmpdir, mocker):
+    """Test that passing through slides quickly only renders the slide that
+    is landed on first, and that stale results are not displayed
+    """
+    tui = _create_tui(tmpdir, mocker, 6)
+    renderer = tui.slide_renderer
+    render_spy = mocker.spy(renderer, "do_render")
+
+    size = (80, 20)
+    for _ in range(4):
+        tui.keypress(size, "l")
+    assert tui.curr_slide.number == 4
+    assert renderer.queue.queue[0].number == 4
+    assert len([x for x in renderer.queue.queue if x.number == 4]) == 1
+
+    renderer.render_next()
+    assert render_spy.call_args[0][1] == 4
+    assert "contents 4" in _body_text(tui)
+
+    # slide 3 finishing after slide 4 is displayed does not replace it
+    tui.keypress(size, "h")
+    tui.keypress(size, "l")
+    while renderer.is_queued(3):
+        renderer.render_next()
+    assert "contents 4" in _body_text(tui)
+
+
+def test_navigation_render_error(tmpdir, mocker):
+    """Test that slides that fail to render display the error
+    """
+    tui = _create_tui(tmpdir, mocker, 2)
+    renderer = tui.slide_renderer
+    renderer.flush_cache()
+    mocker.patch.object(renderer, "do_render", side_effect=ValueError("broken"))
+
+    tui.keypress((80, 20), "l")
+    renderer.render_next()
+    assert _body_text(tui) == ["Error rendering slide 2: broken"]
+
+
+def test_navigation_asyncio(tmpdir, mocker):
+    """Test that the rendered slide is awaited by an asyncio task when the
+    TUI runs on asyncio
+    """
+    tui = _create_tui(tmpdir, mocker, 3, use_asyncio=True)
+    renderer = tui.slide_renderer
+    renderer.flush_cache()
+    asyncio_loop = tui.loop.asyncio_loop
+
+    size = (80, 20)
+    tui.keypress(size, "l")
+    first_task = tui._body_task
+    tui.keypress(size, "l")
+    task = tui._body_task
+    assert "rendering..." in _body_text(tui)
+
+    renderer.render_next()
+    try:
+        asyncio_loop.run_until_complete(task)
+    finally:
+        asyncio_loop.close()
+    assert "contents 2" in _body_text(tui)
+    assert tui._body_task is None
+    assert first_task.cancelled()
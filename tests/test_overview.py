@@ -0,0 +1,107 @@
+"""
+Test the slide overview grid
+"""
+
+
+import urwid
+
+import lookatme.tui
+import lookatme.widgets.overview as overview
+from lookatme.slide import Slide
+from tests.utils import create_test_tui, setup_lookatme
+
+
+def test_downsample_canvas():
+    """Test that blocks of text are downsampled by density, using the most
+    common attribute of the block
+    """
+    spec = urwid.AttrSpec("bold", "")
+    canvas = urwid.Pile([
+        urwid.Text([(spec, "xxxx"), "    "]),
+        urwid.Text([(spec, "xxxx"), "    "]),
+    ]).render((8,))
+
+    markup = overview.downsample_canvas(canvas, (2, 1))
+    assert markup == [(spec, "#"), (None, " ")]
+
+
+def test_render_thumbnail_size():
+    """Test that thumbnails are exactly the requested size
+    """
+    markup = overview.render_thumbnail([urwid.Text("hello " * 50)], (10, 3))
+    text = "".join(x[1] if isinstance(x, tuple) else x for x in markup)
+    assert [len(x) for x in text.split("\n")] == [10, 10, 10]
+
+
+def test_fill_nearest_first(mocker):
+    """Test that thumbnails are made nearest-first from the selected slide,
+    that slides that are not rendered yet are prioritized, and that
+    thumbnails are cached by content hash
+    """
+    mocker.patch.object(overview, "_THUMB_CACHE", new=overview.OrderedDict())
+    # all thumbnails fit within the budget, even on a loaded machine
+    mocker.patch.object(overview.SlideOverview, "FILL_BUDGET", new=60)
+    slides = [Slide([{"type": "paragraph", "text": str(x)}], x) for x in range(5)]
+    renderer = mocker.Mock()
+    renderer.cache = {x: [urwid.Text(str(x))] for x in range(5) if x != 3}
+
+    grid = overview.SlideOverview(slides, {}, renderer, selected=2)
+    grid.start_filling()
+    assert grid._pending == [2, 1, 3, 0, 4]
+    renderer.prioritize.assert_called_once_with([2, 1, 3, 0, 4])
+
+    assert not grid.fill_step()
+    assert grid._pending == [3]
+    assert grid.fill_step()
+
+    renderer.cache[3] = [urwid.Text("3")]
+    assert not grid.fill_step()
+    assert len(overview._THUMB_CACHE) == 5
+
+    # slides with cached thumbnails do not need to be made again
+    grid = overview.SlideOverview(slides, {}, renderer, selected=0)
+    grid.start_filling()
+    assert grid._pending == []
+    assert "..." not in grid.cell(3).thumb.text
+
+
+def test_slide_renderer_prioritize(tmpdir, mocker):
+    """Test that queued slides can be moved to the front of the queue
+    """
+    setup_lookatme(tmpdir, mocker)
+    renderer = lookatme.tui.SlideRenderer(mocker.Mock())
+    slides = [Slide([], x) for x in range(4)]
+    for slide in slides:
+        renderer.queue_render(slide)
+
+    renderer.prioritize([2, 3])
+    assert [x.number for x in renderer.queue.queue] == [2, 3, 0, 1]
+
+
+def test_tui_overview(tmpdir, mocker):
+    """Test that the overview can be navigated and used to jump to slides
+    """
+    tui = create_test_tui(
+        tmpdir, mocker, "\n\n---\n\n".join(f"# Slide {x}" for x in range(10)),
+    )
+
+    size = (120, 40)
+    tui.keypress(size, "o")
+    assert tui.body is tui.overview
+    tui.render(size)
+    per_row = tui.overview.per_row
+    assert per_row > 1
+
+    tui.keypress(size, "l")
+    tui.keypress(size, "j")
+    assert tui.overview.selected == 1 + per_row
+    tui.keypress(size, "enter")
+    assert tui.overview is None
+    assert tui.body is tui.root_paddings
+    assert tui.curr_slide.number == 1 + per_row
+
+    tui.keypress(size, "o")
+    tui.keypress(size, "h")
+    tui.keypress(size, "esc")
+    assert tui.overview is None
+    assert tui.curr_slide.number == 1 + per_row
@@ -0,0 +1,129 @@
+"""
+Test presentations made of several input files
+"""
+
+
+import asyncio
+import concurrent.futures
+import os
+
+import lookatme.pres
+from lookatme.pres import Presentation
+from tests.utils import setup_lookatme
+
+
+def _write_decks(tmpdir):
+    tmpdir.mkdir("part2")
+    paths = [
+        tmpdir.join("part1.md"),
+        tmpdir.join("part2").join("part2.md"),
+    ]
+    paths[0].write("---\ntitle: Part 1\nextensions: [a]\n---\n# One\n\n---\n\n# Two")
+    paths[1].write("---\ntitle: Part 2\nextensions: [a, b]\n---\n# Three")
+    return paths
+
+
+def _open_pres(paths):
+    streams = [open(str(x), "r") for x in paths]
+    try:
+        return Presentation(streams, "dark", safe=True)
+    finally:
+        for stream in streams:
+            stream.close()
+
+
+def test_multiple_files(tmpdir, mocker):
+    """Test that several files are presented as one continuously numbered
+    deck, using the metadata of the first file
+    """
+    setup_lookatme(tmpdir, mocker)
+    paths = _write_decks(tmpdir)
+    pres = _open_pres(paths)
+
+    assert [x.number for x in pres.slides] == [0, 1, 2]
+    assert pres.slides[2].tokens[0]["text"] == "Three"
+    assert pres.slides[2].source_dir == str(tmpdir.join("part2"))
+    assert pres.meta["title"] == "Part 1"
+    assert pres.meta["extensions"] == ["a", "b"]
+
+
+def test_reload_only_changed_file(tmpdir, mocker):
+    """Test that reloading only re-reads and re-parses the file that changed
+    """
+    setup_lookatme(tmpdir, mocker)
+    paths = _write_decks(tmpdir)
+    pres = _open_pres(paths)
+
+    parse = mocker.spy(pres, "parse")
+    paths[0].write("# One\n\n---\n\n# Two changed")
+    paths[1].write("# Not re-read")
+    pres.reload(changed=[0])
+
+    assert parse.call_count == 1
+    assert [x.tokens[0]["text"] for x in pres.slides] == ["One", "Two changed", "Three"]
+
+    # unchanged content is not re-parsed
+    pres.reload(changed=[0])
+    assert parse.call_count == 1
+
+
+def test_slides_are_copied(tmpdir, mocker):
+    """Test that rendering (which may modify tokens) does not modify the
+    cached parse results
+    """
+    setup_lookatme(tmpdir, mocker)
+    paths = _write_decks(tmpdir)
+    pres = _open_pres(paths)
+
+    pres.slides[0].tokens[0]["text"] = "modified"
+    pres.reload(changed=[])
+    assert pres.slides[0].tokens[0]["text"] == "One"
+
+
+def test_parallel_parse(tmpdir, mocker):
+    """Test that several large files are parsed in worker processes
+    """
+    setup_lookatme(tmpdir, mocker)
+    mocker.patch.object(lookatme.pres, "PARALLEL_PARSE_MIN_SIZE", new=0)
+    pool = mocker.patch(
+        "concurrent.futures.ProcessPoolExecutor",
+        side_effect=concurrent.futures.ThreadPoolExecutor,
+    )
+    paths = _write_decks(tmpdir)
+    pres = _open_pres(paths)
+
+    pool.assert_called_once_with(max_workers=mocker.ANY)
+    assert len(pres.slides) == 3
+    assert len(pres.parsed_sources) == 2
+
+
+def test_watch_inputs(tmpdir, mocker):
+    """Test that the asyncio file watcher reloads the input files that
+    changed on the event loop
+    """
+    setup_lookatme(tmpdir, mocker)
+    paths = _write_decks(tmpdir)
+    pres = _open_pres(paths)
+    pres.tui = mocker.Mock()
+    mocker.patch("asyncio.sleep", side_effect=[None, asyncio.CancelledError()])
+
+    # the first check records the modified times, the second one sees the
+    # change
+    mod_time = os.path.getmtime(str(paths[1]))
+    checks = []
+
+    def changed_inputs(*args):
+        checks.append(lookatme.pres.Presentation._changed_inputs(pres, *args))
+        os.utime(str(paths[1]), (mod_time + 10, mod_time + 10))
+        return checks[-1]
+
+    mocker.patch.object(pres, "_changed_inputs", side_effect=changed_inputs)
+
+    loop = asyncio.new_event_loop()
+    try:
+        task = loop.create_task(pres.watch_inputs())
+        loop.run_until_complete(asyncio.gather(task, return_exceptions=True))
+    finally:
+        loop.close()
+    assert checks == [[], [1]]
+    pres.tui.reload.assert_called_once_with([1])
@@ -0,0 +1,159 @@
+"""
+Tests for pygments rendering and background highlighting
+"""
+
+
+import collections
+import threading
+
+import pytest
+
+import lookatme.config
+import lookatme.contrib
+import lookatme.render.pygments as pygments_render
+from lookatme.slide import Slide
+
+CODE = "def hello():\n    return 'hi'\n\n\nprint(hello())\n"
+
+
+@pytest.fixture
+def progressive(mocker):
+    mocker.patch.object(lookatme.config, "LOG")
+    mocker.patch("lookatme.config.STYLE", new={"style": "monokai"})
+    mocker.patch.object(pygments_render, "PROGRESSIVE_MIN_SIZE", new=10)
+    mocker.patch.object(pygments_render, "HIGHLIGHT_CACHE", new=collections.OrderedDict())
+    mocker.patch.object(pygments_render, "_JOBS", new={})
+    mocker.patch.object(pygments_render, "_CURRENT_SLIDE", new=None)
+    with pygments_render.highlight_owner(None, progressive=True):
+        yield
+
+
+def _wait(block_widget):
+    block = block_widget.original_widget
+    for job in list(pygments_render._JOBS.values()):
+        if block in job.blocks and job.future is not None:
+            job.future.result(timeout=10)
+    return block
+
+
+def test_progressive_highlighting(progressive):
+    """Test that large code blocks are displayed as plain text at first, and
+    that the highlighted lines are swapped in once they are ready
+    """
+    res = pygments_render.render_text(CODE, lang="python")
+    block = res.original_widget
+    assert block.lines == ["def hello():", "    return 'hi'", "", "", "print(hello())"]
+
+    _wait(res)
+    assert len(block.lines) == 5
+    assert isinstance(block.lines[0], list)
+    assert "".join(x[1] for x in block.lines[0]) == "def hello():"
+    assert pygments_render._JOBS == {}
+
+    # highlighted code is displayed immediately
+    res = pygments_render.render_text(CODE, lang="python")
+    assert isinstance(res.original_widget.lines[0], list)
+
+
+def test_small_blocks_not_progressive(progressive):
+    """Test that small code blocks are highlighted immediately
+    """
+    res = pygments_render.render_text("x = 1", lang="python")
+    assert isinstance(res.original_widget.lines[0], list)
+    assert pygments_render._JOBS == {}
+
+
+def test_highlighting_far_slides_cancelled(progressive, mocker):
+    """Test that highlighting only runs for code blocks on slides near the
+    current slide
+    """
+    pygments_render.update_highlighting(20)
+
+    with pygments_render.highlight_owner(3):
+        far = pygments_render.render_text(CODE, lang="python")
+    with pygments_render.highlight_owner(21):
+        near = pygments_render.render_text(CODE + "\n# near", lang="python")
+
+    far_job = pygments_render._JOBS[(CODE, "python", "monokai")]
+    assert far_job.owners == {3}
+    assert not far_job.running
+    _wait(near)
+    assert isinstance(near.original_widget.lines[0], list)
+
+    # moving near the slide starts highlighting
+    pygments_render.update_highlighting(4)
+    assert far_job.running
+    _wait(far)
+    assert isinstance(far.original_widget.lines[0], list)
+
+
+def test_cancel_running_job(progressive):
+    """Test that cancelled jobs stop lexing, and can be restarted
+    """
+    job = pygments_render.HighlightJob((CODE * 100, "python", "monokai"))
+    cancelled = threading.Event()
+    cancelled.set()
+    job.run(cancelled)
+    assert pygments_render.HIGHLIGHT_CACHE == {}
+
+    assert pygments_render._highlight_markup(CODE, "python", "monokai", cancelled) is None
+    assert pygments_render._highlight_markup(CODE, "python", "monokai", threading.Event()) is not None
+
+
+def test_code_langs(mocker):
+    """Test that the languages of all code blocks are found, including the
+    languages of files loaded by the file loader when it is loaded
+    """
+    mocker.patch.object(lookatme.contrib, "CONTRIB_MODULES", new=[])
+    slides = [
+        Slide([
+            {"type": "code", "lang": "python", "text": "x"},
+            {"type": "paragraph", "text": "hi"},
+            {"type": "code", "lang": None, "text": "x"},
+        ]),
+        Slide([
+            {"type": "code", "lang": "file", "text": "path: main.c"},
+            {"type": "code", "lang": "file", "text": "path: a.txt\nlang: rust"},
+            {"type": "code", "lang": "file", "text": "- not valid"},
+            {"type": "code", "lang": "python", "text": "y"},
+        ]),
+    ]
+    assert pygments_render.code_langs(slides) == ["python", "text", "file"]
+
+    file_loader = lookatme.contrib.LazyContrib(
+        "file_loader", lookatme.contrib.BUILTIN_EXTENSIONS["file_loader"],
+    )
+    lookatme.contrib.CONTRIB_MODULES.append(file_loader)
+    assert pygments_render.code_langs(slides) == ["python", "text", "c", "rust"]
+    assert file_loader.module is not None
+
+
+def test_prewarm(mocker):
+    """Test that lexers and formatters are created ahead of time, and that
+    the timings are logged
+    """
+    log = mocker.patch.object(lookatme.config, "LOG")
+    mocker.patch.object(pygments_render, "LEXER_CACHE", new={})
+    mocker.patch.object(pygments_render, "FORMATTER_CACHE", new={})
+    slides = [Slide([{"type": "code", "lang": "yaml", "text": "a: 1"}])]
+
+    pygments_render.prewarm_in_background(slides, "monokai").join()
+    assert list(pygments_render.LEXER_CACHE.keys()) == ["yaml"]
+    assert list(pygments_render.FORMATTER_CACHE.keys()) == ["monokai"]
+    messages = [x[0][0] for x in log.debug.call_args_list]
+    assert any(x.startswith("Pre-warmed the 'yaml' lexer in ") for x in messages)
+
+    log.debug.reset_mock()
+    pygments_render.prewarm(slides, "monokai")
+    messages = [x[0][0] for x in log.debug.call_args_list]
+    assert len(messages) == 1
+
+
+def test_progressive_is_scoped():
+    """Test that progressive mode only applies within its context
+    """
+    with pygments_render.highlight_owner(1, progressive=True):
+        with pygments_render.highlight_owner(2):
+            assert pygments_render._OWNER.progressive
+    assert not pygments_render._OWNER.progressive
+    assert pygments_render._OWNER.slide_num is None
@@ -0,0 +1,155 @@
+"""
+Tests for the render context
+"""
+
+
+import urwid
+
+from lookatme.render.context import ListState, RenderStack
+from tests.utils import (assert_render, render_markdown, row_text,
+                         setup_lookatme)
+
+TEST_STYLE = {
+    "bullets": {
+        "default": "*",
+        "1": "-",
+        "2": "=",
+        "3": "^",
+    },
+    "numbering": {
+        "default": "numeric",
+        "1": "numeric",
+        "2": "alpha",
+        "3": "roman",
+    },
+    "quote": {
+        "style": {"fg": "", "bg": ""},
+        "side": ">",
+        "top_corner": "-",
+        "bottom_corner": "-",
+    },
+}
+
+
+def test_stack_push_pop():
+    """Test that pushing a container links a new context frame that inherits
+    the list state
+    """
+    root = urwid.ListBox([])
+    stack = RenderStack(root)
+    assert stack.context.container is root
+    assert stack.context.parent is None
+    assert not stack.context.in_list
+
+    list_pile = urwid.Pile([])
+    list_state = ListState(1, False, {})
+    stack.append(list_pile, list_state=list_state)
+    root_context = stack.context.parent
+
+    item_pile = urwid.Pile([])
+    stack.append(item_pile)
+    assert stack[-1] is item_pile
+    assert stack.context.list_state is list_state
+    assert stack.context.depth == 2
+    assert stack.context.parent.parent is root_context
+
+    assert stack.pop() is item_pile
+    assert stack.pop() is list_pile
+    assert stack.context is root_context
+    assert len(stack) == 1
+
+
+def test_nested_list_in_quote_in_list(tmpdir, mocker):
+    """Test that lists nested in block quotes within list items continue the
+    outer list's nesting level
+    """
+    setup_lookatme(tmpdir, mocker, style=TEST_STYLE)
+
+    rendered = render_markdown("""
+1. one
+   > * quoted
+   >   * nested
+2. two
+3. three
+""")
+
+    texts = [row_text(x).rstrip() for x in rendered]
+    assert b"  1. one" in texts
+    assert b"  2. two" in texts
+    assert b"  3. three" in texts
+    assert any(x.endswith(b"= quoted") for x in texts)
+    assert any(x.endswith(b"^ nested") for x in texts)
+
+
+def test_marker_width_widens_list(tmpdir, mocker):
+    """Test that the widest marker of a list sets the marker column width of
+    all of its items
+    """
+    setup_lookatme(tmpdir, mocker, style=TEST_STYLE)
+
+    items = "\n".join(f"{x + 1}. item" for x in range(10))
+    rendered = render_markdown("\n" + items + "\n")
+
+    stripped_rows = [b""] + [
+        "  {:<4}item".format(f"{x + 1}.").encode() for x in range(10)
+    ] + [b""]
+    assert_render(stripped_rows, rendered)
+
+
+def test_contexts_are_not_copied(tmpdir, mocker):
+    """Test that rendering does not deep copy render state for each pushed
+    container
+    """
+    setup_lookatme(tmpdir, mocker, style=TEST_STYLE)
+    deepcopy = mocker.patch("copy.deepcopy", side_effect=AssertionError)
+
+    rendered = render_markdown("""
+* a
+  * b
+    * c
+""")
+
+    deepcopy.assert_not_called()
+    stripped_rows = [
+        b"",
+        b"  - a",
+        b"    = b",
+        b"      ^ c",
+        b"",
+    ]
+    assert_render(stripped_rows, rendered)
+
+
+def test_widgets_added_when_popped():
+    """Test that widgets are collected by the context and added to their
+    container once it is popped
+    """
+    stack = RenderStack(urwid.ListBox([]))
+    pile = urwid.Pile([])
+    stack.append(pile)
+    stack.context.add([urwid.Text("a"), urwid.Divider()])
+    stack.context.add(urwid.Divider())
+    stack.context.add(urwid.Text("b"))
+    assert len(pile.contents) == 0
+
+    assert stack.pop() is pile
+    assert [type(x[0]) for x in pile.contents] == [urwid.Text, urwid.Divider, urwid.Text]
+
+    # popped containers are added to directly
+    stack.context.add(urwid.Text("c"))
+    stack.flush()
+    assert len(stack[0].body) == 1
+
+
+def test_block_quote_dividers_trimmed(tmpdir, mocker):
+    """Test that leading and trailing dividers are trimmed from block quotes
+    before the quote's pile is filled
+    """
+    setup_lookatme(tmpdir, mocker, style=TEST_STYLE)
+
+    rendered = render_markdown("""
+> * quoted
+""")
+
+    texts = [row_text(x).rstrip() for x in rendered]
+    assert texts[:4] == [b"", b"-", b">    - quoted", b"-"]
@@ -0,0 +1,165 @@
+"""
+Test the redraw scheduler
+"""
+
+
+import asyncio
+import os
+import threading
+
+import pytest
+
+import lookatme.config
+from lookatme.scheduler import AsyncioEventLoop, RedrawScheduler
+
+
+class FakeScreen:
+    started = True
+
+
+class FakeLoop:
+    def __init__(self):
+        self.screen = FakeScreen()
+        self.alarms = []
+        self.pipe_callback = None
+        self.pipe_read_fd = None
+
+    def watch_pipe(self, callback):
+        self.pipe_callback = callback
+        self.pipe_read_fd, write_fd = os.pipe()
+        return write_fd
+
+    def remove_watch_pipe(self, write_fd):
+        os.close(write_fd)
+        os.close(self.pipe_read_fd)
+
+    def set_alarm_in(self, sec, callback, user_data=None):
+        self.alarms.append((sec, callback))
+        return len(self.alarms)
+
+    def fire_pipe(self):
+        data = os.read(self.pipe_read_fd, 1024)
+        self.pipe_callback(data)
+
+    def fire_alarms(self):
+        alarms, self.alarms = self.alarms, []
+        for _, callback in alarms:
+            callback(self, None)
+
+
+@pytest.fixture
+def scheduler(mocker):
+    mocker.patch.object(lookatme.config, "LOG")
+    draw = mocker.patch("urwid.MainLoop.draw_screen")
+    loop = FakeLoop()
+    res = RedrawScheduler(loop, max_fps=10)
+    res.start()
+    res.draw = draw
+    yield res
+    res.stop()
+
+
+def test_redraws_are_capped(scheduler):
+    """Test that redraws within the frame interval are coalesced into a
+    single delayed redraw
+    """
+    scheduler.request()
+    assert scheduler.draw.call_count == 1
+
+    for _ in range(100):
+        scheduler.request()
+    assert scheduler.draw.call_count == 1
+    assert len(scheduler.loop.alarms) == 1
+    assert 0 < scheduler.loop.alarms[0][0] <= 0.1
+
+    scheduler.loop.fire_alarms()
+    assert scheduler.draw.call_count == 2
+
+
+def test_calls_from_other_threads_run_on_ui_thread(scheduler):
+    """Test that callbacks queued from other threads only run once the UI
+    thread has been woken up
+    """
+    ran_on = []
+
+    def callback(value):
+        ran_on.append((value, threading.get_ident()))
+
+    threads = [
+        threading.Thread(target=scheduler.call_soon, args=(callback, idx))
+        for idx in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert ran_on == []
+    scheduler.loop.fire_pipe()
+    assert sorted(x[0] for x in ran_on) == [0, 1, 2]
+    assert all(x[1] == threading.get_ident() for x in ran_on)
+    assert scheduler.draw.call_count == 1
+
+
+def test_no_redraw_after_throttled_frame(scheduler):
+    """Test that entering idle right after a throttled frame was drawn does
+    not request another frame
+    """
+    scheduler.request()
+    scheduler.request()
+    scheduler.loop.fire_alarms()
+    assert scheduler.draw.call_count == 2
+    assert scheduler.skip_idle
+
+
+def test_asyncio_event_loop_idle():
+    """Test that the asyncio event loop enters idle once after callbacks
+    instead of polling
+    """
+    asyncio_loop = asyncio.new_event_loop()
+    event_loop = AsyncioEventLoop(loop=asyncio_loop)
+    idle = []
+    handle = event_loop.enter_idle(lambda: idle.append(True))
+    try:
+        event_loop.alarm(0, lambda: None)
+        event_loop.alarm(0.02, lambda: None)
+        asyncio_loop.call_later(0.1, asyncio_loop.stop)
+        asyncio_loop.run_forever()
+        # once when entering idle, once after each alarm
+        assert len(idle) == 3
+
+        assert event_loop.remove_enter_idle(handle)
+        event_loop.alarm(0, lambda: None)
+        asyncio_loop.call_later(0.05, asyncio_loop.stop)
+        asyncio_loop.run_forever()
+        assert len(idle) == 3
+    finally:
+        asyncio_loop.close()
+
+
+def test_asyncio_wake(mocker):
+    """Test that calls from other threads are scheduled on the asyncio event
+    loop
+    """
+    mocker.patch.object(lookatme.config, "LOG")
+    mocker.patch("urwid.MainLoop.draw_screen")
+    loop = FakeLoop()
+    loop.asyncio_loop = asyncio.new_event_loop()
+    scheduler = RedrawScheduler(loop)
+    scheduler.start()
+    assert loop.pipe_callback is None
+
+    ran_on = []
+    thread = threading.Thread(
+        target=scheduler.call_soon,
+        args=(lambda: ran_on.append(threading.get_ident()),),
+    )
+    thread.start()
+    thread.join()
+    try:
+        loop.asyncio_loop.call_soon(loop.asyncio_loop.stop)
+        loop.asyncio_loop.run_forever()
+    finally:
+        scheduler.stop()
+        loop.asyncio_loop.close()
+    assert ran_on == [threading.get_ident()]
@@ -0,0 +1,165 @@
+"""
+Test the full-text slide search
+"""
+
+
+import lookatme.search
+from lookatme.parser import Parser
+from lookatme.search import SlideIndex, normalize_words
+from lookatme.slide import Slide
+from tests.utils import create_test_tui
+
+
+def _slides(markdown):
+    _, slides = Parser().parse_slides({"title": ""}, markdown)
+    return slides
+
+
+def test_normalize_words():
+    """Test that words are split out and casefolded
+    """
+    assert normalize_words("Hello, WORLD! it's_fine") == ["hello", "world", "it", "s_fine"]
+
+
+def test_search_prefix_and_ranking():
+    """Test that query words match prefixes, that all query words must match,
+    and that heading matches are listed first
+    """
+    index = SlideIndex()
+    index.update(_slides("""
+# Intro
+
+Some words about caching
+
+---
+
+# Caching
+
+How the cache works
+
+---
+
+# Other
+
+Nothing here
+    """))
+
+    assert index.search("cach") == [1, 0]
+    assert index.search("cache works") == [1]
+    assert index.search("cach nothing") == []
+    assert index.search("") == []
+    assert index.titles[2] == "Other"
+
+
+def test_search_tables():
+    """Test that table headers and cells are indexed
+    """
+    index = SlideIndex()
+    index.update(_slides("""
+| Name  | Value |
+|-------|-------|
+| alpha | beta  |
+    """))
+
+    assert index.search("value") == [0]
+    assert index.search("beta") == [0]
+
+
+def test_incremental_update():
+    """Test that only changed slides are re-indexed, and that removed slides
+    are dropped from the index
+    """
+    index = SlideIndex()
+    slides = _slides("# One\n\n---\n\n# Two\n\n---\n\n# Three")
+    assert index.update(slides) == 3
+    assert index.update(_slides("# One\n\n---\n\n# Two\n\n---\n\n# Three")) == 0
+
+    assert index.update(_slides("# One\n\n---\n\n# Changed")) == 1
+    assert index.search("two") == []
+    assert index.search("three") == []
+    assert index.search("changed") == [1]
+    assert index.search("one") == [0]
+
+
+def test_moved_slides_reuse_words(mocker):
+    """Test that slides that only moved are not scanned again
+    """
+    index = SlideIndex()
+    index.update(_slides("# One\n\n---\n\n# Two"))
+
+    slide_words = mocker.patch("lookatme.search.slide_words", wraps=lookatme.search.slide_words)
+    index.update(_slides("# Zero\n\n---\n\n# One\n\n---\n\n# Two"))
+    assert slide_words.call_count == 1
+    assert index.search("two") == [2]
+    assert index.search("zero") == [0]
+
+
+def test_content_hash():
+    """Test that the content hash only depends on the slide's tokens
+    """
+    tokens = [{"type": "paragraph", "text": "hello"}]
+    assert Slide(tokens, 0).content_hash == Slide(list(tokens), 4).content_hash
+    assert Slide(tokens).content_hash != Slide([{"type": "paragraph", "text": "bye"}]).content_hash
+
+
+def test_tui_search(tmpdir, mocker):
+    """Test that the TUI narrows matches while typing and jumps to the
+    selected match
+    """
+    tui = create_test_tui(
+        tmpdir, mocker,
+        "# First\n\napple\n\n---\n\n# Second\n\nbanana\n\n---\n\n# Third\n\napricot",
+    )
+
+    size = (80, 20)
+    for key in "/ap":
+        tui.keypress(size, key)
+    assert tui.searching
+    assert tui.search_matches == [0, 2]
+    assert tui.search_status.text == "[1/2] slide 1"
+
+    tui.keypress(size, "down")
+    assert tui.search_status.text == "[2/2] slide 3"
+    tui.keypress(size, "enter")
+    assert not tui.searching
+    assert tui.curr_slide.number == 2
+
+    tui.keypress(size, "n")
+    assert tui.curr_slide.number == 0
+
+    tui.keypress(size, "/")
+    tui.keypress(size, "b")
+    tui.keypress(size, "esc")
+    assert not tui.searching
+    assert tui.curr_slide.number == 0
+
+
+def test_tui_search_renders_once(tmpdir, mocker):
+    """Test that selecting matches while typing queues each match at most
+    once, and moves the selected match to the front of the queue
+    """
+    tui = create_test_tui(
+        tmpdir, mocker,
+        "\n\n---\n\n".join(f"# Slide {idx}\n\nfruit {idx}" for idx in range(6)),
+    )
+    renderer = tui.slide_renderer
+    renderer.flush_cache()
+
+    size = (80, 20)
+    for key in "/fruit":
+        tui.keypress(size, key)
+    assert [x.number for x in renderer.queue.queue] == [0]
+
+    tui.keypress(size, "down")
+    tui.keypress(size, "down")
+    tui.keypress(size, "up")
+    assert [x.number for x in renderer.queue.queue] == [1, 2, 0]
+
+    # slides that are being rendered or are cached are not queued
+    renderer.rendering = 3
+    renderer.cache[4] = []
+    tui.keypress(size, "down")
+    tui.keypress(size, "down")
+    tui.keypress(size, "down")
+    assert [x.number for x in renderer.queue.queue] == [2, 1, 0]
+    assert tui.search_status.text == "[5/6] slide 5"
@@ -0,0 +1,140 @@
+"""
+Test the render daemon in lookatme/server.py
+"""
+
+
+import collections
+import os
+import socket
+
+import pytest
+
+import lookatme.ipc
+import lookatme.render.pygments as pygments_render
+import lookatme.server
+from tests.utils import setup_lookatme
+
+
+def test_deck_cache(tmpdir, mocker):
+    """Test that decks are only re-parsed when their content changes, and
+    that idle decks are evicted
+    """
+    setup_lookatme(tmpdir, mocker)
+    deck_path = tmpdir.join("deck.md")
+    deck_path.write("# Slide 1\n\n---\n\n# Slide 2\n")
+
+    cache = lookatme.server.DeckCache(ttl=60)
+    deck = cache.get(str(deck_path))
+    assert len(deck.slides) == 2
+    assert cache.get(str(deck_path)) is deck
+
+    # touched, but unchanged
+    os.utime(str(deck_path), (0, 0))
+    assert cache.get(str(deck_path)) is deck
+
+    deck_path.write("# Slide 1\n\n---\n\n# Slide 2\n\n---\n\n# Slide 3\n")
+    new_deck = cache.get(str(deck_path))
+    assert new_deck is not deck
+    assert len(new_deck.slides) == 3
+
+    new_deck.last_used -= 120
+    assert cache.evict_idle() == [str(deck_path)]
+    assert cache.decks == {}
+
+
+def test_warm_highlighting(tmpdir, mocker):
+    """Test that code blocks of cached decks are highlighted ahead of time
+    """
+    setup_lookatme(tmpdir, mocker)
+    mocker.patch.object(pygments_render, "HIGHLIGHT_CACHE", new=collections.OrderedDict())
+    deck_path = tmpdir.join("deck.md")
+    deck_path.write("```python\nprint('hi')\n```\n\n```file\npath: x.py\n```\n")
+
+    deck = lookatme.server.DeckCache().get(str(deck_path))
+    lookatme.server.warm_highlighting(deck, "dark", "monokai")
+
+    assert list(pygments_render.HIGHLIGHT_CACHE.keys()) == [
+        ("print('hi')", "python", "monokai"),
+    ]
+    lex_spy = mocker.spy(pygments_render, "get_lexer")
+    pygments_render.highlight("print('hi')", lang="python", style_name="monokai")
+    assert lex_spy.call_count == 0
+
+
+def test_run_client_no_server(tmpdir):
+    """Test that None is returned when no server is running
+    """
+    assert lookatme.server.run_client({}, str(tmpdir.join("missing.sock"))) is None
+
+
+def test_private_socket_dir(tmpdir):
+    """Test that the socket directory is created private, and that shared
+    directories are refused
+    """
+    path = str(tmpdir.join("sockets"))
+    lookatme.server.ensure_private_dir(path)
+    assert os.stat(path).st_mode & 0o777 == 0o700
+    # existing private directories are fine
+    lookatme.server.ensure_private_dir(path)
+
+    os.chmod(path, 0o755)
+    with pytest.raises(RuntimeError):
+        lookatme.server.ensure_private_dir(path)
+
+
+def test_client_env(mocker):
+    """Test that only the forwarded environment variables are sent to the
+    daemon
+    """
+    mocker.patch.dict(os.environ, {"TERM": "xterm-256color", "AWS_SECRET_ACCESS_KEY": "x"})
+    env = lookatme.server.client_env()
+    assert env["TERM"] == "xterm-256color"
+    assert "AWS_SECRET_ACCESS_KEY" not in env
+
+
+def test_peer_uid():
+    """Test that the user of the other end of a Unix socket is found
+    """
+    left, right = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        assert lookatme.ipc.peer_uid(left) == os.getuid()
+    finally:
+        left.close()
+        right.close()
+
+
+def test_run_client_checks_peer(tmpdir, mocker):
+    """Test that the terminal is not sent to a socket bound by another user
+    """
+    sock_path = str(tmpdir.join("other.sock"))
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(sock_path)
+    listener.listen(1)
+    send = mocker.patch.object(lookatme.server, "send_message")
+    mocker.patch.object(lookatme.server, "peer_uid", return_value=os.getuid() + 1)
+    try:
+        assert lookatme.server.run_client({}, sock_path) == 1
+    finally:
+        listener.close()
+    assert send.call_count == 0
+
+
+def test_peer_unknown_fails_closed(tmpdir, mocker):
+    """Test that peers without credentials are only trusted through sockets
+    in a private directory
+    """
+    mocker.patch.object(lookatme.server, "peer_uid", return_value=None)
+    sock_dir = tmpdir.mkdir("sockets")
+    sock_path = str(sock_dir.join("render.sock"))
+    left, right = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        os.chmod(str(sock_dir), 0o755)
+        allowed, reason = lookatme.server.peer_allowed(left, sock_path)
+        assert not allowed
+        assert "private" in reason
+
+        os.chmod(str(sock_dir), 0o700)
+        assert lookatme.server.peer_allowed(left, sock_path) == (True, "")
+    finally:
+        left.close()
+        right.close()
@@ -4,6 +4,7 @@ This module tests the Table widget in lookatme/widgets/table.py
 
 
 import pytest
+import urwid
 
 import lookatme.widgets.table
 import tests.utils as utils
@@ -14,6 +15,10 @@ TEST_STYLE = {
         "column_spacing": 3,
         "header_divider": "&",
     },
+    "link": {
+        "fg": "underline",
+        "bg": "",
+    },
 }
 
 
@@ -139,3 +144,139 @@ def test_ignored_extra_column(mocker):
 
     assert b"4" not in utils.row_text(content[-1])
     assert b"5" not in utils.row_text(content[-1])
+
+
+def test_column_maxes_cached(mocker):
+    """Test that the column layout is only recalculated after a cell changes
+    """
+    rows = [["1", "[link](http://example.com)"]]
+    table = lookatme.widgets.table.Table(rows, headers=["H1", "H2"])
+    calc_spy = mocker.spy(table, "calc_column_maxes")
+
+    table.render((40,))
+    table.render((40,))
+    assert calc_spy.call_count == 0
+
+    link_text = table.contents[1][0].contents[1][0].contents[0][0]
+    # clicking the link swaps the link label with the link target
+    link_text.mouse_event((20,), "mouse press", 1, 1, 0, True)
+    content = list(table.render((40,)).content())
+    assert calc_spy.call_count == 1
+    assert b"http://example.com" in utils.row_text(content[-1])
+
+
+def test_virtualized_rows(mocker):
+    """Test that virtualized tables only build the visible rows
+    """
+    headers = ["H1", "H2"]
+    rows = [[str(idx), str(idx * 2)] for idx in range(10000)]
+
+    table = lookatme.widgets.table.Table(rows, headers=headers, visible_rows=5)
+    assert table.virtualized
+    assert table.rend_rows == []
+
+    create_spy = mocker.spy(table, "create_row_widget")
+    content = list(table.render((20,)).content())
+
+    # header, divider, and five visible rows
+    assert len(content) == 7
+    assert utils.row_text(content[2]).split() == [b"0", b"0"]
+    assert utils.row_text(content[6]).split() == [b"4", b"8"]
+    assert create_spy.call_count <= 6
+
+    table.row_listbox.set_focus(9999)
+    content = list(table.render((20,)).content())
+    assert utils.row_text(content[-1]).split() == [b"9999", b"19998"]
+    assert len(table.row_walker.built) < 20
+
+
+def _body_column(content, skip=2):
+    rows = [utils.row_text(row).split() for row in content[skip:]]
+    return [row[0] for row in rows if len(row) > 0]
+
+
+def test_header_click_sorts(mocker):
+    """Test that clicking a header sorts the table by that column, using
+    numeric sorting for numeric columns and cached permutations
+    """
+    headers = ["num", "name"]
+    rows = [
+        ["10", "banana"],
+        ["9", "Apple"],
+        ["100", "cherry"],
+    ]
+
+    table = lookatme.widgets.table.Table(rows, headers=headers)
+    header = table.rend_headers[0][0][0]
+
+    header.mouse_event((10,), "mouse press", 1, 0, 0, True)
+    assert _body_column(list(table.render((30,)).content())) == [b"9", b"10", b"100"]
+    assert "▲" in header.text
+
+    header.mouse_event((10,), "mouse press", 1, 0, 0, True)
+    assert _body_column(list(table.render((30,)).content())) == [b"100", b"10", b"9"]
+    assert "▼" in header.text
+
+    # going back to a previous sort reuses the cached permutation
+    sorted_spy = mocker.spy(table, "sorted_order")
+    header.mouse_event((10,), "mouse press", 1, 0, 0, True)
+    assert sorted_spy.spy_return is table._sort_perms[(0, False)]
+
+    table.sort_by(1)
+    assert _body_column(list(table.render((30,)).content())) == [b"9", b"10", b"100"]
+
+
+def test_filter(mocker):
+    """Test that rows can be filtered, including virtualized rows
+    """
+    headers = ["num", "name"]
+    rows = [[str(idx), f"name{idx}"] for idx in range(1000)]
+
+    table = lookatme.widgets.table.Table(rows, headers=headers)
+    assert table.virtualized
+
+    table.set_filter("NAME99")
+    content = list(table.render((30,)).content())
+    assert _body_column(content) == [
+        b"99", b"990", b"991", b"992", b"993", b"994", b"995", b"996",
+        b"997", b"998", b"999",
+    ]
+
+    table.sort_by(0, reverse=True)
+    content = list(table.render((30,)).content())
+    assert _body_column(content)[:2] == [b"999", b"998"]
+
+    table.set_filter("")
+    assert len(table.row_order) == 1000
+
+
+def test_link_activation_updates_width(mocker):
+    """Test that the table width is up to date when the table emits the
+    change signal for a link that was activated with the keyboard
+    """
+    rows = [["1", "[link](http://example.com)"]]
+    table = lookatme.widgets.table.Table(rows, headers=["H1", "H2"])
+    widths = []
+    urwid.connect_signal(table, "change", lambda *args: widths.append(table.total_width))
+
+    link_text = table.contents[1][0].contents[1][0].contents[0][0]
+    link_text.activate_link(link_text.links()[0])
+    assert widths == [table.total_width]
+    assert table.column_maxes[1] == len("http://example.com")
+    assert table.rows((table.total_width,)) == table.render((table.total_width,)).rows()
+
+
+def test_sort_descending_reuses_ascending(mocker):
+    """Test that the descending order is derived from the ascending order
+    without a second sort, and that ties keep their original order
+    """
+    rows = [["b", "1"], ["a", "2"], ["b", "3"], ["c", "4"], ["a", "5"]]
+    table = lookatme.widgets.table.Table(rows, headers=["key", "idx"])
+
+    sorted_spy = mocker.patch("lookatme.widgets.table.sorted", create=True, wraps=sorted)
+    assert table.sorted_order(0) == [1, 4, 0, 2, 3]
+    assert table.sorted_order(0, reverse=True) == [3, 0, 2, 1, 4]
+    assert sorted_spy.call_count == 1
+    assert table.sorted_order(0, reverse=True) == sorted(
+        range(5), key=table.sort_keys[0].__getitem__, reverse=True,
+    )
@@ -0,0 +1,126 @@
+"""
+Test the table file built-in extension
+"""
+
+
+import pytest
+
+import lookatme.config
+import lookatme.contrib.table_file
+from tests.utils import assert_render, render_markdown, row_text
+
+TEST_STYLE = {
+    "style": "monokai",
+    "table": {
+        "column_spacing": 1,
+        "header_divider": "-",
+    },
+}
+
+
+@pytest.fixture(autouse=True)
+def table_file_setup(tmpdir, mocker):
+    mocker.patch.object(lookatme.config, "LOG")
+    mocker.patch("lookatme.config.SLIDE_SOURCE_DIR", new=str(tmpdir))
+    mocker.patch("lookatme.contrib.CONTRIB_MODULES", new=[
+        lookatme.contrib.table_file
+    ])
+    mocker.patch("lookatme.config.STYLE", new=TEST_STYLE)
+
+
+def _write_csv(tmpdir, name, num_rows, delimiter=","):
+    tmppath = tmpdir.join(name)
+    lines = [delimiter.join(["num", "name", "desc"])]
+    for idx in range(num_rows):
+        lines.append(delimiter.join([str(idx), f"name{idx}", f'"desc{idx}"']))
+    tmppath.write("\n".join(lines) + "\n")
+    return tmppath
+
+
+def test_table_file(tmpdir, mocker):
+    """Test that a page of a csv file is rendered as a table
+    """
+    _write_csv(tmpdir, "data.csv", 10)
+
+    rendered = render_markdown("""
+```table-file
+path: data.csv
+page_size: 3
+page: 2
+columns:
+  - name
+  - 0
+```
+    """)
+
+    rows = [row_text(row).split() for row in rendered]
+    rows = [row for row in rows if len(row) > 0]
+    assert rows[:5] == [
+        [b"name", b"num"],
+        [b"-----", b"---"],
+        [b"name3", b"3"],
+        [b"name4", b"4"],
+        [b"name5", b"5"],
+    ]
+    assert b" ".join(rows[5]) == "◀ prev page 2 next ▶".encode()
+
+
+def test_table_file_tsv(tmpdir, mocker):
+    """Test that tsv files use tabs as the default delimiter
+    """
+    _write_csv(tmpdir, "data.tsv", 2, delimiter="\t")
+
+    rendered = render_markdown("""
+```table-file
+path: data.tsv
+```
+    """)
+    text = b"\n".join(row_text(row) for row in rendered)
+    assert b"name1" in text
+    assert b"desc1" in text
+
+
+def test_table_file_not_found(mocker):
+    """Test that a missing file is reported
+    """
+    rendered = render_markdown("""
+```table-file
+path: does_not_exist.csv
+```
+    """)
+
+    stripped_rows = [
+        b"",
+        b"File not found",
+        b"",
+    ]
+    assert_render(stripped_rows, rendered)
+
+
+def test_row_index_seeks(tmpdir, mocker):
+    """Test that the row index records checkpoints and seeks to them
+    """
+    tmppath = _write_csv(tmpdir, "data.csv", 1000)
+    row_index = lookatme.contrib.table_file.get_row_index(
+        str(tmppath), ",", True, "utf-8")
+    row_index.stride = 100
+
+    assert row_index.header_row == ["num", "name", "desc"]
+    assert row_index.read_rows(0, 2) == [
+        ["0", "name0", "desc0"],
+        ["1", "name1", "desc1"],
+    ]
+    assert row_index.total_rows is None
+
+    assert row_index.read_rows(550, 1) == [["550", "name550", "desc550"]]
+    assert len(row_index.checkpoints) == 6
+
+    # cached per path and mtime
+    assert lookatme.contrib.table_file.get_row_index(
+        str(tmppath), ",", True, "utf-8") is row_index
+
+    assert row_index.read_rows(998, 10) == [
+        ["998", "name998", "desc998"],
+        ["999", "name999", "desc999"],
+    ]
+    assert row_index.total_rows == 1000
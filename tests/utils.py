@@ -8,6 +8,7 @@ import urwid
 import lookatme.config
 import lookatme.tui
 from lookatme.parser import Parser
+from lookatme.pres import Presentation
 
 
 def setup_lookatme(tmpdir, mocker, style=None):
@@ -18,6 +19,24 @@ def setup_lookatme(tmpdir, mocker, style=None):
         mocker.patch("lookatme.config.STYLE", new=style)
 
 
+def create_test_tui(tmpdir, mocker, markdown, patch_update=True, **pres_kwargs):
+    """Create the TUI for a presentation of the markdown, without starting
+    the render thread. Slides are not rendered by the TUI unless
+    ``patch_update`` is False. Extra keyword arguments are passed to
+    :any:`lookatme.pres.Presentation`.
+    """
+    setup_lookatme(tmpdir, mocker)
+    mocker.patch.object(lookatme.tui.SlideRenderer, "start")
+    if patch_update:
+        mocker.patch.object(lookatme.tui.MarkdownTui, "update")
+
+    md_path = tmpdir.join("slides.md")
+    md_path.write(markdown)
+    with open(str(md_path), "r") as f:
+        pres = Presentation(f, "dark", **pres_kwargs)
+    return lookatme.tui.create_tui(pres)
+
+
 def assert_render(correct_render, rendered, full_strip=False):
     for idx, row in enumerate(rendered):
         if full_strip: